@@ -22,6 +22,25 @@
 #define MQ6_CALIBRATED_R0_MEASURED 3736.11
 #define MQ8_CALIBRATED_R0_MEASURED 2038.38
 
+// Modo de envio dos dados:
+//   0: texto, uma linha "MQ3,MQ5,MQ6,MQ8" por leitura (9600 baud, 1 leitura por segundo)
+//   1: binário com quadros (ver Software/Python/protocolo_binario.py): sincronismo 0xA5 0x5A,
+//      tipo, nº de sequência, os 4 valores e CRC-16, a 115200 baud e com leituras mais frequentes.
+//      A aquisição em Python detecta o modo sozinha.
+#define MODO_BINARIO 0
+// No modo binário, 1 envia as leituras brutas do ADC (uint16, quadros de 15 bytes) em vez dos
+// valores em ppm (float32, quadros de 23 bytes). A conversão para ppm é feita no computador,
+// com os mesmos R0, RL e curvas definidos neste arquivo.
+#define BINARIO_ADC_BRUTO 0
+#define BAUD_TEXTO 9600
+#define BAUD_BINARIO 115200
+#define INTERVALO_BINARIO_MS 10
+
+#define SINCRONISMO_1 0xA5
+#define SINCRONISMO_2 0x5A
+#define TIPO_FLOAT32 1
+#define TIPO_ADC_UINT16 2
+
 // Valores do Resistor de Carga (RL) para cada módulo MQ.
 #define RL_MQ3 10000.0
 #define RL_MQ5 10000.0
@@ -33,8 +52,40 @@ MQUnifiedsensor MQ5(placa, Voltage_Resolution, ADC_Bit_Resolution, pinMQ5, "MQ-5
 MQUnifiedsensor MQ6(placa, Voltage_Resolution, ADC_Bit_Resolution, pinMQ6, "MQ-6");
 MQUnifiedsensor MQ8(placa, Voltage_Resolution, ADC_Bit_Resolution, pinMQ8, "MQ-8");
 
+uint16_t sequenciaQuadro = 0;
+
+// CRC-16/CCITT-FALSE (polinômio 0x1021, valor inicial 0xFFFF), byte a byte
+uint16_t atualizarCRC(uint16_t crc, uint8_t byte) {
+  crc ^= (uint16_t)byte << 8;
+  for (uint8_t i = 0; i < 8; i++) {
+    crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : crc << 1;
+  }
+  return crc;
+}
+
+// Envia um quadro: sincronismo | tipo | sequência | valores | CRC (do tipo, da sequência e dos valores).
+// O AVR é little-endian, então os float32/uint16 já saem na ordem que o Python espera.
+void enviarQuadro(uint8_t tipo, const uint8_t *valores, uint8_t tamanho) {
+  uint8_t cabecalho[3] = {tipo, (uint8_t)(sequenciaQuadro & 0xFF), (uint8_t)(sequenciaQuadro >> 8)};
+  uint16_t crc = 0xFFFF;
+  for (uint8_t i = 0; i < 3; i++) crc = atualizarCRC(crc, cabecalho[i]);
+  for (uint8_t i = 0; i < tamanho; i++) crc = atualizarCRC(crc, valores[i]);
+
+  Serial.write(SINCRONISMO_1);
+  Serial.write(SINCRONISMO_2);
+  Serial.write(cabecalho, 3);
+  Serial.write(valores, tamanho);
+  Serial.write((uint8_t)(crc & 0xFF));
+  Serial.write((uint8_t)(crc >> 8));
+  sequenciaQuadro++;
+}
+
 void setup() {
-  Serial.begin(9600);
+#if MODO_BINARIO
+  Serial.begin(BAUD_BINARIO);
+#else
+  Serial.begin(BAUD_TEXTO);
+#endif
 
   Serial.println("Inicializando Sensores MQ...");
 
@@ -71,6 +122,15 @@ void setup() {
 }
 
 void loop() {
+#if MODO_BINARIO && BINARIO_ADC_BRUTO
+  // Leituras brutas do ADC; a conversão para ppm fica para o computador
+  uint16_t leituras[4] = {
+    (uint16_t)analogRead(pinMQ3), (uint16_t)analogRead(pinMQ5),
+    (uint16_t)analogRead(pinMQ6), (uint16_t)analogRead(pinMQ8)
+  };
+  enviarQuadro(TIPO_ADC_UINT16, (const uint8_t *)leituras, sizeof(leituras));
+  delay(INTERVALO_BINARIO_MS);
+#else
   // Atualiza as leituras dos sensores
   MQ3.update();
   MQ5.update();
@@ -82,6 +142,11 @@ void loop() {
   float mq6_ppm = MQ6.readSensor();
   float mq8_ppm = MQ8.readSensor();
 
+#if MODO_BINARIO
+  float valores[4] = {mq3_ppm, mq5_ppm, mq6_ppm, mq8_ppm};
+  enviarQuadro(TIPO_FLOAT32, (const uint8_t *)valores, sizeof(valores));
+  delay(INTERVALO_BINARIO_MS);
+#else
   // Envia os valores para a porta serial separados por vírgula
   Serial.print(mq3_ppm, 2); Serial.print(",");
   Serial.print(mq5_ppm, 2); Serial.print(",");
@@ -89,4 +154,6 @@ void loop() {
   Serial.println(mq8_ppm, 2);
 
   delay(1000); // Aguarda 1 segundo antes da próxima leitura/envio
+#endif
+#endif
 }
\ No newline at end of file
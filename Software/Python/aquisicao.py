@@ -0,0 +1,428 @@
+# Versões das bibliotecas utilizadas:
+# pyserial: 3.5
+# numpy: 2.3.1
+
+# Subsistema de aquisição de dados da porta serial.
+# - Uma thread leitora drena a porta em blocos (leitura bloqueante, sem time.sleep fixo)
+#   e guarda as leituras em um buffer circular NumPy pré-alocado.
+# - As linhas são validadas e convertidas em lote (vetorizado).
+# - Uma thread gravadora escreve as linhas válidas no CSV (ou na sessão binária .nes)
+#   em lotes, com flush periódico.
+# - Contadores registram bytes lidos, linhas válidas, malformadas e descartadas.
+# - Com a instrumentação ativa (metricas.py), a leitura da porta, a conversão das linhas e
+#   a gravação em disco entram nos histogramas de latência.
+# - Além das linhas de texto do medicao.ino, aceita o protocolo binário com quadros
+#   (protocolo_binario.py). Com protocolo="auto" (padrão), o modo é detectado na
+#   sincronização: o primeiro quadro binário válido (sincronismo + CRC) escolhe o modo
+#   binário; a primeira linha numérica, o modo texto.
+
+import queue
+import threading
+import time
+
+import numpy as np
+import serial
+
+import metricas
+import protocolo_binario
+import sessao_binaria
+from classificador import COLUNAS_SENSORES
+
+N_COLUNAS = len(COLUNAS_SENSORES)
+TAMANHO_MAXIMO_LINHA = 256 # Linhas maiores que isso são consideradas lixo e descartadas
+MAXIMO_AVISOS_MALFORMADAS = 20 # Depois disso, as linhas malformadas só são contadas
+
+# Função para validar e converter um lote de linhas (bytes, sem o '\n') em uma matriz (n x 4).
+# Retorna (valores, linhas_validas, n_malformadas).
+def interpretar_linhas(linhas, n_colunas=N_COLUNAS):
+    candidatas = [linha for linha in linhas if linha.count(b',') == n_colunas - 1]
+    try:
+        # Caminho rápido: todas as linhas candidatas são convertidas de uma só vez
+        valores = np.array(b','.join(candidatas).split(b','), dtype=np.float64) if candidatas else np.empty(0)
+        validas = candidatas
+    except ValueError:
+        # Caminho lento (só quando há alguma linha corrompida no lote): valida linha a linha
+        validas = []
+        campos = []
+        for linha in candidatas:
+            try:
+                campos.extend(float(v) for v in linha.split(b','))
+                validas.append(linha)
+            except ValueError:
+                del campos[len(validas) * n_colunas:]
+        valores = np.array(campos, dtype=np.float64)
+    return valores.reshape(-1, n_colunas), validas, len(linhas) - len(validas)
+
+# Função que diz se uma linha é de dados numéricos (usada na sincronização com o Arduino)
+def linha_numerica(linha):
+    try:
+        list(map(float, linha.split(b',')))
+        return True
+    except ValueError:
+        return False
+
+# Buffer circular pré-alocado com as últimas leituras e o instante de chegada de cada uma.
+# Consumidores (classificação em tempo real, gráficos) leem a partir de um índice próprio.
+class BufferCircular:
+    def __init__(self, capacidade=65536, n_colunas=N_COLUNAS):
+        self.capacidade = capacidade
+        self.valores = np.zeros((capacidade, n_colunas), dtype=np.float64)
+        self.tempos = np.zeros(capacidade, dtype=np.float64)
+        self.total = 0 # Número total de amostras já adicionadas
+        self._lock = threading.Lock()
+
+    def adicionar(self, valores, tempos):
+        n = len(valores)
+        if n == 0:
+            return
+        with self._lock:
+            if n > self.capacidade:
+                # Só as últimas 'capacidade' amostras cabem no buffer
+                self.total += n - self.capacidade
+                valores = valores[-self.capacidade:]
+                tempos = tempos[-self.capacidade:]
+                n = self.capacidade
+            inicio = self.total % self.capacidade
+            primeira_parte = min(n, self.capacidade - inicio)
+            self.valores[inicio:inicio + primeira_parte] = valores[:primeira_parte]
+            self.tempos[inicio:inicio + primeira_parte] = tempos[:primeira_parte]
+            if primeira_parte < n:
+                self.valores[:n - primeira_parte] = valores[primeira_parte:]
+                self.tempos[:n - primeira_parte] = tempos[primeira_parte:]
+            self.total += n
+
+    def limpar(self):
+        with self._lock:
+            self.total = 0
+
+    # Retorna cópias das amostras a partir do índice absoluto 'indice' até a mais recente.
+    # Também retorna o próximo índice a ser lido e quantas amostras foram perdidas
+    # (sobrescritas antes de serem lidas).
+    def desde(self, indice):
+        with self._lock:
+            total = self.total
+            mais_antigo = max(0, total - self.capacidade)
+            perdidas = max(0, mais_antigo - indice)
+            indice = max(indice, mais_antigo)
+            posicoes = np.arange(indice, total) % self.capacidade
+            return self.valores[posicoes], self.tempos[posicoes], total, perdidas
+
+    def ultimos(self, n):
+        with self._lock:
+            inicio = max(0, self.total - min(n, self.capacidade))
+        valores, tempos, _, _ = self.desde(inicio)
+        return valores, tempos
+
+# Linhas de CSV (bytes) dos valores decodificados do protocolo binário, no mesmo formato
+# das linhas de texto do medicao.ino (2 casas decimais)
+def formatar_linhas(valores):
+    return [b"%.2f,%.2f,%.2f,%.2f" % tuple(linha) for linha in valores.tolist()]
+
+# Saída em CSV: grava as linhas exatamente como vieram do Arduino (no modo binário, os
+# valores decodificados são formatados aqui, na thread gravadora)
+class _SaidaCSV:
+    def __init__(self, arquivo_saida, cabecalho, metadados):
+        self._arquivo = open(arquivo_saida, 'wb')
+        self._arquivo.write(cabecalho.encode('utf-8') + b'\n')
+
+    def gravar(self, lotes):
+        self._arquivo.write(b'\n'.join(linha for linhas, valores, _ in lotes
+                                        for linha in (formatar_linhas(valores) if linhas is None else linhas)) + b'\n')
+        self._arquivo.flush()
+
+    def fechar(self):
+        self._arquivo.close()
+
+# Saída em sessão binária (.nes): grava os valores já convertidos, com o tempo de chegada
+class _SaidaBinaria:
+    def __init__(self, arquivo_saida, cabecalho, metadados):
+        self._gravador = sessao_binaria.GravadorSessaoBinaria(arquivo_saida, metadados)
+
+    def gravar(self, lotes):
+        for _, valores, tempos in lotes:
+            self._gravador.adicionar(valores, tempos)
+        self._gravador.flush()
+
+    def fechar(self):
+        self._gravador.fechar()
+
+# Thread que grava as leituras no arquivo em lotes, fazendo flush a cada 'intervalo_flush' segundos.
+# O formato é escolhido pela extensão: '.nes' grava a sessão binária, qualquer outra grava CSV.
+class GravadorLotes(threading.Thread):
+    def __init__(self, arquivo_saida, cabecalho, intervalo_flush=0.5, metadados=None):
+        super().__init__(daemon=True)
+        self.arquivo_saida = arquivo_saida
+        self.cabecalho = cabecalho
+        self.intervalo_flush = intervalo_flush
+        self.metadados = metadados
+        self.lotes_gravados = 0
+        self.erro = None
+        self._fila = queue.SimpleQueue()
+        self._parar = threading.Event()
+
+    # 'linhas': as linhas de texto originais, ou None no modo binário
+    def enviar(self, linhas, valores, tempos):
+        if len(valores):
+            self._fila.put((linhas, valores, tempos))
+
+    def encerrar(self):
+        self._parar.set()
+        self.join()
+        if self.erro is not None:
+            raise self.erro
+
+    def run(self):
+        try:
+            tipo_saida = _SaidaBinaria if sessao_binaria.eh_sessao_binaria(self.arquivo_saida) else _SaidaCSV
+            saida = tipo_saida(self.arquivo_saida, self.cabecalho, self.metadados)
+            try:
+                pendentes = []
+                ultimo_flush = time.monotonic()
+                while True:
+                    try:
+                        pendentes.append(self._fila.get(timeout=self.intervalo_flush))
+                    except queue.Empty:
+                        pass
+                    encerrando = self._parar.is_set()
+                    if encerrando:
+                        # Esvazia o que ainda estiver na fila antes de fechar o arquivo
+                        while not self._fila.empty():
+                            pendentes.append(self._fila.get())
+                    if pendentes and (encerrando or time.monotonic() - ultimo_flush >= self.intervalo_flush):
+                        with metricas.medir("coleta.gravacao_disco"):
+                            saida.gravar(pendentes)
+                        pendentes = []
+                        ultimo_flush = time.monotonic()
+                        self.lotes_gravados += 1
+                    if encerrando:
+                        break
+            finally:
+                saida.fechar()
+        except Exception as e:
+            self.erro = e
+
+# Sessão de aquisição de uma porta serial.
+# 'porta' pode ser o nome da porta (ex.: COM3, /dev/ttyACM0, loop://) ou um objeto serial já aberto.
+# 'ao_mensagem' recebe as mensagens de status (texto) e 'ao_receber' recebe (valores, tempos)
+# de cada lote de leituras válidas. 'parar_global' é um evento opcional compartilhado por
+# várias aquisições (ver gerenciador_dispositivos.py) que encerra todas de uma vez.
+# 'metadados' (ex.: R0 dos sensores) são guardados no cabeçalho quando a saída é '.nes'.
+# 'protocolo': "auto" (padrão), "texto" ou "binario".
+class Aquisicao:
+    def __init__(self, porta, baud_rate, arquivo_saida, ao_mensagem=None, ao_receber=None,
+                 capacidade_buffer=65536, intervalo_flush=0.5, timeout_sincronizacao=10,
+                 espera_inicial=2.0, tamanho_leitura=65536, parar_global=None, metadados=None,
+                 protocolo="auto"):
+        if protocolo not in ("auto", "texto", "binario"):
+            raise ValueError(f"Protocolo desconhecido: {protocolo}")
+        self.porta = porta
+        self.baud_rate = baud_rate
+        self.arquivo_saida = arquivo_saida
+        self.ao_mensagem = ao_mensagem or (lambda texto: None)
+        self.ao_receber = ao_receber
+        self.intervalo_flush = intervalo_flush
+        self.timeout_sincronizacao = timeout_sincronizacao
+        self.espera_inicial = espera_inicial
+        self.tamanho_leitura = tamanho_leitura
+        self.buffer = BufferCircular(capacidade_buffer)
+        self.parar_flag = threading.Event()
+        self.parar_global = parar_global or threading.Event()
+        self.metadados = metadados or {}
+        self.protocolo_pedido = protocolo
+        self.reiniciar()
+
+    # Volta ao estado inicial (estatísticas, buffer e protocolo zerados) para uma nova coleta
+    def reiniciar(self):
+        self.parar_flag.clear()
+        self.buffer.limpar()
+        self.protocolo = self.protocolo_pedido # Depois da sincronização: "texto" ou "binario"
+        self.estado = "parado" # parado, sincronizando, coletando, encerrado ou erro
+        self.estatisticas = {
+            "bytes_lidos": 0,
+            "linhas_validas": 0,
+            "linhas_malformadas": 0,
+            "linhas_descartadas": 0,
+            "quadros_perdidos": 0, # Modo binário: quadros que não chegaram (saltos na sequência, sem os corrompidos)
+            "quadros_corrompidos": 0, # Modo binário: quadros com CRC inválido
+            "lotes_gravados": 0,
+            "inicio": None,
+            "fim": None,
+            "ultima_leitura": None,
+        }
+        self._restante = b''
+        self._decodificador = None
+
+    def _nome_porta(self):
+        return self.porta if isinstance(self.porta, str) else getattr(self.porta, 'name', str(self.porta))
+
+    def _abrir_porta(self):
+        if not isinstance(self.porta, str):
+            return self.porta, False
+        # serial_for_url aceita tanto portas reais quanto URLs do pyserial (loop://, socket://...)
+        arduino = serial.serial_for_url(self.porta, self.baud_rate, timeout=0.1)
+        time.sleep(self.espera_inicial) # Espera o Arduino inicializar e a porta serial realmente abrir
+        return arduino, True
+
+    # Lê o que houver na porta (bloqueia até 'timeout' da porta)
+    def _ler_bytes(self, arduino):
+        with metricas.medir("coleta.leitura_serial"):
+            dados = arduino.read(min(arduino.in_waiting, self.tamanho_leitura) or 1)
+        self.estatisticas["bytes_lidos"] += len(dados)
+        metricas.contar("coleta.bytes", len(dados))
+        return dados
+
+    # Lê o que houver na porta e devolve as linhas completas
+    def _ler_linhas(self, arduino, dados=None):
+        dados = self._ler_bytes(arduino) if dados is None else dados
+        if not dados:
+            return []
+        partes = (self._restante + dados).split(b'\n')
+        self._restante = partes.pop()
+        if len(self._restante) > TAMANHO_MAXIMO_LINHA:
+            self._restante = b''
+            self.estatisticas["linhas_descartadas"] += 1
+        return [linha for linha in (parte.strip() for parte in partes) if linha]
+
+    # Descarta as mensagens de inicialização até encontrar o primeiro quadro binário válido
+    # ou a primeira linha numérica (conforme o protocolo). Retorna as primeiras linhas de
+    # texto, ou os primeiros valores decodificados no modo binário (None se a coleta foi parada
+    # antes da sincronização).
+    def _sincronizar(self, arduino, parar):
+        self.estado = "sincronizando"
+        self.ao_mensagem(f"Tentando sincronizar com o Arduino em {self._nome_porta()}...")
+        decodificador = protocolo_binario.DecodificadorQuadros() if self.protocolo != "texto" else None
+        timeout_start = time.monotonic()
+        while (time.monotonic() - timeout_start < self.timeout_sincronizacao
+               and not parar.is_set() and not self.parar_global.is_set()):
+            dados = self._ler_bytes(arduino)
+            if decodificador is not None:
+                valores, _ = decodificador.decodificar(dados)
+                if len(valores):
+                    self.protocolo = "binario"
+                    # As mensagens de inicialização não contam como bytes corrompidos
+                    decodificador.bytes_descartados = decodificador.quadros_corrompidos = 0
+                    self._decodificador = decodificador
+                    self.ao_mensagem("Sincronizado com os quadros binários do Arduino. Iniciando gravação.")
+                    return valores
+            if self.protocolo == "binario":
+                continue
+            linhas = self._ler_linhas(arduino, dados)
+            for i, linha in enumerate(linhas):
+                # No modo automático, só uma linha com os 4 valores (e não um trecho de quadro binário)
+                if linha_numerica(linha) and (self.protocolo == "texto" or linha.count(b',') == N_COLUNAS - 1):
+                    self.protocolo = "texto"
+                    self.ao_mensagem("Sincronizado com os dados do Arduino. Iniciando gravação.")
+                    return linhas[i:]
+                self.estatisticas["linhas_descartadas"] += 1
+                self.ao_mensagem(f"Descartando linha de inicialização/não-dados: '{linha.decode('utf-8', 'replace')}'")
+        if parar.is_set() or self.parar_global.is_set():
+            return None
+        raise Exception("Não foi possível sincronizar com os dados do Arduino após várias tentativas. Verifique a saída serial do Arduino e a conexão.")
+
+    def _processar(self, linhas, gravador):
+        if not linhas:
+            return
+        with metricas.medir("coleta.interpretacao"):
+            valores, validas, n_malformadas = interpretar_linhas(linhas)
+        metricas.contar("coleta.amostras", len(validas))
+        if n_malformadas:
+            metricas.contar("coleta.linhas_malformadas", n_malformadas)
+            avisos_restantes = MAXIMO_AVISOS_MALFORMADAS - self.estatisticas["linhas_malformadas"]
+            self.estatisticas["linhas_malformadas"] += n_malformadas
+            if avisos_restantes > 0:
+                # Linhas malformadas na ordem em que chegaram (uma linha válida nunca é malformada)
+                conjunto_validas = set(validas)
+                malformadas = [linha for linha in linhas if linha not in conjunto_validas]
+                for linha in malformadas[:avisos_restantes]:
+                    self.ao_mensagem(f"Aviso: Linha não numérica descartada durante a coleta: '{linha.decode('utf-8', 'replace')}'")
+                if n_malformadas >= avisos_restantes:
+                    self.ao_mensagem(f"Aviso: {MAXIMO_AVISOS_MALFORMADAS} linhas malformadas descartadas; "
+                                     f"as próximas serão apenas contadas.")
+        if len(validas) == 0:
+            return
+        self._entregar(validas, valores, gravador)
+
+    # Decodifica os quadros de um bloco de bytes (modo binário)
+    def _processar_quadros(self, dados, gravador):
+        if not dados:
+            return
+        decodificador = self._decodificador
+        perdidos, corrompidos = decodificador.quadros_perdidos, decodificador.quadros_corrompidos
+        with metricas.medir("coleta.interpretacao"):
+            valores, _ = decodificador.decodificar(dados)
+        metricas.contar("coleta.amostras", len(valores))
+        self.estatisticas["quadros_perdidos"] = decodificador.quadros_perdidos
+        self.estatisticas["quadros_corrompidos"] = decodificador.quadros_corrompidos
+        if decodificador.quadros_perdidos > perdidos:
+            metricas.contar("coleta.quadros_perdidos", decodificador.quadros_perdidos - perdidos)
+        if decodificador.quadros_corrompidos > corrompidos:
+            metricas.contar("coleta.quadros_corrompidos", decodificador.quadros_corrompidos - corrompidos)
+        if len(valores):
+            self._entregar(None, valores, gravador)
+
+    # Guarda as leituras válidas no buffer, envia ao gravador e ao consumidor ('ao_receber')
+    def _entregar(self, linhas, valores, gravador):
+        agora = time.time()
+        tempos = np.full(len(valores), agora)
+        self.buffer.adicionar(valores, tempos)
+        gravador.enviar(linhas, valores, tempos)
+        self.estatisticas["linhas_validas"] += len(valores)
+        self.estatisticas["ultima_leitura"] = agora
+        if self.ao_receber is not None:
+            self.ao_receber(valores, tempos)
+
+    # Executa a coleta na thread atual até 'parar_flag' (ou 'parar_externo') ser sinalizado
+    def executar(self, parar_externo=None):
+        parar = parar_externo or self.parar_flag
+        if parar_externo is not None:
+            self.parar_flag = parar_externo
+        try:
+            estatisticas = self._executar(parar)
+        except Exception:
+            self.estado = "erro"
+            raise
+        self.estado = "encerrado"
+        return estatisticas
+
+    def _executar(self, parar):
+        arduino, fechar_porta = self._abrir_porta()
+        try:
+            primeiras = self._sincronizar(arduino, parar)
+            if primeiras is None:
+                self.ao_mensagem("Coleta interrompida antes da sincronização; nenhum dado foi gravado.")
+                return self.estatisticas
+            metadados = {"porta": self._nome_porta(), "baud_rate": self.baud_rate, "protocolo": self.protocolo, **self.metadados}
+            gravador = GravadorLotes(self.arquivo_saida, ",".join(COLUNAS_SENSORES), self.intervalo_flush, metadados)
+            gravador.start()
+            self.ao_mensagem(f"Coletando dados em {self._nome_porta()}... Pressione 'Parar Coleta' ou feche a janela para encerrar.")
+            self.estatisticas["inicio"] = time.time()
+            self.estado = "coletando"
+            try:
+                if self.protocolo == "binario":
+                    self._entregar(None, primeiras, gravador)
+                    while not parar.is_set() and not self.parar_global.is_set():
+                        self._processar_quadros(self._ler_bytes(arduino), gravador)
+                else:
+                    self._processar(primeiras, gravador)
+                    while not parar.is_set() and not self.parar_global.is_set():
+                        self._processar(self._ler_linhas(arduino), gravador)
+            finally:
+                gravador.encerrar()
+                self.estatisticas["lotes_gravados"] = gravador.lotes_gravados
+                self.estatisticas["fim"] = time.time()
+        finally:
+            if fechar_porta:
+                arduino.close()
+        self.ao_mensagem(f"Gravação encerrada. Dados salvos em {self.arquivo_saida}")
+        return self.estatisticas
+
+    def parar(self):
+        self.parar_flag.set()
+
+    # Amostras válidas por segundo desde o início da gravação
+    def taxa_amostras(self):
+        inicio = self.estatisticas["inicio"]
+        if inicio is None:
+            return 0.0
+        fim = self.estatisticas["fim"] or time.time()
+        return self.estatisticas["linhas_validas"] / max(fim - inicio, 1e-9)
@@ -0,0 +1,133 @@
+# Versões das bibliotecas utilizadas:
+# pandas: 2.3.0
+# joblib: 1.5.1
+# numpy: 2.3.1
+
+# Pacote de artefatos do modelo (modelo, scaler, classes e perfis médios normalizados),
+# gerado pelo treinamento.py e mantido em cache na memória pela interface.
+# Com ele, a análise não precisa mais ler o dataset de treinamento.
+# O artefato compacto (.nef, gerado pelo compactacao.py) é aceito no lugar do .pkl.
+
+import hashlib
+import os
+import pickle
+import threading
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+import compactacao
+import metricas
+from classificador import COLUNAS_SENSORES
+
+VERSAO_ARTEFATO = 1
+ARQUIVO_ARTEFATO = "artefato_nariz_eletronico.pkl"
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+# Função para calcular os perfis médios de cada classe, já normalizados pelo scaler.
+# Retorna uma matriz (n_classes x n_sensores) na mesma ordem de 'classes'.
+def calcular_centroides_normalizados(X, y, scaler, classes):
+    perfis = pd.DataFrame(np.asarray(X, dtype=float), columns=COLUNAS_SENSORES).groupby(np.asarray(y)).mean()
+    centroides = np.full((len(classes), len(COLUNAS_SENSORES)), np.nan)
+    for i, classe in enumerate(classes):
+        if classe in perfis.index:
+            centroides[i] = scaler.transform(perfis.loc[[classe]].values)[0]
+    return centroides
+
+# Hash do conteúdo do artefato (modelo, scaler e centroides)
+def calcular_hash(modelo, scaler, centroides):
+    h = hashlib.sha256()
+    h.update(pickle.dumps(modelo, protocol=5))
+    h.update(pickle.dumps(scaler, protocol=5))
+    h.update(np.ascontiguousarray(centroides).tobytes())
+    return h.hexdigest()
+
+# Função para montar o pacote de artefatos a partir do modelo treinado
+def criar_artefato(modelo, scaler, X, y):
+    classes = [str(c) for c in modelo.classes_]
+    centroides = calcular_centroides_normalizados(X, y, scaler, list(modelo.classes_))
+    return {
+        "versao": VERSAO_ARTEFATO,
+        "modelo": modelo,
+        "scaler": scaler,
+        "classes": classes,
+        "colunas": list(COLUNAS_SENSORES),
+        "centroides_norm": centroides,
+        "hash": calcular_hash(modelo, scaler, centroides),
+        "criado_em": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+def salvar_artefato(artefato, caminho=ARQUIVO_ARTEFATO):
+    joblib.dump(artefato, caminho)
+
+# Assinatura usada para invalidar o cache quando o arquivo muda em disco
+def _assinatura(caminhos):
+    return tuple((os.stat(c).st_mtime_ns, os.stat(c).st_size) for c in caminhos)
+
+# Função para carregar o pacote de artefatos, reaproveitando o cache em memória
+# enquanto o arquivo não for alterado (data de modificação/tamanho e hash).
+def carregar_artefato(caminho=ARQUIVO_ARTEFATO):
+    chave = (os.path.abspath(caminho),)
+    assinatura = _assinatura(chave)
+    with _cache_lock:
+        em_cache = _cache.get(chave)
+        if em_cache is not None and em_cache[0] == assinatura:
+            return em_cache[1]
+
+    with metricas.medir("modelo.carregar"):
+        if compactacao.eh_artefato_compacto(caminho):
+            artefato = compactacao.carregar_compacto(caminho)
+        else:
+            artefato = joblib.load(caminho)
+    if not isinstance(artefato, dict) or artefato.get("versao") != VERSAO_ARTEFATO:
+        raise ValueError(f"O arquivo '{caminho}' não é um pacote de artefatos compatível (versão esperada: {VERSAO_ARTEFATO}).")
+
+    with _cache_lock:
+        # Se o conteúdo for o mesmo (apenas o arquivo foi reescrito), mantém o objeto já carregado
+        if em_cache is not None and em_cache[1]["hash"] == artefato["hash"]:
+            artefato = em_cache[1]
+        _cache[chave] = (assinatura, artefato)
+    return artefato
+
+# Compatibilidade com instalações antigas: monta o pacote a partir do modelo e scaler
+# salvos separadamente e do dataset de treinamento (também mantido em cache).
+def carregar_artefato_legado(modelo_arquivo, scaler_arquivo, dataset_arquivo="dataset_nariz_eletronico.csv"):
+    chave = tuple(os.path.abspath(c) for c in (modelo_arquivo, scaler_arquivo, dataset_arquivo))
+    assinatura = _assinatura(chave)
+    with _cache_lock:
+        em_cache = _cache.get(chave)
+        if em_cache is not None and em_cache[0] == assinatura:
+            return em_cache[1]
+
+    with metricas.medir("modelo.carregar"):
+        modelo = joblib.load(modelo_arquivo)
+        scaler = joblib.load(scaler_arquivo)
+    dataset = pd.read_csv(dataset_arquivo)
+    if 'Tipo_álcool' in dataset.columns:
+        dataset = dataset.rename(columns={'Tipo_álcool': 'alcool'})
+    artefato = criar_artefato(modelo, scaler, dataset[COLUNAS_SENSORES].values, dataset['alcool'].values)
+
+    with _cache_lock:
+        _cache[chave] = (assinatura, artefato)
+    return artefato
+
+def limpar_cache():
+    with _cache_lock:
+        _cache.clear()
+
+# Função usada pela interface: prefere o pacote de artefatos e, se ele não existir,
+# recorre aos arquivos separados do modelo e do scaler. Se houver um artefato compacto
+# (mesmo nome, extensão .nef) pelo menos tão novo quanto o pacote, ele é usado no lugar.
+def obter_artefato(artefato_arquivo=ARQUIVO_ARTEFATO, modelo_arquivo="modelo_nariz_eletronico.pkl",
+                   scaler_arquivo="scaler_nariz_eletronico.pkl", dataset_arquivo="dataset_nariz_eletronico.csv"):
+    compacto = os.path.splitext(artefato_arquivo)[0] + compactacao.EXTENSAO
+    if compacto != artefato_arquivo and os.path.exists(compacto) and \
+            (not os.path.exists(artefato_arquivo) or os.path.getmtime(compacto) >= os.path.getmtime(artefato_arquivo)):
+        return carregar_artefato(compacto)
+    if os.path.exists(artefato_arquivo):
+        return carregar_artefato(artefato_arquivo)
+    return carregar_artefato_legado(modelo_arquivo, scaler_arquivo, dataset_arquivo)
@@ -0,0 +1,105 @@
+# Medição da vazão da aquisição serial usando o Arduino virtual (sem hardware).
+# Compara o subsistema de aquisição (aquisicao.py) com o laço antigo da interface
+# (readline + time.sleep(0.05) por linha).
+#
+# Com --protocolo binario, o Arduino virtual envia quadros do protocolo binário
+# (protocolo_binario.py) e a aquisição nova é medida também nesse modo.
+#
+# Exemplo de uso:
+#   python benchmark_aquisicao.py --duracao 5 --taxa 0 --malformadas 0.01
+#   python benchmark_aquisicao.py --duracao 5 --taxa 0 --protocolo binario --perdidas 0.001
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+import aquisicao
+from porta_virtual import ArduinoVirtual
+
+# Laço de leitura equivalente ao coletar_dados original, só para comparação
+def _laco_antigo(arduino, arquivo_saida, parar):
+    linhas = 0
+    with open(arquivo_saida, 'w') as f:
+        while not parar.is_set():
+            if arduino.in_waiting > 0:
+                linha = arduino.readline().decode('utf-8').strip()
+                if linha:
+                    try:
+                        list(map(float, linha.split(',')))
+                        f.write(linha + '\n')
+                        linhas += 1
+                    except ValueError:
+                        pass
+            time.sleep(0.05)
+    return linhas
+
+def medir_aquisicao(duracao, taxa, proporcao_malformadas, diretorio, protocolo="texto", proporcao_perdidas=0.0):
+    virtual = ArduinoVirtual(taxa_amostras=taxa or None, proporcao_malformadas=proporcao_malformadas,
+                             protocolo=protocolo, proporcao_perdidas=proporcao_perdidas).iniciar()
+    coleta = aquisicao.Aquisicao(virtual.porta, 115200, os.path.join(diretorio, f"bench_{protocolo}.csv"), espera_inicial=0)
+    thread = threading.Thread(target=coleta.executar, daemon=True)
+    thread.start()
+    time.sleep(duracao)
+    coleta.parar()
+    thread.join()
+    virtual.fechar()
+    resultado = dict(coleta.estatisticas)
+    resultado["amostras_por_segundo"] = coleta.taxa_amostras()
+    resultado["enviadas"] = virtual.enviadas
+    resultado["malformadas_enviadas"] = virtual.malformadas
+    resultado["perdidas_enviadas"] = virtual.perdidas
+    resultado["protocolo"] = coleta.protocolo
+    return resultado
+
+def medir_laco_antigo(duracao, taxa, diretorio):
+    import serial
+    virtual = ArduinoVirtual(taxa_amostras=taxa or None).iniciar()
+    arduino = virtual.porta if virtual.usar_loop else serial.Serial(virtual.porta, 115200)
+    parar = threading.Event()
+    resultado = {}
+    thread = threading.Thread(target=lambda: resultado.update(linhas=_laco_antigo(arduino, os.path.join(diretorio, "bench_antigo.csv"), parar)), daemon=True)
+    inicio = time.perf_counter()
+    thread.start()
+    time.sleep(duracao)
+    parar.set()
+    thread.join()
+    if not virtual.usar_loop:
+        arduino.close()
+    virtual.fechar()
+    return {"linhas_validas": resultado["linhas"], "amostras_por_segundo": resultado["linhas"] / (time.perf_counter() - inicio)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da aquisição serial com Arduino virtual.")
+    parser.add_argument("--duracao", type=float, default=5.0, help="Duração de cada medição (s)")
+    parser.add_argument("--taxa", type=float, default=0, help="Linhas por segundo do Arduino virtual (0 = máxima)")
+    parser.add_argument("--malformadas", type=float, default=0.0, help="Fração de linhas corrompidas")
+    parser.add_argument("--protocolo", choices=["texto", "binario"], default="texto",
+                        help="Formato enviado pelo Arduino virtual à aquisição nova")
+    parser.add_argument("--perdidas", type=float, default=0.0, help="Fração de quadros binários não enviados")
+    parser.add_argument("--saida", default=None, help="Arquivo JSON com os resultados")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        novo = medir_aquisicao(args.duracao, args.taxa, args.malformadas, diretorio, args.protocolo, args.perdidas)
+        antigo = medir_laco_antigo(args.duracao, args.taxa, diretorio)
+
+    if novo["protocolo"] == "binario":
+        print(f"Aquisição nova (binário): {novo['amostras_por_segundo']:.0f} amostras/s "
+              f"({novo['linhas_validas']} válidas, {novo['quadros_corrompidos']} com CRC inválido, "
+              f"{novo['quadros_perdidos']} quadros perdidos, {novo['bytes_lidos'] / max(novo['linhas_validas'], 1):.1f} bytes/leitura)")
+    else:
+        print(f"Aquisição nova:  {novo['amostras_por_segundo']:.0f} amostras/s "
+              f"({novo['linhas_validas']} válidas, {novo['linhas_malformadas']} malformadas, "
+              f"{novo['linhas_descartadas']} descartadas, {novo['lotes_gravados']} lotes gravados, "
+              f"{novo['bytes_lidos'] / max(novo['linhas_validas'], 1):.1f} bytes/leitura)")
+    print(f"Laço antigo:     {antigo['amostras_por_segundo']:.0f} amostras/s ({antigo['linhas_validas']} válidas)")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump({"aquisicao": novo, "laco_antigo": antigo, "parametros": vars(args)}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# Comparação de latência entre o predict_proba do scikit-learn e a floresta achatada
+# (floresta_plana.py) para lotes de 1 a 10 mil linhas.
+# Usa o modelo do pacote de artefatos; sem ele, treina uma floresta sintética do tamanho
+# máximo da busca do treinamento.py (500 árvores, profundidade até 50).
+#
+# Exemplo de uso:
+#   python benchmark_floresta_plana.py --saida benchmark_floresta.json
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+import artefatos
+from floresta_plana import FlorestaPlana
+
+TAMANHOS_LOTE = [1, 2, 5, 10, 20, 100, 1000, 10000]
+
+def _modelo_sintetico():
+    from sklearn.ensemble import RandomForestClassifier
+    rng = np.random.default_rng(42)
+    centros = rng.random((3, 4))
+    y = rng.integers(0, 3, 3000)
+    X = centros[y] + rng.normal(0, 0.15, (3000, 4))
+    modelo = RandomForestClassifier(n_estimators=500, max_depth=50, min_samples_leaf=1, random_state=42).fit(X, y)
+    return modelo, X
+
+def _medir(funcao, X, repeticoes):
+    funcao(X) # Aquecimento
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(X)
+        tempos.append(time.perf_counter() - inicio)
+    return float(np.median(tempos))
+
+def main():
+    parser = argparse.ArgumentParser(description="Latência do predict_proba: scikit-learn x floresta achatada.")
+    parser.add_argument("--artefato", default=artefatos.ARQUIVO_ARTEFATO)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--saida", default=None, help="Arquivo JSON com os resultados")
+    args = parser.parse_args()
+
+    if os.path.exists(args.artefato):
+        artefato = artefatos.carregar_artefato(args.artefato)
+        modelo = artefato["modelo"]
+        # Leituras em torno dos perfis médios das classes, na escala normalizada
+        centros = artefato["centroides_norm"][~np.isnan(artefato["centroides_norm"]).any(axis=1)]
+        rng = np.random.default_rng(0)
+        X_base = centros[rng.integers(0, len(centros), 10000)] + rng.normal(0, 0.05, (10000, centros.shape[1]))
+        origem = args.artefato
+    else:
+        modelo, X_base = _modelo_sintetico()
+        origem = "floresta sintética (500 árvores)"
+
+    inicio = time.perf_counter()
+    plana = FlorestaPlana.de_floresta(modelo)
+    tempo_exportacao = time.perf_counter() - inicio
+    print(f"Modelo: {origem} - {plana.n_arvores} árvores, {len(plana.feature)} nós, "
+          f"profundidade máxima {plana.profundidade_maxima} (exportação: {tempo_exportacao * 1000:.1f} ms)")
+
+    resultados = []
+    print(f"{'lote':>6} {'sklearn (ms)':>13} {'plana (ms)':>11} {'aceleração':>11} {'idêntico':>9}")
+    for tamanho in TAMANHOS_LOTE:
+        X = X_base[:tamanho]
+        repeticoes = max(3, args.repeticoes if tamanho <= 1000 else args.repeticoes // 4)
+        t_sklearn = _medir(modelo.predict_proba, X, repeticoes)
+        t_plana = _medir(plana.predict_proba, X, repeticoes)
+        identico = bool(np.array_equal(modelo.predict_proba(X), plana.predict_proba(X)))
+        resultados.append({"lote": tamanho, "sklearn_ms": t_sklearn * 1000, "plana_ms": t_plana * 1000,
+                           "aceleracao": t_sklearn / t_plana, "identico": identico})
+        print(f"{tamanho:>6} {t_sklearn * 1000:>13.3f} {t_plana * 1000:>11.3f} {t_sklearn / t_plana:>10.1f}x {str(identico):>9}")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump({"modelo": origem, "n_arvores": plana.n_arvores, "n_nos": int(len(plana.feature)),
+                       "resultados": resultados}, f, indent=2, ensure_ascii=False)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# Memória e tempo de redesenho dos gráficos ao longo de centenas de análises seguidas.
+# Compara o comportamento antigo da interface (uma figura nova do pyplot a cada análise,
+# nunca fechada) com os gráficos persistentes (graficos.GraficoPerfil/GraficoConfianca,
+# atualizados no lugar com blitting). As figuras são desenhadas sem tela (backend Agg).
+# Usa o modelo de referência sintético do benchmark_suite.py.
+# Também mede o gráfico ao vivo das leituras (graficos.GraficoSensores + decimacao): o tempo de
+# uma atualização depois de sessões de 1 minuto a 12 horas deve ficar praticamente constante.
+#
+# Exemplo de uso:
+#   python benchmark_graficos.py --analises 300 --saida benchmark_graficos.json
+
+import argparse
+import gc
+import json
+import os
+import time
+import warnings
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+import classificador
+import dados_sinteticos
+import decimacao
+import graficos
+from benchmark_suite import modelo_referencia
+
+# Memória residente do processo (MB)
+def _memoria_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError, AttributeError):
+        import resource # Fora do Linux: pico de memória (ru_maxrss em KB no Linux, bytes no macOS)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+# Sessões e resultados das análises (calculados antes, fora da medição)
+def _analises(artefato, n, linhas):
+    sessoes = []
+    for valores, _, _ in dados_sinteticos.gerar_blocos(n * linhas, linhas_por_sessao=linhas, tamanho_bloco=linhas, semente=4):
+        dados = pd.DataFrame(valores, columns=classificador.COLUNAS_SENSORES)
+        resultado = classificador.classificar_dados(dados, artefato["modelo"], artefato["scaler"])
+        sessoes.append((dados, pd.Series(resultado["probabilidades"]), resultado["substancia"]))
+    return sessoes
+
+def _medir(analisar, sessoes):
+    gc.collect()
+    memoria_inicial = _memoria_mb()
+    tempos = []
+    memorias = []
+    for dados, confianca, substancia in sessoes:
+        inicio = time.perf_counter()
+        analisar(dados, confianca, substancia)
+        tempos.append(time.perf_counter() - inicio)
+        memorias.append(_memoria_mb())
+    n = len(tempos)
+    decimo = max(1, n // 10)
+    return {
+        "memoria_inicial_mb": memoria_inicial,
+        "memoria_final_mb": memorias[-1],
+        "crescimento_memoria_mb": memorias[-1] - memoria_inicial,
+        "tempo_medio_ms": float(np.mean(tempos)) * 1000,
+        "tempo_mediano_ms": float(np.median(tempos)) * 1000,
+        "tempo_primeiras_ms": float(np.mean(tempos[:decimo])) * 1000,
+        "tempo_ultimas_ms": float(np.mean(tempos[-decimo:])) * 1000,
+        "figuras_pyplot_abertas": len(plt.get_fignums()),
+        "memoria_mb": memorias,
+        "tempos_ms": [t * 1000 for t in tempos],
+    }
+
+# Tempo de atualização do gráfico ao vivo depois de 'n_amostras' amostras já recebidas
+# (cada atualização recebe 'novas' amostras, como em um quadro da interface)
+def _medir_grafico_sensores(n_amostras, atualizacoes=50, novas=2):
+    valores, tempos, _ = next(dados_sinteticos.gerar_blocos(n_amostras + atualizacoes * novas, linhas_por_sessao=43200,
+                                                           tamanho_bloco=n_amostras + atualizacoes * novas, semente=5))
+    grafico = graficos.GraficoSensores()
+    decimador = decimacao.DecimadorMinMax()
+    decimador.adicionar(valores[:n_amostras], tempos[:n_amostras])
+    grafico.atualizar(*decimador.serie(), decimador.tempo_inicial)
+    duracoes = []
+    for i in range(n_amostras, n_amostras + atualizacoes * novas, novas):
+        inicio = time.perf_counter()
+        decimador.adicionar(valores[i:i + novas], tempos[i:i + novas])
+        grafico.atualizar(*decimador.serie(), decimador.tempo_inicial)
+        duracoes.append(time.perf_counter() - inicio)
+    return {
+        "amostras": n_amostras,
+        "pontos_por_sensor": len(decimacao.pontos(*decimador.serie())[0]),
+        "tempo_mediano_ms": float(np.median(duracoes)) * 1000,
+        "tempo_maximo_ms": float(np.max(duracoes)) * 1000,
+        "redesenhos_completos": grafico.redesenhos_completos,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Memória e tempo de redesenho dos gráficos em análises seguidas.")
+    parser.add_argument("--analises", type=int, default=300)
+    parser.add_argument("--linhas", type=int, default=600, help="Leituras por sessão analisada")
+    parser.add_argument("--amostras-sensores", type=int, nargs="+", default=[60, 3600, 43200, 1_000_000],
+                        help="Tamanhos de sessão (amostras) para o gráfico ao vivo das leituras")
+    parser.add_argument("--saida", default=None, help="Arquivo JSON com os resultados")
+    args = parser.parse_args()
+
+    artefato = modelo_referencia()
+    sessoes = _analises(artefato, args.analises, args.linhas)
+
+    # Comportamento antigo: figuras novas a cada análise, desenhadas e nunca fechadas
+    def antigo(dados, confianca, substancia):
+        graficos.figura_perfil_sensores(dados, artefato, substancia).canvas.draw()
+        graficos.figura_confianca_predicao(confianca, substancia).canvas.draw()
+
+    perfil = graficos.GraficoPerfil()
+    barras = graficos.GraficoConfianca()
+
+    def persistente(dados, confianca, substancia):
+        perfil.atualizar(dados, artefato, substancia)
+        barras.atualizar(confianca, substancia)
+
+    # O persistente é medido primeiro, para não herdar a memória das figuras antigas
+    resultado_persistente = _medir(persistente, sessoes)
+    resultado_persistente["redesenhos_completos"] = perfil.redesenhos_completos + barras.redesenhos_completos
+    resultado_persistente["redesenhos_parciais"] = perfil.redesenhos_parciais + barras.redesenhos_parciais
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning) # Aviso de "mais de 20 figuras abertas"
+        resultado_antigo = _medir(antigo, sessoes)
+    plt.close('all')
+
+    for nome, r in (("antigo", resultado_antigo), ("persistente", resultado_persistente)):
+        print(f"{nome:>12}: {r['tempo_mediano_ms']:7.1f} ms por análise (primeiras {r['tempo_primeiras_ms']:.1f} ms, "
+              f"últimas {r['tempo_ultimas_ms']:.1f} ms), memória {r['memoria_inicial_mb']:.0f} -> "
+              f"{r['memoria_final_mb']:.0f} MB (+{r['crescimento_memoria_mb']:.1f} MB), "
+              f"{r['figuras_pyplot_abertas']} figuras do pyplot abertas")
+    print(f"Persistente: {resultado_persistente['redesenhos_completos']} redesenhos completos, "
+          f"{resultado_persistente['redesenhos_parciais']} parciais (blitting)")
+
+    resultado_sensores = [_medir_grafico_sensores(n) for n in args.amostras_sensores]
+    for r in resultado_sensores:
+        print(f"Gráfico ao vivo, {r['amostras']:>9} amostras: {r['tempo_mediano_ms']:5.1f} ms por atualização "
+              f"(máx. {r['tempo_maximo_ms']:.1f} ms), {r['pontos_por_sensor']} pontos por sensor")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump({"analises": args.analises, "linhas_por_sessao": args.linhas,
+                       "antigo": resultado_antigo, "persistente": resultado_persistente,
+                       "grafico_sensores": resultado_sensores}, f, indent=2, ensure_ascii=False)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+# Conjunto de benchmarks de ponta a ponta com dados sintéticos (dados_sinteticos.py), sem o
+# dataset real e sem o Arduino. Etapas medidas:
+#   leitura     - leitura de uma sessão CSV (e da mesma sessão em .nes)
+#   scaler      - MinMaxScaler.transform
+#   predicao    - classificação de uma sessão longa (predict_proba + decisão)
+#   graficos    - figuras radar e de barras, novas e persistentes (backend Agg)
+#   busca       - busca de hiperparâmetros (aleatória e successive halving)
+#   aquisicao   - leitura serial com o Arduino virtual
+#
+# Os resultados são gravados em JSON. Com --comparar, os tempos (campos terminados em '_s')
+# são comparados com os de um resultado anterior e as regressões acima da tolerância são
+# apontadas (o script termina com código 1).
+#
+# Exemplo de uso:
+#   python benchmark_suite.py --linhas 1e6 --saida bench_v2.json --comparar bench_v1.json
+#   python benchmark_suite.py --etapas leitura predicao --linhas 1e7
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use("Agg") # Sem tela: as figuras são apenas desenhadas em memória
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import sklearn
+from scipy.stats import randint
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import MinMaxScaler
+
+import artefatos
+import busca_retomavel
+import classificador
+import dados_sinteticos
+import graficos
+from benchmark_aquisicao import medir_aquisicao
+
+ETAPAS = ["leitura", "scaler", "predicao", "graficos", "busca", "aquisicao"]
+
+# Mesmo espaço de busca do treinamento.py
+PARAM_DISTRIBUTIONS = {
+    'n_estimators': randint(low=50, high=500),
+    'max_features': ['sqrt', 'log2', None],
+    'max_depth': randint(low=5, high=50),
+    'min_samples_split': randint(low=2, high=20),
+    'min_samples_leaf': randint(low=1, high=10),
+    'bootstrap': [True, False]
+}
+
+def _cronometrar(funcao, repeticoes=3):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return float(np.median(tempos)), resultado
+
+# Modelo de referência treinado com dados sintéticos (fixo, para que os resultados de
+# versões diferentes sejam comparáveis)
+def modelo_referencia(n_treino=20000, n_arvores=200):
+    dados = dados_sinteticos.gerar_dataset(n_treino, linhas_por_sessao=200, semente=1)
+    X = dados[classificador.COLUNAS_SENSORES].values
+    y = dados["Tipo_álcool"].values
+    scaler = MinMaxScaler().fit(X)
+    modelo = RandomForestClassifier(n_estimators=n_arvores, random_state=42).fit(scaler.transform(X), y)
+    return artefatos.criar_artefato(modelo, scaler, X, y)
+
+def medir_leitura(n_linhas, diretorio, repeticoes):
+    arquivo_csv = os.path.join(diretorio, "sessao.csv")
+    arquivo_nes = os.path.join(diretorio, "sessao.nes")
+    dados_sinteticos.gravar(arquivo_csv, n_linhas, rotulado=False)
+    dados_sinteticos.gravar(arquivo_nes, n_linhas)
+    t_csv, _ = _cronometrar(lambda: classificador.ler_csv_amostra(arquivo_csv), repeticoes)
+    t_nes, _ = _cronometrar(lambda: classificador.ler_amostra(arquivo_nes), repeticoes)
+    return {
+        "linhas": n_linhas,
+        "csv_s": t_csv,
+        "csv_linhas_por_segundo": n_linhas / t_csv,
+        "csv_mb": os.path.getsize(arquivo_csv) / 1e6,
+        "nes_s": t_nes,
+        "nes_linhas_por_segundo": n_linhas / t_nes,
+        "nes_mb": os.path.getsize(arquivo_nes) / 1e6,
+    }
+
+def _sessao_longa(n_linhas, classe="etanol"):
+    valores = np.concatenate([b[0] for b in dados_sinteticos.gerar_blocos(n_linhas, classes=[classe], semente=2)])
+    return pd.DataFrame(valores, columns=classificador.COLUNAS_SENSORES)
+
+def medir_scaler(artefato, dados, repeticoes):
+    valores = dados.values
+    t, _ = _cronometrar(lambda: artefato["scaler"].transform(valores), repeticoes)
+    return {"linhas": len(valores), "transform_s": t, "linhas_por_segundo": len(valores) / t}
+
+def medir_predicao(artefato, dados, repeticoes):
+    t, resultado = _cronometrar(lambda: classificador.classificar_dados(dados, artefato["modelo"], artefato["scaler"]), repeticoes)
+    return {
+        "linhas": len(dados),
+        "n_arvores": len(artefato["modelo"].estimators_),
+        "classificacao_s": t,
+        "linhas_por_segundo": len(dados) / t,
+        "substancia": resultado["substancia"],
+    }
+
+def medir_graficos(artefato, dados, repeticoes):
+    resultado = classificador.classificar_dados(dados, artefato["modelo"], artefato["scaler"])
+    confianca = pd.Series(resultado["probabilidades"])
+
+    def radar():
+        fig = graficos.figura_perfil_sensores(dados, artefato, resultado["substancia"])
+        fig.canvas.draw()
+        plt.close(fig)
+
+    def barras():
+        fig = graficos.figura_confianca_predicao(confianca, resultado["substancia"])
+        fig.canvas.draw()
+        plt.close(fig)
+
+    # Gráficos persistentes (como na interface): só os dados são atualizados a cada análise
+    perfil = graficos.GraficoPerfil()
+    grafico_barras = graficos.GraficoConfianca()
+    perfil.atualizar(dados, artefato, resultado["substancia"])
+    grafico_barras.atualizar(confianca, resultado["substancia"])
+
+    radar() # Aquecimento (fontes, cache do matplotlib)
+    t_radar, _ = _cronometrar(radar, repeticoes)
+    t_barras, _ = _cronometrar(barras, repeticoes)
+    t_radar_persistente, _ = _cronometrar(lambda: perfil.atualizar(dados, artefato, resultado["substancia"]), repeticoes)
+    t_barras_persistente, _ = _cronometrar(lambda: grafico_barras.atualizar(confianca, resultado["substancia"]), repeticoes)
+    return {"linhas": len(dados), "radar_s": t_radar, "barras_s": t_barras,
+            "radar_persistente_s": t_radar_persistente, "barras_persistente_s": t_barras_persistente}
+
+def medir_busca(n_linhas, iteracoes):
+    dados = dados_sinteticos.gerar_dataset(n_linhas, linhas_por_sessao=200, semente=3)
+    X = MinMaxScaler().fit_transform(dados[classificador.COLUNAS_SENSORES].values)
+    y = dados["Tipo_álcool"].values
+    resultado = {"linhas": n_linhas, "candidatos": iteracoes}
+    for metodo, busca in (("aleatoria", busca_retomavel.busca_aleatoria), ("halving", busca_retomavel.busca_halving)):
+        kwargs = {"n_iter": iteracoes} if metodo == "aleatoria" else {"n_candidatos": iteracoes}
+        r = busca(X, y, PARAM_DISTRIBUTIONS, cv=5, verbose=0, **kwargs)
+        resultado[f"{metodo}_s"] = r["tempo_total"]
+        resultado[f"{metodo}_melhor_score"] = r["melhor_score"]
+        resultado[f"{metodo}_arvores_ajustadas"] = r["arvores_ajustadas"]
+    return resultado
+
+def medir_ingestao(duracao, diretorio):
+    r = medir_aquisicao(duracao, 0, 0.0, diretorio)
+    # O tempo por amostra entra na comparação entre versões (menor é melhor)
+    return {"duracao": duracao, "amostras_por_segundo": r["amostras_por_segundo"], "linhas_validas": r["linhas_validas"],
+            "por_amostra_s": 1.0 / r["amostras_por_segundo"] if r["amostras_por_segundo"] else None}
+
+def _versao_codigo():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+# Compara os tempos ('_s') com um resultado anterior; retorna a lista de regressões
+def comparar(atual, anterior, tolerancia):
+    regressoes = []
+    for etapa, medidas in atual["resultados"].items():
+        medidas_anteriores = anterior.get("resultados", {}).get(etapa)
+        if not medidas_anteriores:
+            continue
+        for chave, valor in medidas.items():
+            valor_anterior = medidas_anteriores.get(chave)
+            if not chave.endswith("_s") or not valor or not valor_anterior:
+                continue
+            razao = valor / valor_anterior
+            marca = "REGRESSÃO" if razao > 1 + tolerancia else ""
+            print(f"{etapa:>10} {chave:<20} {valor_anterior:>12.4g} -> {valor:>12.4g}  {razao:>6.2f}x  {marca}")
+            if marca:
+                regressoes.append({"etapa": etapa, "medida": chave, "anterior": valor_anterior, "atual": valor, "razao": razao})
+    return regressoes
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de ponta a ponta com dados sintéticos.")
+    parser.add_argument("--etapas", nargs="+", choices=ETAPAS, default=ETAPAS)
+    parser.add_argument("--linhas", type=lambda s: int(float(s)), default=100_000,
+                        help="Tamanho da sessão usada na leitura, no scaler, na predição e nos gráficos (ex.: 1e6)")
+    parser.add_argument("--linhas-busca", type=lambda s: int(float(s)), default=3000, help="Tamanho do dataset da busca")
+    parser.add_argument("--iteracoes-busca", type=int, default=10, help="Candidatos avaliados em cada busca")
+    parser.add_argument("--duracao-aquisicao", type=float, default=3.0, help="Duração da medição da aquisição (s)")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--saida", default="benchmark_suite.json", help="Arquivo JSON com os resultados")
+    parser.add_argument("--comparar", default=None, help="Resultado anterior (JSON) para comparação")
+    parser.add_argument("--tolerancia", type=float, default=0.15, help="Aumento relativo de tempo tolerado")
+    args = parser.parse_args()
+
+    saida = {
+        "versao_codigo": _versao_codigo(),
+        "data": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "plataforma": {"sistema": platform.platform(), "processador": platform.processor(), "cpus": os.cpu_count(),
+                       "python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+                       "scikit-learn": sklearn.__version__, "matplotlib": matplotlib.__version__},
+        "parametros": vars(args),
+        "resultados": {},
+    }
+    resultados = saida["resultados"]
+    etapas_com_modelo = {"scaler", "predicao", "graficos"} & set(args.etapas)
+    if etapas_com_modelo:
+        artefato = modelo_referencia()
+        sessao = _sessao_longa(args.linhas)
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        for etapa in args.etapas:
+            inicio = time.perf_counter()
+            if etapa == "leitura":
+                resultados[etapa] = medir_leitura(args.linhas, diretorio, args.repeticoes)
+            elif etapa == "scaler":
+                resultados[etapa] = medir_scaler(artefato, sessao, args.repeticoes)
+            elif etapa == "predicao":
+                resultados[etapa] = medir_predicao(artefato, sessao, args.repeticoes)
+            elif etapa == "graficos":
+                resultados[etapa] = medir_graficos(artefato, sessao, args.repeticoes)
+            elif etapa == "busca":
+                resultados[etapa] = medir_busca(args.linhas_busca, args.iteracoes_busca)
+            elif etapa == "aquisicao":
+                resultados[etapa] = medir_ingestao(args.duracao_aquisicao, diretorio)
+            print(f"{etapa:>10}: {time.perf_counter() - inicio:6.1f} s  {resultados[etapa]}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            anterior = json.load(f)
+        print(f"\nComparação com {args.comparar} (versão {anterior.get('versao_codigo')}):")
+        saida["regressoes"] = comparar(saida, anterior, args.tolerancia)
+
+    with open(args.saida, 'w', encoding='utf-8') as f:
+        json.dump(saida, f, indent=2, ensure_ascii=False)
+    print(f"Resultados salvos em {args.saida}")
+    if saida.get("regressoes"):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
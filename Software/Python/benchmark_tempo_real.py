@@ -0,0 +1,79 @@
+# Medição da classificação em tempo real com o Arduino virtual (sem hardware).
+# O Arduino virtual envia leituras em torno do perfil médio de uma classe do modelo;
+# o script mede quanto tempo e quantas leituras são necessárias até o veredito estável
+# e a latência de cada avaliação.
+#
+# Exemplo de uso:
+#   python benchmark_tempo_real.py --classe etanol --taxa 10 --duracao 20
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+import aquisicao
+import artefatos
+from classificacao_tempo_real import ClassificadorTempoReal
+from floresta_plana import achatar_se_possivel
+from porta_virtual import ArduinoVirtual
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da classificação em tempo real.")
+    parser.add_argument("--artefato", default=artefatos.ARQUIVO_ARTEFATO)
+    parser.add_argument("--classe", default=None, help="Classe simulada (padrão: a primeira do modelo)")
+    parser.add_argument("--taxa", type=float, default=10, help="Leituras por segundo do Arduino virtual")
+    parser.add_argument("--duracao", type=float, default=20, help="Tempo máximo de coleta (s)")
+    parser.add_argument("--janela", type=int, default=30, help="Tamanho da janela deslizante (amostras)")
+    parser.add_argument("--saida", default=None, help="Arquivo JSON com os resultados")
+    args = parser.parse_args()
+
+    artefato = artefatos.carregar_artefato(args.artefato)
+    classe = args.classe or artefato["classes"][0]
+    indice = artefato["classes"].index(classe)
+    # Volta o perfil normalizado da classe para a escala original das leituras
+    perfil = artefato["scaler"].inverse_transform(artefato["centroides_norm"][[indice]])[0]
+
+    veredito_obtido = threading.Event()
+    tempo_real = ClassificadorTempoReal(achatar_se_possivel(artefato["modelo"]), artefato["scaler"], tamanho_janela=args.janela,
+                                        ao_veredito=lambda resultado: veredito_obtido.set()).iniciar()
+    virtual = ArduinoVirtual(taxa_amostras=args.taxa, tamanho_lote=1, perfil=perfil,
+                             ruido=0.02 * (perfil.max() - perfil.min() + 1e-9)).iniciar()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        coleta = aquisicao.Aquisicao(virtual.porta, 9600, os.path.join(diretorio, "tempo_real.csv"),
+                                     espera_inicial=0, ao_receber=tempo_real.enviar)
+        thread = threading.Thread(target=coleta.executar, daemon=True)
+        inicio = time.perf_counter()
+        thread.start()
+        veredito_obtido.wait(args.duracao)
+        tempo_ate_veredito = time.perf_counter() - inicio if veredito_obtido.is_set() else None
+        coleta.parar()
+        thread.join()
+    tempo_real.parar()
+    virtual.fechar()
+
+    resultado = {
+        "classe_simulada": classe,
+        "veredito": tempo_real.veredito,
+        "tempo_ate_veredito_s": tempo_ate_veredito,
+        "latencias": tempo_real.resumo_latencias(),
+        "parametros": vars(args),
+    }
+    if tempo_real.veredito is not None:
+        print(f"Veredito: {tempo_real.veredito['substancia']} ({tempo_real.veredito['confianca']:.1f}%) "
+              f"em {tempo_ate_veredito:.1f} s, após {tempo_real.veredito['amostras_recebidas']} leituras")
+    else:
+        print(f"Nenhum veredito estável em {args.duracao:.0f} s")
+    latencias = resultado["latencias"]
+    if latencias:
+        print(f"Latência por avaliação: média {latencias['media_ms']:.1f} ms, p95 {latencias['p95_ms']:.1f} ms, "
+              f"máx. {latencias['max_ms']:.1f} ms ({latencias['avaliacoes']} avaliações)")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+# Versões das bibliotecas utilizadas:
+# scikit-learn: 1.7.0
+# joblib: 1.5.1
+# numpy: 2.3.1
+
+# Busca de hiperparâmetros retomável e com limite de tempo para o RandomForestClassifier.
+#
+# - busca_halving: "successive halving" usando o número de árvores como recurso. Todos os
+#   candidatos começam com poucas árvores; a cada rodada só o melhor terço continua, com o
+#   triplo de árvores, até o máximo (500).
+# - busca_aleatoria: os mesmos candidatos do RandomizedSearchCV (mesmo ParameterSampler e
+#   random_state), cada um avaliado uma única vez com o seu n_estimators sorteado.
+#
+# Cada candidato avaliado (parâmetros, nº de árvores e a nota de cada fold) é gravado em um
+# arquivo de checkpoint (JSON, uma linha por avaliação). Ao rodar de novo com o mesmo
+# checkpoint, as avaliações já feitas são reaproveitadas sem refazer o ajuste, o que permite
+# continuar uma busca interrompida ou estendê-la (mais candidatos, mais árvores).
+
+import hashlib
+import json
+import math
+import os
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import ParameterSampler, StratifiedKFold
+
+# Identificador dos dados de treino e dos folds, para não reaproveitar avaliações de outro dataset
+def _hash_dados(X, y, cv):
+    h = hashlib.sha256()
+    h.update(np.ascontiguousarray(X, dtype=np.float64).tobytes())
+    h.update("\n".join(map(str, y)).encode('utf-8'))
+    h.update(str(cv).encode('utf-8'))
+    return h.hexdigest()[:16]
+
+# Parâmetros em formato JSON (tipos do NumPy convertidos para tipos do Python)
+def _normalizar(params):
+    return {k: (v.item() if hasattr(v, "item") else v) for k, v in sorted(params.items())}
+
+def _chave(params, n_arvores):
+    return json.dumps([params, n_arvores], sort_keys=True)
+
+class Checkpoint:
+    def __init__(self, caminho, hash_dados):
+        self.caminho = caminho
+        self.hash_dados = hash_dados
+        self.registros = {}
+        if caminho and os.path.exists(caminho):
+            with open(caminho, encoding='utf-8') as f:
+                for linha in f:
+                    try:
+                        registro = json.loads(linha)
+                    except json.JSONDecodeError:
+                        continue # Última linha incompleta (busca interrompida durante a gravação)
+                    if registro.get("dados") == hash_dados:
+                        self.registros[_chave(registro["params"], registro["n_arvores"])] = registro
+
+    def obter(self, params, n_arvores):
+        return self.registros.get(_chave(params, n_arvores))
+
+    def registrar(self, registro):
+        self.registros[_chave(registro["params"], registro["n_arvores"])] = registro
+        if self.caminho:
+            with open(self.caminho, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+def _avaliar_fold(params, n_arvores, X, y, treino, teste, random_state):
+    modelo = RandomForestClassifier(n_estimators=n_arvores, random_state=random_state, n_jobs=1, **params)
+    modelo.fit(X[treino], y[treino])
+    return float(np.mean(modelo.predict(X[teste]) == y[teste]))
+
+class _Busca:
+    def __init__(self, X, y, cv, checkpoint, orcamento, n_jobs, random_state, verbose):
+        self.X = np.asarray(X)
+        self.y = np.asarray(y)
+        self.folds = list(StratifiedKFold(n_splits=cv).split(self.X, self.y))
+        self.checkpoint = Checkpoint(checkpoint, _hash_dados(self.X, self.y, cv))
+        self.orcamento = orcamento
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+        self.verbose = verbose
+        self.inicio = time.perf_counter()
+        self.historico = []
+        self.interrompida = False
+
+    def tempo(self):
+        return time.perf_counter() - self.inicio
+
+    def estourou_orcamento(self):
+        return self.orcamento is not None and self.tempo() >= self.orcamento
+
+    # Avalia uma lista de (params, n_arvores) em todos os folds, reaproveitando o checkpoint.
+    # Retorna os registros na mesma ordem (None para os que ficaram de fora por falta de tempo).
+    def avaliar(self, candidatos):
+        resultados = [None] * len(candidatos)
+        pendentes = []
+        for i, (params, n_arvores) in enumerate(candidatos):
+            registro = self.checkpoint.obter(params, n_arvores)
+            if registro is not None:
+                registro = dict(registro, reaproveitado=True, fim=self.tempo())
+                resultados[i] = registro
+                self.historico.append(registro)
+            else:
+                pendentes.append(i)
+        if not pendentes or self.estourou_orcamento():
+            self.interrompida = self.interrompida or bool(pendentes)
+            return resultados
+
+        tarefas = [(i, k) for i in pendentes for k in range(len(self.folds))]
+        gerador = Parallel(n_jobs=self.n_jobs, return_as="generator")(
+            delayed(_avaliar_fold)(candidatos[i][0], candidatos[i][1], self.X, self.y,
+                                   self.folds[k][0], self.folds[k][1], self.random_state)
+            for i, k in tarefas)
+        notas = {}
+        inicio_lote = self.tempo()
+        for (i, k), nota in zip(tarefas, gerador):
+            notas.setdefault(i, []).append(nota)
+            if len(notas[i]) == len(self.folds):
+                params, n_arvores = candidatos[i]
+                registro = {
+                    "dados": self.checkpoint.hash_dados,
+                    "params": params,
+                    "n_arvores": n_arvores,
+                    "notas_folds": notas[i],
+                    "media": float(np.mean(notas[i])),
+                    "inicio": inicio_lote,
+                    "fim": self.tempo(),
+                }
+                self.checkpoint.registrar(registro)
+                resultados[i] = dict(registro, reaproveitado=False)
+                self.historico.append(resultados[i])
+                if self.verbose:
+                    print(f"[{self.tempo():7.1f} s] {n_arvores:>3} árvores, acurácia {registro['media']:.4f} {params}")
+            if self.estourou_orcamento():
+                self.interrompida = True
+                print(f"Orçamento de {self.orcamento:.0f} s esgotado; a busca pode continuar depois com o mesmo checkpoint.")
+                break
+        return resultados
+
+    def resultado(self, melhor, metodo):
+        return {
+            "metodo": metodo,
+            "melhores_params": dict(melhor["params"], n_estimators=melhor["n_arvores"]) if melhor else None,
+            "melhor_score": melhor["media"] if melhor else None,
+            "tempo_total": self.tempo(),
+            "interrompida": self.interrompida,
+            "avaliacoes": len(self.historico),
+            "reaproveitadas": sum(1 for r in self.historico if r["reaproveitado"]),
+            "arvores_ajustadas": sum(r["n_arvores"] * len(self.folds) for r in self.historico if not r["reaproveitado"]),
+            "historico": self.historico,
+        }
+
+# Successive halving com o número de árvores como recurso.
+# param_distributions não deve conter 'n_estimators' (se tiver, é ignorado).
+def busca_halving(X, y, param_distributions, n_candidatos=100, min_arvores=16, max_arvores=500, fator=3,
+                  cv=5, checkpoint=None, orcamento=None, n_jobs=-1, random_state=42, verbose=1):
+    distribuicoes = {k: v for k, v in param_distributions.items() if k != "n_estimators"}
+    candidatos = [_normalizar(p) for p in ParameterSampler(distribuicoes, n_candidatos, random_state=random_state)]
+    busca = _Busca(X, y, cv, checkpoint, orcamento, n_jobs, random_state, verbose)
+
+    sobreviventes = candidatos
+    n_arvores = min_arvores
+    melhor = None
+    while sobreviventes:
+        if verbose:
+            print(f"Rodada: {len(sobreviventes)} candidatos com {n_arvores} árvores")
+        registros = busca.avaliar([(p, n_arvores) for p in sobreviventes])
+        avaliados = [r for r in registros if r is not None]
+        if avaliados:
+            # O melhor é sempre escolhido entre os avaliados com o maior número de árvores
+            melhor = max(avaliados, key=lambda r: r["media"])
+        if busca.interrompida or len(sobreviventes) == 1 or n_arvores >= max_arvores:
+            break
+        n_manter = max(1, math.ceil(len(avaliados) / fator))
+        sobreviventes = [r["params"] for r in sorted(avaliados, key=lambda r: r["media"], reverse=True)[:n_manter]]
+        n_arvores = min(n_arvores * fator, max_arvores)
+    return busca.resultado(melhor, "halving")
+
+# Busca aleatória equivalente ao RandomizedSearchCV do treinamento.py (mesmos candidatos),
+# mas com checkpoint e limite de tempo
+def busca_aleatoria(X, y, param_distributions, n_iter=100, cv=5, checkpoint=None, orcamento=None,
+                    n_jobs=-1, random_state=42, verbose=1):
+    candidatos = []
+    for p in ParameterSampler(param_distributions, n_iter, random_state=random_state):
+        p = _normalizar(p)
+        candidatos.append(({k: v for k, v in p.items() if k != "n_estimators"}, p["n_estimators"]))
+    busca = _Busca(X, y, cv, checkpoint, orcamento, n_jobs, random_state, verbose)
+    registros = [r for r in busca.avaliar(candidatos) if r is not None]
+    melhor = max(registros, key=lambda r: r["media"]) if registros else None
+    return busca.resultado(melhor, "aleatoria")
+
+# Instante (s desde o início) em que a busca alcançou pela primeira vez uma nota de pelo
+# menos 'alvo - tolerancia' (por padrão, a melhor nota que ela mesma encontrou)
+def tempo_ate_melhor(resultado, alvo=None, tolerancia=0.0):
+    if resultado["melhor_score"] is None:
+        return None
+    alvo = resultado["melhor_score"] if alvo is None else alvo
+    for registro in sorted(resultado["historico"], key=lambda r: r["fim"]):
+        if registro["media"] >= alvo - tolerancia:
+            return registro["fim"]
+    return None
+
+# Relatório comparando a busca aleatória atual com o successive halving
+def comparar_buscas(X, y, param_distributions, n_iter=100, cv=5, n_jobs=-1, random_state=42, tolerancia=0.005):
+    aleatoria = busca_aleatoria(X, y, param_distributions, n_iter=n_iter, cv=cv, n_jobs=n_jobs,
+                                random_state=random_state, verbose=0)
+    halving = busca_halving(X, y, param_distributions, n_candidatos=n_iter, cv=cv, n_jobs=n_jobs,
+                            random_state=random_state, verbose=0)
+    alvo = max(aleatoria["melhor_score"], halving["melhor_score"])
+    relatorio = {}
+    for resultado in (aleatoria, halving):
+        relatorio[resultado["metodo"]] = {
+            "melhor_score": resultado["melhor_score"],
+            "melhores_params": resultado["melhores_params"],
+            "tempo_total_s": resultado["tempo_total"],
+            "tempo_ate_melhor_proprio_s": tempo_ate_melhor(resultado),
+            "tempo_ate_melhor_global_s": tempo_ate_melhor(resultado, alvo, tolerancia),
+            "avaliacoes": resultado["avaliacoes"],
+            "arvores_ajustadas": resultado["arvores_ajustadas"],
+        }
+    relatorio["melhor_score_global"] = alvo
+    relatorio["tolerancia"] = tolerancia
+    return relatorio
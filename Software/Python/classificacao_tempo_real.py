@@ -0,0 +1,152 @@
+# Versões das bibliotecas utilizadas:
+# pandas: 2.3.0
+# numpy: 2.3.1
+
+# Classificação em tempo real durante a coleta.
+# Cada lote de leituras recebido da aquisição é classificado em uma thread própria
+# (fora da thread do Tk). As probabilidades de cada amostra entram em uma janela
+# deslizante e a média da janela passa pela mesma lógica de decisão da análise do CSV.
+# Quando a mesma substância (não "INDEFINIDA") se repete em várias avaliações seguidas,
+# o veredito é considerado estável e é emitido.
+# Um erro na avaliação (ex.: modelo ou scaler incompatível com as leituras) encerra a thread:
+# ele é informado por 'ao_erro' e os lotes seguintes deixam de ser aceitos.
+
+import queue
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import classificador
+
+class ClassificadorTempoReal:
+    # tamanho_janela: número de amostras na média deslizante
+    # avaliacoes_estaveis: quantas avaliações seguidas devem concordar para emitir o veredito
+    # ao_atualizar(resultado): chamado a cada avaliação; ao_veredito(resultado): chamado uma vez
+    # ao_erro(excecao): chamado se a avaliação falhar (a classificação em tempo real é encerrada)
+    def __init__(self, modelo, scaler, tamanho_janela=30, avaliacoes_estaveis=5,
+                 ao_atualizar=None, ao_veredito=None, ao_erro=None):
+        self.modelo = modelo
+        self.scaler = scaler
+        self.classes = [str(c) for c in modelo.classes_]
+        self.tamanho_janela = tamanho_janela
+        self.avaliacoes_estaveis = avaliacoes_estaveis
+        self.ao_atualizar = ao_atualizar
+        self.ao_veredito = ao_veredito
+        self.ao_erro = ao_erro
+        self.veredito = None
+        self.erro = None
+        self.amostras_recebidas = 0
+        self.latencias = [] # Latência de ponta a ponta de cada avaliação (s)
+        self._janela = np.zeros((tamanho_janela, len(self.classes)))
+        self._n_janela = 0
+        self._posicao = 0
+        self._ultima_substancia = None
+        self._repeticoes = 0
+        self._fila = queue.SimpleQueue()
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._executar, daemon=True)
+
+    # Recebe um lote da aquisição (mesma assinatura do 'ao_receber' de aquisicao.Aquisicao)
+    # Depois de parado (ou de um erro na avaliação), os lotes são ignorados.
+    def enviar(self, valores, tempos):
+        if not self._parar.is_set():
+            self._fila.put((valores, tempos))
+
+    def iniciar(self):
+        self._thread.start()
+        return self
+
+    def parar(self, timeout=2.0):
+        self._parar.set()
+        self._fila.put(None)
+        self._thread.join(timeout)
+
+    def _adicionar_na_janela(self, probabilidades):
+        for linha in probabilidades[-self.tamanho_janela:]:
+            self._janela[self._posicao] = linha
+            self._posicao = (self._posicao + 1) % self.tamanho_janela
+            self._n_janela = min(self._n_janela + 1, self.tamanho_janela)
+
+    # Classifica os lotes pendentes. Se a fila acumulou vários lotes, eles são juntados e
+    # só as últimas 'tamanho_janela' amostras são classificadas (as outras sairiam da janela),
+    # o que limita o custo de cada avaliação e, portanto, a latência.
+    def _avaliar(self, lotes):
+        valores = np.concatenate([v for v, _ in lotes])[-self.tamanho_janela:]
+        chegada = max(float(t[-1]) for _, t in lotes if len(t))
+        probabilidades = self.modelo.predict_proba(self.scaler.transform(valores))
+        self._adicionar_na_janela(probabilidades)
+        self.amostras_recebidas += sum(len(v) for v, _ in lotes)
+
+        media = self._janela[:self._n_janela].mean(axis=0)
+        confianca_por_classe = pd.Series(media, index=self.classes)
+        substancia, confianca = classificador.decidir_substancia(confianca_por_classe)
+
+        if substancia == self._ultima_substancia:
+            self._repeticoes += 1
+        else:
+            self._ultima_substancia = substancia
+            self._repeticoes = 1
+
+        latencia = time.time() - chegada
+        self.latencias.append(latencia)
+        resultado = {
+            "substancia": substancia,
+            "confianca": float(confianca),
+            "probabilidades": confianca_por_classe.to_dict(),
+            "amostras_na_janela": self._n_janela,
+            "amostras_recebidas": self.amostras_recebidas,
+            "latencia": latencia,
+        }
+        if self.ao_atualizar is not None:
+            self.ao_atualizar(resultado)
+
+        estavel = (self.veredito is None
+                   and self._n_janela == self.tamanho_janela
+                   and self._repeticoes >= self.avaliacoes_estaveis
+                   and not substancia.startswith("INDEFINIDA"))
+        if estavel:
+            self.veredito = resultado
+            if self.ao_veredito is not None:
+                self.ao_veredito(resultado)
+
+    def _executar(self):
+        while not self._parar.is_set():
+            lote = self._fila.get()
+            if lote is None:
+                break
+            lotes = [lote]
+            # Junta tudo o que chegou enquanto a avaliação anterior estava em andamento
+            while True:
+                try:
+                    lote = self._fila.get_nowait()
+                except queue.Empty:
+                    break
+                if lote is None:
+                    self._parar.set()
+                    break
+                lotes.append(lote)
+            lotes = [l for l in lotes if len(l[0])]
+            if lotes:
+                try:
+                    self._avaliar(lotes)
+                except Exception as e:
+                    self.erro = e
+                    self._parar.set()
+                    if self.ao_erro is not None:
+                        self.ao_erro(e)
+                    break
+
+    # Resumo das latências medidas (em milissegundos)
+    def resumo_latencias(self):
+        if not self.latencias:
+            return {}
+        latencias = np.array(self.latencias) * 1000
+        return {
+            "avaliacoes": len(latencias),
+            "media_ms": float(latencias.mean()),
+            "p50_ms": float(np.percentile(latencias, 50)),
+            "p95_ms": float(np.percentile(latencias, 95)),
+            "max_ms": float(latencias.max()),
+        }
@@ -0,0 +1,117 @@
+# Versões das bibliotecas utilizadas:
+# pandas: 2.3.0
+# joblib: 1.5.1
+# numpy: 2.3.1
+
+# Núcleo de classificação sem interface gráfica.
+# Pode ser importado por scripts, pela interface Tk e pelo classificador em lote.
+
+import joblib
+import numpy as np
+import pandas as pd
+
+import metricas
+
+COLUNAS_SENSORES = ["MQ3", "MQ5", "MQ6", "MQ8"]
+
+# Limiares da lógica de decisão (ajuste conforme necessário)
+LIMIAR_CONFIANCA_MINIMA = 75.0 # Se a confiança for menor que isso, é indefinido
+LIMIAR_DIFERENCA_TOP2 = 10.0  # Se a diferença entre as 2 maiores for menor que isso, é indefinido/mistura
+
+ROTULO_CONFIANCA_BAIXA = "INDEFINIDA (Confiança Baixa)"
+ROTULO_POSSIVEL_MISTURA = "INDEFINIDA (Possível Mistura)"
+
+# Função para carregar o modelo treinado e o scaler
+def carregar_modelo(modelo_arquivo, scaler_arquivo):
+    with metricas.medir("modelo.carregar"):
+        modelo = joblib.load(modelo_arquivo)
+        scaler = joblib.load(scaler_arquivo)
+    return modelo, scaler
+
+# Função para ler o CSV de uma amostra e garantir as colunas MQ3, MQ5, MQ6, MQ8.
+# Retorna o DataFrame e um indicador se os nomes das colunas precisaram ser ajustados.
+def ler_csv_amostra(arquivo_csv):
+    dados = pd.read_csv(arquivo_csv)
+    colunas_ajustadas = False
+    if not all(coluna in dados.columns for coluna in COLUNAS_SENSORES):
+        if dados.shape[1] == len(COLUNAS_SENSORES):
+            dados.columns = COLUNAS_SENSORES
+            colunas_ajustadas = True
+        else:
+            raise ValueError("O arquivo CSV não possui as colunas esperadas ou o número de colunas é incompatível.")
+    return dados[COLUNAS_SENSORES], colunas_ajustadas
+
+# Função para ler uma amostra em CSV ou em sessão binária (.nes)
+def ler_amostra(arquivo):
+    import sessao_binaria
+    if sessao_binaria.eh_sessao_binaria(arquivo):
+        return sessao_binaria.SessaoBinaria(arquivo).como_dataframe(), False
+    return ler_csv_amostra(arquivo)
+
+# Função com a lógica de decisão para classificar como "INDEFINIDA".
+# Recebe as probabilidades médias por classe (pd.Series, valores entre 0 e 1).
+def decidir_substancia(confianca_por_classe):
+    # 1. Obtém a classe com maior probabilidade e seu valor
+    substancia_predita_raw = confianca_por_classe.idxmax()
+    confianca_raw = confianca_por_classe.max() * 100
+
+    substancia_final = substancia_predita_raw
+    confianca_final = confianca_raw
+
+    if confianca_raw < LIMIAR_CONFIANCA_MINIMA:
+        substancia_final = ROTULO_CONFIANCA_BAIXA
+
+    # Verifica se há um empate técnico entre as top 2 classes
+    if len(confianca_por_classe) >= 2:
+        top_2_classes = confianca_por_classe.nlargest(2)
+        prob_top1 = top_2_classes.iloc[0] * 100
+        prob_top2 = top_2_classes.iloc[1] * 100
+
+        # Se a diferença for pequena E não for já indefinida por baixa confiança
+        if (prob_top1 - prob_top2) < LIMIAR_DIFERENCA_TOP2 and substancia_final != ROTULO_CONFIANCA_BAIXA:
+            substancia_final = ROTULO_POSSIVEL_MISTURA
+            confianca_final = prob_top1
+
+    return substancia_final, confianca_final
+
+# Exceção usada quando uma análise em segundo plano é cancelada
+class AnaliseCancelada(Exception):
+    pass
+
+# Função para classificar um conjunto de leituras (DataFrame com as colunas dos sensores).
+# Com 'cancelado' (threading.Event), as leituras são classificadas em lotes de 'tamanho_lote'
+# linhas e o evento é verificado entre os lotes (AnaliseCancelada é levantada).
+def classificar_dados(dados_sensores, modelo, scaler, cancelado=None, tamanho_lote=50000):
+    with metricas.medir("classificacao.scaler"):
+        X_scaled = scaler.transform(dados_sensores[COLUNAS_SENSORES].values)
+    metricas.contar("classificacao.amostras", len(X_scaled))
+
+    # Obtém as probabilidades de predição para cada classe e tira a média da amostra
+    if cancelado is None or len(X_scaled) <= tamanho_lote:
+        with metricas.medir("classificacao.predict_proba"):
+            probabilidades_medias = np.mean(modelo.predict_proba(X_scaled), axis=0)
+    else:
+        soma = np.zeros(len(modelo.classes_))
+        for inicio in range(0, len(X_scaled), tamanho_lote):
+            if cancelado.is_set():
+                raise AnaliseCancelada()
+            with metricas.medir("classificacao.predict_proba"):
+                soma += modelo.predict_proba(X_scaled[inicio:inicio + tamanho_lote]).sum(axis=0)
+        probabilidades_medias = soma / len(X_scaled)
+    confianca_por_classe = pd.Series(probabilidades_medias, index=modelo.classes_)
+
+    substancia, confianca = decidir_substancia(confianca_por_classe)
+    return {
+        "n_amostras": int(len(dados_sensores)),
+        "substancia": substancia,
+        "confianca": float(confianca),
+        "probabilidades": {str(classe): float(p) for classe, p in confianca_por_classe.items()},
+    }
+
+# Função para classificar um arquivo (CSV ou .nes) com o modelo e o scaler já carregados
+def classificar_csv(arquivo_csv, modelo, scaler):
+    dados, colunas_ajustadas = ler_amostra(arquivo_csv)
+    resultado = classificar_dados(dados, modelo, scaler)
+    resultado["arquivo"] = str(arquivo_csv)
+    resultado["colunas_ajustadas"] = colunas_ajustadas
+    return resultado
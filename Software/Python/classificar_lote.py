@@ -0,0 +1,110 @@
+# Classificação em lote (sem interface gráfica) de vários arquivos CSV.
+# O modelo e o scaler são carregados uma única vez por processo e os arquivos
+# são distribuídos entre os processos de um pool.
+#
+# Exemplo de uso:
+#   python classificar_lote.py sessoes/ --saida resultados.json --processos 4
+
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import artefatos
+import classificador
+
+# Modelo e scaler do processo atual (carregados uma vez pelo inicializador)
+_modelo = None
+_scaler = None
+
+def _inicializar_processo(modelo_arquivo, scaler_arquivo, artefato_arquivo=None):
+    global _modelo, _scaler
+    if artefato_arquivo is not None:
+        artefato = artefatos.carregar_artefato(artefato_arquivo)
+        _modelo, _scaler = artefato["modelo"], artefato["scaler"]
+    else:
+        _modelo, _scaler = classificador.carregar_modelo(modelo_arquivo, scaler_arquivo)
+
+# Classifica um arquivo; erros são registrados no resultado para não interromper o lote
+def _classificar_arquivo(arquivo_csv):
+    try:
+        return classificador.classificar_csv(arquivo_csv, _modelo, _scaler)
+    except Exception as e:
+        return {"arquivo": str(arquivo_csv), "erro": str(e)}
+
+# Função para listar os CSVs a partir de diretórios e/ou arquivos informados
+def listar_arquivos(entradas, padrao="*.csv"):
+    arquivos = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            arquivos.extend(sorted(glob.glob(os.path.join(entrada, padrao))))
+        else:
+            arquivos.append(entrada)
+    return arquivos
+
+# Função para classificar uma lista de arquivos. Com processos=1 tudo roda no processo atual.
+def classificar_arquivos(arquivos, modelo_arquivo, scaler_arquivo, processos=None, chunksize=8, artefato_arquivo=None):
+    if processos == 1:
+        _inicializar_processo(modelo_arquivo, scaler_arquivo, artefato_arquivo)
+        return [_classificar_arquivo(arquivo) for arquivo in arquivos]
+
+    with ProcessPoolExecutor(max_workers=processos,
+                             initializer=_inicializar_processo,
+                             initargs=(modelo_arquivo, scaler_arquivo, artefato_arquivo)) as executor:
+        return list(executor.map(_classificar_arquivo, arquivos, chunksize=chunksize))
+
+# Função para salvar os resultados em JSON ou CSV (de acordo com a extensão do arquivo)
+def salvar_resultados(resultados, arquivo_saida):
+    if arquivo_saida.lower().endswith('.csv'):
+        classes = sorted({classe for r in resultados for classe in r.get("probabilidades", {})})
+        campos = ["arquivo", "n_amostras", "substancia", "confianca"] + [f"prob_{c}" for c in classes] + ["erro"]
+        with open(arquivo_saida, 'w', newline='', encoding='utf-8') as f:
+            escritor = csv.DictWriter(f, fieldnames=campos)
+            escritor.writeheader()
+            for r in resultados:
+                linha = {campo: r.get(campo, "") for campo in ["arquivo", "n_amostras", "substancia", "confianca", "erro"]}
+                for classe, p in r.get("probabilidades", {}).items():
+                    linha[f"prob_{classe}"] = p
+                escritor.writerow(linha)
+    else:
+        with open(arquivo_saida, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Classificação em lote de arquivos CSV do nariz eletrônico.")
+    parser.add_argument("entradas", nargs="+", help="Diretórios e/ou arquivos CSV a classificar")
+    parser.add_argument("--modelo", default="modelo_nariz_eletronico.pkl")
+    parser.add_argument("--scaler", default="scaler_nariz_eletronico.pkl")
+    parser.add_argument("--artefato", default=None,
+                        help=f"Pacote de artefatos gerado pelo treinamento (ex.: {artefatos.ARQUIVO_ARTEFATO}); substitui --modelo e --scaler")
+    parser.add_argument("--padrao", default="*.csv", help="Padrão de busca dentro dos diretórios")
+    parser.add_argument("--processos", type=int, default=None, help="Número de processos (padrão: número de CPUs)")
+    parser.add_argument("--saida", default=None, help="Arquivo de saída (.json ou .csv). Sem ele, imprime JSON na tela.")
+    args = parser.parse_args(argv)
+
+    arquivos = listar_arquivos(args.entradas, args.padrao)
+    if not arquivos:
+        print("Nenhum arquivo CSV encontrado.", file=sys.stderr)
+        return 1
+
+    inicio = time.perf_counter()
+    resultados = classificar_arquivos(arquivos, args.modelo, args.scaler, args.processos, artefato_arquivo=args.artefato)
+    duracao = time.perf_counter() - inicio
+
+    if args.saida:
+        salvar_resultados(resultados, args.saida)
+    else:
+        json.dump(resultados, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+
+    erros = sum(1 for r in resultados if "erro" in r)
+    print(f"{len(arquivos)} arquivos classificados em {duracao:.2f} s "
+          f"({len(arquivos) / duracao:.1f} arquivos/s, {erros} com erro)", file=sys.stderr)
+    return 0 if erros == 0 else 2
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,302 @@
+# Versões das bibliotecas utilizadas:
+# scikit-learn: 1.7.0
+# pandas: 2.3.0
+# joblib: 1.5.1
+# numpy: 2.3.1
+
+# Compactação do modelo depois do treinamento.
+#
+# 1. Seleção de árvores: a partir da floresta treinada, escolhe de forma gulosa a menor
+#    sequência de árvores cuja média mantém a acurácia a até 'tolerancia' da floresta inteira
+#    (a cada passo entra a árvore que mais melhora a acurácia do conjunto já escolhido).
+#    Um mínimo de árvores é mantido porque a análise usa as probabilidades médias (limiares de
+#    confiança), e poucas árvores dão probabilidades grosseiras (0 ou 1 com uma só árvore).
+#    A seleção usa metade do conjunto de teste; a outra metade só é usada no relatório.
+# 2. Tipos compactos: a floresta escolhida é achatada (floresta_plana.py) com limiares e
+#    probabilidades em float32 e índices em int32.
+# 3. Artefato compacto (.nef): floresta, scaler (mínimo/escala), classes e perfis médios
+#    em um único arquivo binário que é mapeado em memória na carga (np.memmap), sem
+#    unpickling e sem importar o scikit-learn.
+#
+# Estrutura do arquivo .nef:
+#   'NEFB' | versão (uint16) | reservado (uint16) | tamanho dos metadados (uint32)
+#   seguido dos metadados em JSON (classes, hash, tipo/forma/posição de cada vetor) e
+#   dos vetores, cada um alinhado em 64 bytes.
+#
+# Exemplo de uso (depois do treinamento.py):
+#   python compactacao.py --tolerancia 0.005 --relatorio relatorio_compactacao.json
+
+import argparse
+import copy
+import hashlib
+import json
+import os
+import struct
+import time
+
+import numpy as np
+
+from floresta_plana import FlorestaPlana
+
+EXTENSAO = ".nef"
+MAGICO = b"NEFB"
+VERSAO = 1
+ALINHAMENTO = 64
+
+_CABECALHO = struct.Struct("<4sHHI")
+
+# Mesmo cálculo do MinMaxScaler.transform, a partir dos parâmetros salvos no artefato compacto
+class ScalerMinMax:
+    def __init__(self, min_, scale_, feature_range=(0, 1), clip=False):
+        self.min_ = min_
+        self.scale_ = scale_
+        self.feature_range = tuple(feature_range)
+        self.clip = clip
+        self.n_features_in_ = len(min_)
+
+    @classmethod
+    def de_scaler(cls, scaler):
+        if not all(hasattr(scaler, atributo) for atributo in ("min_", "scale_", "feature_range")):
+            raise ValueError(f"O artefato compacto só aceita o MinMaxScaler (recebido: {type(scaler).__name__}).")
+        return cls(np.asarray(scaler.min_, dtype=np.float64), np.asarray(scaler.scale_, dtype=np.float64),
+                   scaler.feature_range, getattr(scaler, "clip", False))
+
+    def transform(self, X):
+        X = np.array(X, dtype=np.float64)
+        X *= self.scale_
+        X += self.min_
+        if self.clip:
+            np.clip(X, self.feature_range[0], self.feature_range[1], out=X)
+        return X
+
+# Probabilidades de cada árvore, matriz (n_arvores x n_amostras x n_classes)
+def probabilidades_por_arvore(modelo, X):
+    plana = FlorestaPlana.de_floresta(modelo)
+    return plana.valores_folhas[plana.aplicar(X).T]
+
+# Seleção gulosa de árvores. Retorna (índices das árvores na ordem em que entraram,
+# acurácia da floresta inteira, acurácia do conjunto escolhido após cada árvore).
+# Para na primeira quantidade (a partir de 'minimo_arvores') que fica a até 'tolerancia' da floresta inteira.
+def selecionar_arvores(modelo, X, y, tolerancia=0.005, minimo_arvores=10, maximo_amostras=5000, semente=0):
+    if len(X) > maximo_amostras:
+        indices = np.random.default_rng(semente).choice(len(X), maximo_amostras, replace=False)
+        X, y = X[indices], np.asarray(y)[indices]
+    codigos = np.searchsorted(modelo.classes_, np.asarray(y))
+    probas = probabilidades_por_arvore(modelo, X)
+    acuracia_total = float(np.mean(np.argmax(probas.sum(axis=0), axis=1) == codigos))
+
+    escolhidas = []
+    historico = []
+    restantes = np.ones(len(probas), dtype=bool)
+    soma = np.zeros(probas.shape[1:])
+    while restantes.any():
+        candidatas = np.flatnonzero(restantes)
+        # Acurácia do conjunto atual somado a cada candidata (a média não muda o argmax)
+        acertos = (np.argmax(soma[None] + probas[candidatas], axis=2) == codigos).mean(axis=1)
+        melhor = candidatas[np.argmax(acertos)]
+        escolhidas.append(int(melhor))
+        historico.append(float(acertos.max()))
+        soma += probas[melhor]
+        restantes[melhor] = False
+        if len(escolhidas) >= minimo_arvores and historico[-1] >= acuracia_total - tolerancia:
+            break
+    return escolhidas, acuracia_total, historico
+
+# Cópia do RandomForestClassifier só com as árvores escolhidas (continua compatível com o
+# artefato .pkl e com o restante do código)
+def podar_floresta(modelo, arvores):
+    podado = copy.copy(modelo)
+    podado.estimators_ = [modelo.estimators_[i] for i in arvores]
+    podado.n_estimators = len(arvores)
+    return podado
+
+def _hash_vetores(vetores, classes):
+    h = hashlib.sha256()
+    for nome in sorted(vetores):
+        h.update(nome.encode('utf-8'))
+        h.update(np.ascontiguousarray(vetores[nome]).tobytes())
+    h.update(json.dumps(classes).encode('utf-8'))
+    return h.hexdigest()
+
+# Grava o artefato compacto a partir do pacote de artefatos (artefatos.criar_artefato).
+# 'arvores' escolhe o subconjunto de árvores (todas, se None).
+def salvar_compacto(caminho, artefato, arvores=None):
+    plana = FlorestaPlana.de_floresta(artefato["modelo"], arvores).compactar()
+    scaler = ScalerMinMax.de_scaler(artefato["scaler"])
+    vetores = {
+        "feature": plana.feature,
+        "limiar": plana.limiar,
+        "esquerda": plana.esquerda,
+        "direita": plana.direita,
+        "valores_folhas": plana.valores_folhas,
+        "raizes": plana.raizes,
+        "scaler_min": scaler.min_,
+        "scaler_escala": scaler.scale_,
+        "centroides_norm": np.asarray(artefato["centroides_norm"], dtype=np.float64),
+    }
+    classes = [str(c) for c in artefato["modelo"].classes_]
+    metadados = {
+        "classes": classes,
+        "colunas": artefato["colunas"],
+        "profundidade_maxima": plana.profundidade_maxima,
+        "scaler_intervalo": list(scaler.feature_range),
+        "scaler_clip": bool(scaler.clip),
+        "hash": _hash_vetores(vetores, classes),
+        "hash_origem": artefato["hash"],
+        "criado_em": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "vetores": {},
+    }
+    # As posições dependem do tamanho do cabeçalho, que depende das posições: calcula as
+    # posições relativas e soma o início da área de dados (alinhado) no final
+    posicao = 0
+    for nome, vetor in vetores.items():
+        metadados["vetores"][nome] = {"tipo": vetor.dtype.str, "forma": list(vetor.shape), "posicao": posicao}
+        posicao += -(-vetor.nbytes // ALINHAMENTO) * ALINHAMENTO
+    meta = json.dumps(metadados, ensure_ascii=False).encode('utf-8')
+    inicio_dados = -(-(_CABECALHO.size + len(meta)) // ALINHAMENTO) * ALINHAMENTO
+    with open(caminho, 'wb') as f:
+        f.write(_CABECALHO.pack(MAGICO, VERSAO, 0, len(meta)) + meta)
+        for nome, vetor in vetores.items():
+            f.seek(inicio_dados + metadados["vetores"][nome]["posicao"])
+            f.write(np.ascontiguousarray(vetor).tobytes())
+    return metadados
+
+# Carrega o artefato compacto no mesmo formato de dicionário de artefatos.carregar_artefato.
+# Os vetores da floresta são visões de um mapa de memória do arquivo (sem cópia).
+def carregar_compacto(caminho):
+    with open(caminho, 'rb') as f:
+        magico, versao, _, tamanho_meta = _CABECALHO.unpack(f.read(_CABECALHO.size))
+        if magico != MAGICO or versao != VERSAO:
+            raise ValueError(f"O arquivo '{caminho}' não é um artefato compacto compatível (versão esperada: {VERSAO}).")
+        metadados = json.loads(f.read(tamanho_meta).decode('utf-8'))
+    inicio_dados = -(-(_CABECALHO.size + tamanho_meta) // ALINHAMENTO) * ALINHAMENTO
+    mapa = np.memmap(caminho, dtype=np.uint8, mode='r')
+    vetores = {}
+    for nome, info in metadados["vetores"].items():
+        tipo = np.dtype(info["tipo"])
+        n = int(np.prod(info["forma"]))
+        inicio = inicio_dados + info["posicao"]
+        vetores[nome] = mapa[inicio:inicio + n * tipo.itemsize].view(tipo).reshape(info["forma"])
+    classes = np.asarray(metadados["classes"], dtype=object)
+    modelo = FlorestaPlana(vetores["feature"], vetores["limiar"], vetores["esquerda"], vetores["direita"],
+                           vetores["valores_folhas"], vetores["raizes"], classes, metadados["profundidade_maxima"])
+    scaler = ScalerMinMax(vetores["scaler_min"], vetores["scaler_escala"], metadados["scaler_intervalo"], metadados["scaler_clip"])
+    return {
+        "versao": 1, # Mesmo formato de dicionário de artefatos.VERSAO_ARTEFATO
+        "modelo": modelo,
+        "scaler": scaler,
+        "classes": list(metadados["classes"]),
+        "colunas": metadados["colunas"],
+        "centroides_norm": np.array(vetores["centroides_norm"]),
+        "hash": metadados["hash"],
+        "criado_em": metadados["criado_em"],
+    }
+
+def eh_artefato_compacto(caminho):
+    return str(caminho).lower().endswith(EXTENSAO)
+
+# Tempo mediano de 'funcao()' em 'repeticoes' execuções
+def _tempo(funcao, repeticoes=5):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return float(np.median(tempos))
+
+# Tamanho em disco, tempo de carga, latência de inferência e acurácia de uma variante do modelo.
+# 'proba_referencia' (do modelo original) dá o desvio médio das probabilidades.
+def _medir_variante(caminho, carregar, X_avaliacao, y_avaliacao, X_lote, proba_referencia=None):
+    carregar() # Aquece o cache de disco do sistema; o tempo medido é o da carga em si
+    tempo_carga = _tempo(carregar)
+    artefato = carregar()
+    modelo, scaler = artefato["modelo"], artefato["scaler"]
+    X_norm = scaler.transform(X_avaliacao)
+    proba = modelo.predict_proba(X_norm)
+    y_pred = np.asarray(modelo.classes_)[np.argmax(proba, axis=1)]
+    return proba, {
+        "arquivo": caminho,
+        "tamanho_mb": os.path.getsize(caminho) / 1e6,
+        "n_arvores": getattr(modelo, "n_arvores", None) or len(modelo.estimators_),
+        "carga_s": tempo_carga,
+        "inferencia_1_amostra_ms": _tempo(lambda: modelo.predict_proba(scaler.transform(X_lote[:1])), 20) * 1000,
+        "inferencia_lote_ms": _tempo(lambda: modelo.predict_proba(scaler.transform(X_lote))) * 1000,
+        "acuracia": float(np.mean(y_pred.astype(str) == np.asarray(y_avaliacao).astype(str))),
+        # Diferença média absoluta das probabilidades por amostra e da média da amostra inteira
+        "desvio_probabilidades": None if proba_referencia is None else float(np.mean(np.abs(proba - proba_referencia))),
+        "desvio_probabilidade_media": None if proba_referencia is None else
+            float(np.max(np.abs(proba.mean(axis=0) - proba_referencia.mean(axis=0)))),
+    }
+
+def main():
+    import joblib
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+
+    import artefatos
+    from classificador import COLUNAS_SENSORES
+
+    parser = argparse.ArgumentParser(description="Compactação do modelo treinado (seleção de árvores, tipos compactos e artefato mapeável em memória).")
+    parser.add_argument("--artefato", default=artefatos.ARQUIVO_ARTEFATO, help="Pacote de artefatos gerado pelo treinamento.py")
+    parser.add_argument("--dataset", default="dataset_nariz_eletronico.csv")
+    parser.add_argument("--coluna-rotulo", default="Tipo_álcool")
+    parser.add_argument("--tolerancia", type=float, default=0.005, help="Perda máxima de acurácia aceita (fração, ex.: 0.005 = 0,5 ponto)")
+    parser.add_argument("--minimo-arvores", type=int, default=10,
+                        help="Mínimo de árvores mantidas (as probabilidades médias ficam grosseiras com poucas árvores)")
+    parser.add_argument("--saida", default=None, help="Artefato compacto (padrão: o nome do artefato com a extensão .nef)")
+    parser.add_argument("--saida-podado", default=None, help="Também grava o pacote .pkl só com as árvores escolhidas")
+    parser.add_argument("--relatorio", default="relatorio_compactacao.json")
+    parser.add_argument("--lote", type=int, default=600, help="Tamanho do lote na medição de latência")
+    args = parser.parse_args()
+    saida = args.saida or os.path.splitext(args.artefato)[0] + EXTENSAO
+
+    artefato = artefatos.carregar_artefato(args.artefato)
+    modelo, scaler = artefato["modelo"], artefato["scaler"]
+    if not hasattr(modelo, "estimators_"):
+        raise SystemExit("O modelo do artefato não é uma floresta; não há árvores para selecionar.")
+
+    # Mesmo conjunto de teste do treinamento.py; metade para a seleção e metade para o relatório
+    dataset = pd.read_csv(args.dataset)
+    X = dataset[COLUNAS_SENSORES].values
+    y = dataset[args.coluna_rotulo].values
+    _, X_teste, _, y_teste = train_test_split(X, y, test_size=0.2, random_state=42)
+    X_selecao, X_avaliacao, y_selecao, y_avaliacao = train_test_split(X_teste, y_teste, test_size=0.5, random_state=0, stratify=y_teste)
+
+    inicio = time.perf_counter()
+    arvores, acuracia_total, historico = selecionar_arvores(modelo, scaler.transform(X_selecao), y_selecao,
+                                                             args.tolerancia, args.minimo_arvores)
+    print(f"{len(arvores)} de {len(modelo.estimators_)} árvores escolhidas em {time.perf_counter() - inicio:.1f} s "
+          f"(acurácia na seleção: {historico[-1]:.4f}, floresta inteira: {acuracia_total:.4f})")
+
+    salvar_compacto(saida, artefato, arvores)
+    print(f"Artefato compacto salvo em {saida}")
+    if args.saida_podado:
+        podado = artefatos.criar_artefato(podar_floresta(modelo, arvores), scaler, X, y)
+        artefatos.salvar_artefato(podado, args.saida_podado)
+        print(f"Pacote podado salvo em {args.saida_podado}")
+
+    X_lote = X_avaliacao[np.resize(np.arange(len(X_avaliacao)), args.lote)]
+    variantes = {}
+    proba_original, variantes["original"] = _medir_variante(args.artefato, lambda: joblib.load(args.artefato),
+                                                            X_avaliacao, y_avaliacao, X_lote)
+    if args.saida_podado:
+        _, variantes["podado"] = _medir_variante(args.saida_podado, lambda: joblib.load(args.saida_podado),
+                                                 X_avaliacao, y_avaliacao, X_lote, proba_original)
+    _, variantes["compacto"] = _medir_variante(saida, lambda: carregar_compacto(saida), X_avaliacao, y_avaliacao,
+                                               X_lote, proba_original)
+
+    print(f"\n{'':>10} {'árvores':>8} {'tamanho':>10} {'carga':>9} {'1 amostra':>10} {f'lote {args.lote}':>10} "
+          f"{'acurácia':>9} {'desvio prob.':>12}")
+    for nome, r in variantes.items():
+        desvio = "" if r["desvio_probabilidades"] is None else f"{r['desvio_probabilidades']:.4f}"
+        print(f"{nome:>10} {r['n_arvores']:>8} {r['tamanho_mb']:>7.2f} MB {r['carga_s'] * 1000:>6.1f} ms "
+              f"{r['inferencia_1_amostra_ms']:>7.2f} ms {r['inferencia_lote_ms']:>7.2f} ms {r['acuracia']:>9.4f} {desvio:>12}")
+
+    with open(args.relatorio, 'w', encoding='utf-8') as f:
+        json.dump({"tolerancia": args.tolerancia, "minimo_arvores": args.minimo_arvores, "arvores_escolhidas": arvores,
+                   "acuracia_floresta_inteira_selecao": acuracia_total, "acuracia_por_n_arvores_selecao": historico,
+                   "variantes": variantes}, f, indent=2, ensure_ascii=False)
+    print(f"Relatório salvo em {args.relatorio}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# Versões das bibliotecas utilizadas:
+# pandas: 2.3.0
+# numpy: 2.3.1
+
+# Gerador de dados sintéticos dos sensores (razões Rs/R0 do MQ3, MQ5, MQ6 e MQ8) para
+# testes e benchmarks sem o Arduino e sem o dataset real.
+#
+# Cada sessão simula uma coleta de uma substância: começa em ar limpo (razões do datasheet
+# usadas no calibracao_R0.ino), o vapor é exposto e a razão de cada sensor cai até o nível
+# característico da classe com um transiente exponencial (em escala logarítmica, como a
+# resposta dos sensores MQ). Cada sessão tem uma sensibilidade própria por sensor, uma deriva
+# lenta da linha de base e ruído multiplicativo; os valores são arredondados para 2 casas,
+# como no medicao.ino.
+#
+# Os dados são gerados em blocos de sessões inteiras, então é possível gravar de 1e3 a 1e8
+# linhas sem manter tudo na memória. O resultado só depende da semente.
+#
+# Exemplo de uso:
+#   python dados_sinteticos.py dataset_sintetico.csv --linhas 1e6
+#   python dados_sinteticos.py sessao_etanol.nes --linhas 1e5 --classe etanol --sem-rotulo
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from classificador import COLUNAS_SENSORES
+from sessao_binaria import GravadorSessaoBinaria, eh_sessao_binaria
+
+# Razões Rs/R0 em ar limpo (calibracao_R0.ino)
+RAZOES_AR_LIMPO = np.array([60.0, 6.5, 10.0, 70.0])
+
+# Razões Rs/R0 em regime estacionário na presença de cada vapor
+PERFIS_CLASSES = {
+    "etanol": np.array([0.9, 3.2, 5.5, 20.0]),
+    "metanol": np.array([2.5, 3.8, 6.5, 12.0]),
+    "isopropanol": np.array([1.6, 2.4, 4.0, 30.0]),
+}
+
+# Perfil estacionário de uma classe (por exemplo, para o ArduinoVirtual)
+def perfil_classe(classe):
+    return PERFIS_CLASSES[classe].copy()
+
+# Gera os dados em blocos. Cada bloco contém sessões inteiras e é uma tupla
+# (valores (n x 4), tempos em segundos desde o início, rótulos).
+#   classes: classes sorteadas para as sessões (padrão: todas as de PERFIS_CLASSES)
+#   taxa: leituras por segundo (o medicao.ino envia 1 por segundo)
+#   fracao_ar_limpo: parte inicial de cada sessão antes da exposição ao vapor
+#   tau: constante de tempo do transiente (s)
+#   deriva: deriva relativa máxima da linha de base por hora
+#   ruido: desvio padrão do ruído multiplicativo (em escala log)
+#   variacao_sessao: desvio padrão da sensibilidade de cada sessão (em escala log)
+def gerar_blocos(n_linhas, classes=None, linhas_por_sessao=600, taxa=1.0, tamanho_bloco=1_000_000, semente=0,
+                 fracao_ar_limpo=0.1, tau=30.0, deriva=0.02, ruido=0.03, variacao_sessao=0.05):
+    classes = list(PERFIS_CLASSES) if classes is None else list(classes)
+    perfis_log = np.log(np.array([PERFIS_CLASSES[c] for c in classes]))
+    base_log = np.log(RAZOES_AR_LIMPO)
+    rotulos_classes = np.array(classes, dtype=object)
+    sessoes_por_bloco = max(1, tamanho_bloco // linhas_por_sessao)
+    n_linhas = int(n_linhas)
+    t0 = fracao_ar_limpo * linhas_por_sessao / taxa
+
+    inicio = 0
+    indice_bloco = 0
+    while inicio < n_linhas:
+        fim = min(inicio + sessoes_por_bloco * linhas_por_sessao, n_linhas)
+        # Um gerador por bloco: o conteúdo de cada bloco não depende do tamanho dos anteriores
+        rng = np.random.default_rng([semente, indice_bloco])
+        n = fim - inicio
+        n_sessoes = -(-n // linhas_por_sessao)
+        classe_sessao = rng.integers(0, len(classes), n_sessoes)
+        sensibilidade = rng.normal(0.0, variacao_sessao, (n_sessoes, 4))
+        deriva_sessao = rng.uniform(-deriva, deriva, (n_sessoes, 4))
+
+        sessao = np.arange(n) // linhas_por_sessao
+        t = (np.arange(n) % linhas_por_sessao) / taxa
+        # Transiente: da linha de base até o nível da classe após o início da exposição
+        resposta = np.where(t >= t0, 1.0 - np.exp(-(t - t0) / tau), 0.0)[:, None]
+        alvo_log = perfis_log[classe_sessao[sessao]] + sensibilidade[sessao]
+        log_razao = base_log + (alvo_log - base_log) * resposta
+        log_razao += np.log1p(deriva_sessao[sessao] * (t / 3600.0)[:, None])
+        log_razao += rng.normal(0.0, ruido, (n, 4))
+        valores = np.round(np.exp(log_razao), 2)
+
+        tempos = (inicio + np.arange(n)) / taxa
+        yield valores, tempos, rotulos_classes[classe_sessao[sessao]]
+        inicio = fim
+        indice_bloco += 1
+
+# Dataset rotulado em memória (MQ3, MQ5, MQ6, MQ8, Tipo_álcool), no formato do treinamento.py
+def gerar_dataset(n_linhas, coluna_rotulo="Tipo_álcool", **kwargs):
+    blocos = list(gerar_blocos(n_linhas, **kwargs))
+    dados = pd.DataFrame(np.concatenate([b[0] for b in blocos]), columns=COLUNAS_SENSORES)
+    dados[coluna_rotulo] = np.concatenate([b[2] for b in blocos])
+    return dados
+
+# Grava os dados em CSV (com a coluna de rótulo, como o dataset de treinamento, ou sem ela,
+# como um arquivo de coleta) ou em sessão binária (.nes, sempre sem rótulo).
+# Retorna o número de linhas gravadas.
+def gravar(caminho, n_linhas, rotulado=True, coluna_rotulo="Tipo_álcool", **kwargs):
+    total = 0
+    if eh_sessao_binaria(caminho):
+        with GravadorSessaoBinaria(caminho, {"origem": "dados_sinteticos"}, linhas_por_bloco=65536) as gravador:
+            for valores, tempos, _ in gerar_blocos(n_linhas, **kwargs):
+                gravador.adicionar(valores, tempos)
+                total += len(valores)
+        return total
+
+    with open(caminho, 'w', encoding='utf-8', newline='') as f:
+        for i, (valores, _, rotulos) in enumerate(gerar_blocos(n_linhas, **kwargs)):
+            bloco = pd.DataFrame(valores, columns=COLUNAS_SENSORES)
+            if rotulado:
+                bloco[coluna_rotulo] = rotulos
+            bloco.to_csv(f, index=False, header=(i == 0), float_format="%.2f", lineterminator="\n")
+            total += len(bloco)
+    return total
+
+def main():
+    parser = argparse.ArgumentParser(description="Gerador de dados sintéticos dos sensores MQ.")
+    parser.add_argument("saida", help="Arquivo .csv ou .nes")
+    parser.add_argument("--linhas", type=lambda s: int(float(s)), default=100_000, help="Número de linhas (ex.: 1e6)")
+    parser.add_argument("--classe", action="append", choices=sorted(PERFIS_CLASSES),
+                        help="Classe simulada (pode ser repetida; padrão: todas)")
+    parser.add_argument("--sem-rotulo", action="store_true", help="CSV sem a coluna de rótulo (formato da coleta)")
+    parser.add_argument("--linhas-por-sessao", type=int, default=600)
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args()
+
+    n = gravar(args.saida, args.linhas, rotulado=not args.sem_rotulo, classes=args.classe,
+               linhas_por_sessao=args.linhas_por_sessao, semente=args.semente)
+    print(f"{n} linhas gravadas em {args.saida} ({os.path.getsize(args.saida) / 1e6:.1f} MB)")
+
+if __name__ == "__main__":
+    main()
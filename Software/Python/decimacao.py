@@ -0,0 +1,102 @@
+# Versões das bibliotecas utilizadas:
+# numpy: 2.3.1
+
+# Decimação mínimo/máximo incremental para o gráfico das leituras durante a coleta.
+#
+# As amostras são agrupadas em "baldes" de 'largura' amostras consecutivas; cada balde guarda
+# o tempo inicial/final e o mínimo/máximo de cada sensor. Quando o número de baldes chega ao
+# dobro de 'n_baldes', os baldes vizinhos são unidos dois a dois e a largura dobra. Assim a
+# memória e o número de pontos desenhados ficam limitados (entre n_baldes e 2 x n_baldes),
+# seja a sessão de 1 minuto ou de 12 horas, e picos isolados nunca desaparecem do gráfico.
+# No desenho (pontos()), cada balde vira dois pontos (mínimo e máximo), menos os baldes de uma
+# só amostra, que viram um ponto: uma sessão curta não é desenhada com o dobro dos pontos.
+
+import numpy as np
+
+class DecimadorMinMax:
+    def __init__(self, n_baldes=1000, n_colunas=4):
+        self.n_baldes = n_baldes
+        self.largura = 1 # Amostras por balde
+        capacidade = 2 * n_baldes
+        self.tempos = np.empty((capacidade, 2)) # Tempo inicial e final de cada balde
+        self.minimos = np.empty((capacidade, n_colunas))
+        self.maximos = np.empty((capacidade, n_colunas))
+        self.n = 0 # Baldes completos
+        self.total = 0 # Amostras recebidas
+        self.tempo_inicial = None
+        # Balde incompleto: [tempo inicial, tempo final, mínimos, máximos, contagem]
+        self._parcial = None
+
+    def adicionar(self, valores, tempos):
+        n = len(valores)
+        if n == 0:
+            return
+        if self.tempo_inicial is None:
+            self.tempo_inicial = float(tempos[0])
+        self.total += n
+        i = 0
+        if self._parcial is not None:
+            k = min(self.largura - self._parcial[4], n)
+            self._acumular(valores[:k], tempos[:k])
+            i = k
+            if self._parcial[4] >= self.largura:
+                self._guardar(np.array([[self._parcial[0], self._parcial[1]]]),
+                              self._parcial[2][None], self._parcial[3][None])
+                self._parcial = None
+        # Baldes completos de uma vez (vetorizado)
+        while n - i >= self.largura:
+            m = min((n - i) // self.largura, len(self.tempos) - self.n)
+            fim = i + m * self.largura
+            bloco = valores[i:fim].reshape(m, self.largura, -1)
+            t = tempos[i:fim].reshape(m, self.largura)
+            self._guardar(np.column_stack([t[:, 0], t[:, -1]]), bloco.min(axis=1), bloco.max(axis=1))
+            i = fim
+        if i < n:
+            self._acumular(valores[i:], tempos[i:])
+
+    def _acumular(self, valores, tempos):
+        if len(valores) == 0:
+            return
+        if self._parcial is None:
+            self._parcial = [float(tempos[0]), float(tempos[-1]), valores.min(axis=0), valores.max(axis=0), len(valores)]
+        else:
+            self._parcial[1] = float(tempos[-1])
+            self._parcial[2] = np.minimum(self._parcial[2], valores.min(axis=0))
+            self._parcial[3] = np.maximum(self._parcial[3], valores.max(axis=0))
+            self._parcial[4] += len(valores)
+
+    def _guardar(self, tempos, minimos, maximos):
+        m = len(tempos)
+        self.tempos[self.n:self.n + m] = tempos
+        self.minimos[self.n:self.n + m] = minimos
+        self.maximos[self.n:self.n + m] = maximos
+        self.n += m
+        if self.n == len(self.tempos):
+            self._compactar()
+
+    # Une os baldes dois a dois e dobra a largura
+    def _compactar(self):
+        metade = self.n // 2
+        self.tempos[:metade, 0] = self.tempos[0:self.n:2, 0]
+        self.tempos[:metade, 1] = self.tempos[1:self.n:2, 1]
+        self.minimos[:metade] = np.minimum(self.minimos[0:self.n:2], self.minimos[1:self.n:2])
+        self.maximos[:metade] = np.maximum(self.maximos[0:self.n:2], self.maximos[1:self.n:2])
+        self.n = metade
+        self.largura *= 2
+
+    # Retorna (tempos (n x 2), mínimos (n x colunas), máximos (n x colunas)), incluindo o balde incompleto
+    def serie(self):
+        tempos, minimos, maximos = self.tempos[:self.n], self.minimos[:self.n], self.maximos[:self.n]
+        if self._parcial is not None:
+            tempos = np.vstack([tempos, [[self._parcial[0], self._parcial[1]]]])
+            minimos = np.vstack([minimos, self._parcial[2]])
+            maximos = np.vstack([maximos, self._parcial[3]])
+        return tempos.copy(), minimos.copy(), maximos.copy()
+
+# Pontos da linha de uma série de DecimadorMinMax.serie(): (x (m,), y (m x colunas)). Um balde
+# com tempo inicial = final e mínimo = máximo (uma só amostra) vira um único ponto.
+def pontos(tempos, minimos, maximos):
+    duplo = (tempos[:, 0] != tempos[:, 1]) | (minimos != maximos).any(axis=1)
+    mascara = np.column_stack([np.ones(len(tempos), dtype=bool), duplo]).ravel()
+    y = np.stack([minimos, maximos], axis=1).reshape(-1, minimos.shape[1])
+    return tempos.ravel()[mascara], y[mascara]
@@ -0,0 +1,117 @@
+# Comunicação entre as threads de trabalho e a interface Tk.
+#
+# O Tkinter não é thread-safe: os widgets só podem ser alterados pela thread principal.
+# As threads de coleta e de análise colocam mensagens e ações em uma fila, que é esvaziada
+# pela thread principal a cada quadro (app.after). Todas as mensagens acumuladas desde o
+# último quadro entram no campo de status com um único insert + see, então uma rajada de
+# milhares de linhas custa uma atualização do widget por quadro.
+#
+# A análise roda em um executor em segundo plano; cada tarefa recebe um evento de
+# cancelamento que é verificado entre as etapas (leitura, classificação em lotes...).
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class FilaInterface:
+    # intervalo_ms: período de esvaziamento da fila (um quadro)
+    # maximo_mensagens_quadro: acima disso, só as últimas mensagens do quadro são mostradas
+    # maximo_linhas_status: o campo de status é podado para não crescer indefinidamente
+    def __init__(self, app, status_widget, intervalo_ms=50, maximo_mensagens_quadro=200, maximo_linhas_status=5000):
+        self.app = app
+        self.status_widget = status_widget
+        self.intervalo_ms = intervalo_ms
+        self.maximo_mensagens_quadro = maximo_mensagens_quadro
+        self.maximo_linhas_status = maximo_linhas_status
+        self._fila = queue.SimpleQueue()
+        self._ativa = False
+
+    def iniciar(self):
+        self._ativa = True
+        self.app.after(self.intervalo_ms, self._drenar)
+        return self
+
+    def parar(self):
+        self._ativa = False
+
+    # Pode ser chamada de qualquer thread
+    def mensagem(self, texto):
+        self._fila.put((None, texto))
+
+    # Agenda uma função para rodar na thread principal (gráficos, caixas de diálogo...)
+    def executar(self, funcao, *args, **kwargs):
+        self._fila.put((funcao, (args, kwargs)))
+
+    def _drenar(self):
+        if not self._ativa:
+            return
+        mensagens = []
+        try:
+            while True:
+                funcao, dados = self._fila.get_nowait()
+                if funcao is None:
+                    mensagens.append(dados)
+                    continue
+                # As mensagens anteriores à ação aparecem antes dela
+                self._mostrar(mensagens)
+                mensagens = []
+                args, kwargs = dados
+                try:
+                    funcao(*args, **kwargs)
+                except Exception as e:
+                    mensagens.append(f"Erro na atualização da interface: {e}")
+        except queue.Empty:
+            pass
+        self._mostrar(mensagens)
+        self.app.after(self.intervalo_ms, self._drenar)
+
+    def _mostrar(self, mensagens):
+        if not mensagens:
+            return
+        omitidas = len(mensagens) - self.maximo_mensagens_quadro
+        if omitidas > 0:
+            mensagens = [f"... ({omitidas} mensagens omitidas)"] + mensagens[-self.maximo_mensagens_quadro:]
+        widget = self.status_widget
+        widget.insert("end", "\n".join(mensagens) + "\n")
+        linhas = int(widget.index("end-1c").split(".")[0])
+        if linhas > self.maximo_linhas_status:
+            widget.delete("1.0", f"{linhas - self.maximo_linhas_status}.0")
+        widget.see("end")
+
+# Executor de tarefas em segundo plano com cancelamento.
+# A função recebe o evento de cancelamento como primeiro argumento e deve verificá-lo entre
+# as etapas. Enviar uma nova tarefa cancela a anterior (por padrão).
+class ExecutorCancelavel:
+    def __init__(self, max_workers=1):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analise")
+        self._atual = None
+        self._cancelado = None
+        self._trava = threading.Lock()
+
+    def enviar(self, funcao, *args, cancelar_anterior=True, **kwargs):
+        with self._trava:
+            if cancelar_anterior:
+                self._cancelar_atual()
+            cancelado = threading.Event()
+            futuro = self._executor.submit(funcao, cancelado, *args, **kwargs)
+            self._atual, self._cancelado = futuro, cancelado
+            return futuro
+
+    def _cancelar_atual(self):
+        if self._atual is not None and not self._atual.done():
+            self._cancelado.set()
+            self._atual.cancel() # Só tem efeito se a tarefa ainda não começou
+            return True
+        return False
+
+    # Retorna True se havia uma tarefa em andamento
+    def cancelar(self):
+        with self._trava:
+            return self._cancelar_atual()
+
+    def ocupado(self):
+        return self._atual is not None and not self._atual.done()
+
+    def encerrar(self):
+        self.cancelar()
+        self._executor.shutdown(wait=False, cancel_futures=True)
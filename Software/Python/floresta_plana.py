@@ -0,0 +1,150 @@
+# Versões das bibliotecas utilizadas:
+# scikit-learn: 1.7.0
+# numpy: 2.3.1
+
+# Inferência de baixa latência para o RandomForestClassifier treinado.
+# A floresta é "achatada" em vetores NumPy contíguos (feature, limiar, filho esquerdo,
+# filho direito e probabilidades das folhas) com os nós de todas as árvores em sequência.
+# A predição percorre todas as árvores de um lote ao mesmo tempo: a cada passo, todas as
+# combinações (amostra, árvore) que ainda não chegaram a uma folha descem um nível, e as
+# que chegaram saem da lista de ativas.
+# O resultado é idêntico ao predict_proba do scikit-learn.
+# É indicada para lotes pequenos (classificação em tempo real), onde o custo fixo de cada
+# chamada do scikit-learn domina; para milhares de linhas o scikit-learn volta a ser mais
+# rápido (ver benchmark_floresta_plana.py).
+#
+# compactar() converte os vetores para tipos menores (limiares e probabilidades em float32,
+# índices em int32, features em uint8), usados no artefato compacto (compactacao.py). Os
+# limiares float32 são arredondados para baixo: como X já é comparado em float32, o
+# caminho percorrido em cada árvore continua o mesmo do scikit-learn.
+
+import numpy as np
+
+class FlorestaPlana:
+    def __init__(self, feature, limiar, esquerda, direita, valores_folhas, raizes, classes, profundidade_maxima):
+        self.feature = feature
+        self.limiar = limiar
+        self.esquerda = esquerda
+        self.direita = direita
+        self.valores_folhas = valores_folhas
+        self.raizes = raizes
+        self.classes_ = classes
+        self.n_arvores = len(raizes)
+        self.profundidade_maxima = profundidade_maxima
+        self.folha = esquerda == np.arange(len(esquerda))
+
+    # Exporta um RandomForestClassifier (ou ExtraTreesClassifier) já treinado.
+    # 'arvores' (índices) exporta só um subconjunto das árvores, nessa ordem.
+    @classmethod
+    def de_floresta(cls, floresta, arvores=None):
+        features, limiares, esquerdas, direitas, valores, raizes = [], [], [], [], [], []
+        deslocamento = 0
+        profundidade_maxima = 0
+        estimadores = floresta.estimators_ if arvores is None else [floresta.estimators_[i] for i in arvores]
+        for arvore in estimadores:
+            t = arvore.tree_
+            folha = t.children_left == -1
+            # Os índices dos filhos passam a ser globais; nas folhas, os filhos apontam para o próprio nó
+            proprio = np.arange(t.node_count) + deslocamento
+            esquerdas.append(np.where(folha, proprio, t.children_left + deslocamento))
+            direitas.append(np.where(folha, proprio, t.children_right + deslocamento))
+            features.append(np.where(folha, 0, t.feature))
+            limiares.append(t.threshold)
+            # Nas versões atuais do scikit-learn, 'value' já guarda as proporções de cada classe
+            # e é usado diretamente pelo predict_proba; nas antigas, guardava contagens
+            v = t.value[:, 0, :]
+            soma = v.sum(axis=1, keepdims=True)
+            if not np.allclose(soma, 1.0):
+                soma[soma == 0] = 1.0
+                v = v / soma
+            valores.append(v)
+            raizes.append(deslocamento)
+            deslocamento += t.node_count
+            profundidade_maxima = max(profundidade_maxima, t.max_depth)
+        return cls(
+            feature=np.ascontiguousarray(np.concatenate(features), dtype=np.intp),
+            # O scikit-learn compara X (convertido para float32) com limiares float64
+            limiar=np.ascontiguousarray(np.concatenate(limiares), dtype=np.float64),
+            esquerda=np.ascontiguousarray(np.concatenate(esquerdas), dtype=np.intp),
+            direita=np.ascontiguousarray(np.concatenate(direitas), dtype=np.intp),
+            valores_folhas=np.ascontiguousarray(np.concatenate(valores), dtype=np.float64),
+            raizes=np.asarray(raizes, dtype=np.intp),
+            classes=floresta.classes_,
+            profundidade_maxima=profundidade_maxima,
+        )
+
+    # Versão com tipos menores (ver o comentário no início do arquivo)
+    def compactar(self):
+        limiar = self.limiar.astype(np.float32)
+        # Maior float32 <= limiar original: para x float32, x <= limiar32 equivale a x <= limiar
+        acima = limiar.astype(np.float64) > self.limiar
+        limiar[acima] = np.nextafter(limiar[acima], np.float32(-np.inf))
+        tipo_feature = np.uint8 if self.feature.max(initial=0) < 256 else np.int32
+        return FlorestaPlana(self.feature.astype(tipo_feature), limiar, self.esquerda.astype(np.int32),
+                             self.direita.astype(np.int32), self.valores_folhas.astype(np.float32),
+                             self.raizes.astype(np.int32), self.classes_, self.profundidade_maxima)
+
+    def tamanho_bytes(self):
+        return sum(v.nbytes for v in (self.feature, self.limiar, self.esquerda, self.direita, self.valores_folhas, self.raizes))
+
+    # Índice global da folha alcançada por cada (amostra, árvore), matriz (n_amostras x n_arvores)
+    def aplicar(self, X):
+        # Mesma conversão feita pelo scikit-learn antes de percorrer as árvores
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if self.limiar.dtype != np.float32:
+            X = X.astype(np.float64)
+        n, n_features = X.shape
+        X_plano = X.ravel()
+        nos = np.tile(self.raizes.astype(np.intp), n)
+        # Posição de cada amostra no vetor X_plano, repetida para cada árvore
+        base = np.repeat(np.arange(n) * n_features, self.n_arvores)
+        # Árvores de um só nó já começam na folha
+        ativos = np.flatnonzero(~self.folha[nos])
+        while ativos.size:
+            atuais = nos[ativos]
+            vai_esquerda = X_plano[base[ativos] + self.feature[atuais]] <= self.limiar[atuais]
+            proximos = np.where(vai_esquerda, self.esquerda[atuais], self.direita[atuais])
+            nos[ativos] = proximos
+            ativos = ativos[~self.folha[proximos]]
+        return nos.reshape(n, self.n_arvores)
+
+    # Amostras percorridas de uma vez no predict_proba: limita os vetores de trabalho
+    # (n_amostras x n_arvores) em arquivos grandes
+    COMBINACOES_POR_BLOCO = 1 << 20
+
+    def predict_proba(self, X):
+        X = np.asarray(X)
+        tamanho_bloco = max(1, self.COMBINACOES_POR_BLOCO // self.n_arvores)
+        if len(X) > tamanho_bloco:
+            return np.concatenate([self.predict_proba(X[i:i + tamanho_bloco]) for i in range(0, len(X), tamanho_bloco)])
+        folhas = self.aplicar(X)
+        # Média das probabilidades das folhas de todas as árvores. A soma é feita árvore a
+        # árvore, na mesma ordem do scikit-learn, para que o resultado seja idêntico bit a bit.
+        valores = self.valores_folhas[folhas.T]
+        proba = valores[0].astype(np.float64)
+        for valores_arvore in valores[1:]:
+            proba += valores_arvore
+        proba /= self.n_arvores
+        return proba
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def salvar(self, caminho):
+        np.savez(caminho, feature=self.feature, limiar=self.limiar, esquerda=self.esquerda,
+                 direita=self.direita, valores_folhas=self.valores_folhas, raizes=self.raizes,
+                 classes=np.asarray(self.classes_).astype(str) if np.asarray(self.classes_).dtype == object else self.classes_,
+                 profundidade_maxima=self.profundidade_maxima)
+
+    @classmethod
+    def carregar(cls, caminho):
+        with np.load(caminho, allow_pickle=False) as dados:
+            return cls(dados["feature"], dados["limiar"], dados["esquerda"], dados["direita"],
+                       dados["valores_folhas"], dados["raizes"], dados["classes"], int(dados["profundidade_maxima"]))
+
+# Devolve a versão achatada do modelo quando ele é uma floresta; outros modelos são devolvidos sem alteração
+def achatar_se_possivel(modelo):
+    if hasattr(modelo, "estimators_") and all(hasattr(e, "tree_") for e in np.ravel(modelo.estimators_)) \
+            and getattr(modelo, "n_outputs_", 1) == 1 and hasattr(modelo, "predict_proba"):
+        return FlorestaPlana.de_floresta(modelo)
+    return modelo
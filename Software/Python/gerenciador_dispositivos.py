@@ -0,0 +1,154 @@
+# Versões das bibliotecas utilizadas:
+# pyserial: 3.5
+# numpy: 2.3.1
+
+# Gerenciador de aquisição para vários narizes eletrônicos ao mesmo tempo.
+# Cada dispositivo tem a sua própria thread leitora (aquisicao.Aquisicao), o seu próprio
+# evento de parada e o seu próprio arquivo de saída; uma porta lenta ou travada não
+# atrasa as outras. Iniciar ou parar um dispositivo não depende do número de dispositivos:
+# parar apenas sinaliza o evento (sem esperar a thread), e 'parar_todos' usa um único
+# evento compartilhado pelas coletas em andamento. Depois de sinalizado, esse evento é
+# trocado por um novo, de modo que uma coleta iniciada em seguida não é afetada pela parada
+# anterior (e as threads que ainda estão terminando continuam vendo a parada).
+#
+# Exemplo de uso:
+#   python gerenciador_dispositivos.py COM3=amostra_1.csv COM4=amostra_2.csv --baud 9600
+
+import argparse
+import threading
+import time
+
+import aquisicao
+
+class GerenciadorAquisicao:
+    def __init__(self, ao_mensagem=None):
+        self.ao_mensagem = ao_mensagem or (lambda nome, texto: None)
+        self.dispositivos = {}
+        self.erros = {}
+        self._threads = {}
+        self._parar_todos = threading.Event()
+        self._lock = threading.Lock()
+
+    # Registra um dispositivo; os parâmetros extras são repassados para aquisicao.Aquisicao
+    def adicionar(self, nome, porta, baud_rate, arquivo_saida, **kwargs):
+        with self._lock:
+            if nome in self.dispositivos:
+                raise ValueError(f"Já existe um dispositivo chamado '{nome}'.")
+            coleta = aquisicao.Aquisicao(porta, baud_rate, arquivo_saida,
+                                         ao_mensagem=lambda texto: self.ao_mensagem(nome, texto),
+                                         parar_global=self._parar_todos, **kwargs)
+            self.dispositivos[nome] = coleta
+        return coleta
+
+    def _executar(self, nome, coleta):
+        try:
+            coleta.executar()
+        except Exception as e:
+            self.erros[nome] = e
+            self.ao_mensagem(nome, f"Erro na coleta de dados: {e}")
+
+    def iniciar(self, nome):
+        with self._lock:
+            thread = self._threads.get(nome)
+            if thread is not None and thread.is_alive():
+                raise RuntimeError(f"A coleta do dispositivo '{nome}' já está em andamento.")
+            coleta = self.dispositivos[nome]
+            coleta.reiniciar()
+            coleta.parar_global = self._parar_todos
+            self.erros.pop(nome, None)
+            thread = threading.Thread(target=self._executar, args=(nome, coleta), daemon=True, name=f"coleta-{nome}")
+            self._threads[nome] = thread
+        thread.start()
+
+    def iniciar_todos(self):
+        for nome in list(self.dispositivos):
+            self.iniciar(nome)
+
+    # Só sinaliza a parada; use 'aguardar' para esperar o término
+    def parar(self, nome):
+        self.dispositivos[nome].parar()
+
+    def parar_todos(self):
+        with self._lock:
+            self._parar_todos.set()
+            self._parar_todos = threading.Event()
+
+    def aguardar(self, nome=None, timeout=None):
+        nomes = [nome] if nome is not None else list(self._threads)
+        limite = None if timeout is None else time.monotonic() + timeout
+        for n in nomes:
+            restante = None if limite is None else max(0.0, limite - time.monotonic())
+            self._threads[n].join(restante)
+
+    def ativo(self, nome):
+        thread = self._threads.get(nome)
+        return thread is not None and thread.is_alive()
+
+    # Estatísticas por dispositivo e agregadas (vazão total e saúde de cada porta)
+    def estatisticas(self, tempo_sem_dados_max=5.0):
+        agora = time.time()
+        por_dispositivo = {}
+        total_validas = total_malformadas = total_bytes = 0
+        taxa_total = 0.0
+        for nome, coleta in list(self.dispositivos.items()):
+            est = dict(coleta.estatisticas)
+            ultima = est["ultima_leitura"]
+            est["estado"] = coleta.estado
+            est["amostras_por_segundo"] = coleta.taxa_amostras()
+            est["segundos_sem_dados"] = None if ultima is None else agora - ultima
+            # Saudável: coletando e recebendo dados recentemente
+            est["saudavel"] = (coleta.estado == "coletando" and ultima is not None
+                               and agora - ultima <= tempo_sem_dados_max)
+            if nome in self.erros:
+                est["erro"] = str(self.erros[nome])
+            por_dispositivo[nome] = est
+            total_validas += est["linhas_validas"]
+            total_malformadas += est["linhas_malformadas"]
+            total_bytes += est["bytes_lidos"]
+            if coleta.estado == "coletando":
+                taxa_total += est["amostras_por_segundo"]
+        return {
+            "dispositivos": por_dispositivo,
+            "total": {
+                "dispositivos": len(por_dispositivo),
+                "coletando": sum(1 for e in por_dispositivo.values() if e["estado"] == "coletando"),
+                "saudaveis": sum(1 for e in por_dispositivo.values() if e["saudavel"]),
+                "linhas_validas": total_validas,
+                "linhas_malformadas": total_malformadas,
+                "bytes_lidos": total_bytes,
+                "amostras_por_segundo": taxa_total,
+            },
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description="Coleta simultânea de vários narizes eletrônicos.")
+    parser.add_argument("dispositivos", nargs="+", help="Pares PORTA=ARQUIVO.csv (ex.: COM3=amostra_1.csv)")
+    parser.add_argument("--baud", type=int, default=9600)
+    parser.add_argument("--protocolo", choices=["auto", "texto", "binario"], default="auto",
+                        help="Formato dos dados do Arduino (padrão: detectado na sincronização)")
+    parser.add_argument("--intervalo", type=float, default=5.0, help="Intervalo entre os relatórios de estatísticas (s)")
+    args = parser.parse_args()
+
+    gerenciador = GerenciadorAquisicao(ao_mensagem=lambda nome, texto: print(f"[{nome}] {texto}", flush=True))
+    for item in args.dispositivos:
+        porta, _, arquivo_saida = item.partition('=')
+        if not arquivo_saida:
+            parser.error(f"Use PORTA=ARQUIVO.csv (recebido: '{item}')")
+        gerenciador.adicionar(porta, porta, args.baud, arquivo_saida, protocolo=args.protocolo)
+
+    gerenciador.iniciar_todos()
+    print("Coletando... Pressione Ctrl+C para encerrar.")
+    try:
+        while any(gerenciador.ativo(nome) for nome in gerenciador.dispositivos):
+            time.sleep(args.intervalo)
+            total = gerenciador.estatisticas()["total"]
+            print(f"{total['coletando']}/{total['dispositivos']} dispositivos coletando "
+                  f"({total['saudaveis']} saudáveis), {total['amostras_por_segundo']:.1f} amostras/s, "
+                  f"{total['linhas_validas']} leituras, {total['linhas_malformadas']} malformadas", flush=True)
+    except KeyboardInterrupt:
+        pass
+    gerenciador.parar_todos()
+    gerenciador.aguardar()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+# Versões das bibliotecas utilizadas:
+# matplotlib: 3.10.3
+# seaborn: 0.13.2
+# numpy: 2.3.1
+
+# Construção das figuras da análise (gráfico radar do perfil dos sensores e gráfico de
+# barras da confiança), sem dependência do Tkinter. A interface incorpora as figuras em
+# um FigureCanvasTkAgg; os benchmarks as desenham sem tela (backend Agg).
+#
+# figura_perfil_sensores e figura_confianca_predicao criam uma figura nova a cada chamada.
+# GraficoPerfil e GraficoConfianca criam a figura e os eixos uma única vez e, a cada análise,
+# só atualizam os dados das linhas, áreas, barras e textos. As partes fixas (eixos, grade,
+# perfis das classes) ficam guardadas como fundo e só os elementos da amostra são redesenhados
+# por cima (blitting); o desenho completo só é refeito quando o modelo (as classes) muda.
+
+import matplotlib.pyplot as plt
+import seaborn as sns
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import metricas
+from classificador import COLUNAS_SENSORES
+from decimacao import pontos
+
+# Gráfico radar com os perfis médios normalizados das classes e a média da amostra
+# (normalizada com o scaler do modelo)
+def figura_perfil_sensores(dados_desconhecidos_df, artefato, substancia_predita):
+    colunas_sensores = COLUNAS_SENSORES
+
+    media_desconhecida = dados_desconhecidos_df[colunas_sensores].mean().values
+
+    classes_conhecidas = artefato["classes"]
+
+    # Normaliza a amostra desconhecida usando o scaler do modelo
+    media_desconhecida_norm = artefato["scaler"].transform(media_desconhecida.reshape(1, -1))[0]
+
+    # Perfis médios das classes, normalizados no treinamento
+    perfis_conhecidos_norm = artefato["centroides_norm"]
+
+    num_vars = len(colunas_sensores)
+    angles = np.linspace(0, 2 * np.pi, num_vars, endpoint=False).tolist()
+    angles += angles[:1]
+
+    media_desconhecida_norm = np.append(media_desconhecida_norm, media_desconhecida_norm[0])
+
+    fig, ax = plt.subplots(figsize=(6.5, 6.5), subplot_kw=dict(polar=True))
+
+    for i, classe in enumerate(classes_conhecidas):
+        if not np.isnan(perfis_conhecidos_norm[i]).any():
+            valores_classe = perfis_conhecidos_norm[i]
+            valores_classe = np.append(valores_classe, valores_classe[0])
+            ax.plot(angles, valores_classe, linewidth=1, linestyle='solid', label=classe.upper(), color=sns.color_palette("tab10")[i])
+            ax.fill(angles, valores_classe, color=sns.color_palette("tab10")[i], alpha=0.25)
+
+    ax.plot(angles, media_desconhecida_norm, linewidth=2, linestyle='dashed', label=f'Amostra ({substancia_predita.upper()})', color='black', marker='o')
+    ax.fill(angles, media_desconhecida_norm, color='gray', alpha=0.1)
+
+    ax.set_theta_offset(np.pi / 2)
+    ax.set_theta_direction(-1)
+    ax.set_rlabel_position(0)
+
+    ax.set_xticks(angles[:-1])
+    ax.set_xticklabels(colunas_sensores)
+
+    ax.set_yticks(np.arange(0, 1.1, 0.2))
+    ax.set_yticklabels(['0', '0.2', '0.4', '0.6', '0.8', '1.0'], color='gray', size=8)
+    ax.set_ylim(0, 1.0)
+
+    ax.set_title('Perfil Comparativo de Sensores', fontsize=14, pad=20)
+
+    ax.legend(loc='upper right', bbox_to_anchor=(2.0, 1.1))
+
+    fig.subplots_adjust(top=0.81)
+    return fig
+
+# Gráfico de barras com a probabilidade média de cada classe (confianca_por_classe: pd.Series)
+def figura_confianca_predicao(confianca_por_classe, substancia_predita):
+    fig, ax = plt.subplots(figsize=(6, 4))
+
+    confianca_por_classe_percent = confianca_por_classe * 100
+    confianca_por_classe_sorted = confianca_por_classe_percent.sort_values(ascending=False)
+
+    sns.barplot(x=confianca_por_classe_sorted.index, y=confianca_por_classe_sorted.values, ax=ax, palette="viridis", hue=confianca_por_classe_sorted.index, legend=False)
+
+    ax.set_title(f"Confiança da Predição (Amostra: {substancia_predita.upper()})", fontsize=14)
+    ax.set_xlabel("Tipo de Álcool")
+    ax.set_ylabel("Probabilidade Média (%)")
+    ax.set_ylim(0, 105)
+
+    ax.tick_params(axis='x', rotation=45, colors='black', labelsize=10)
+    ax.tick_params(axis='y', colors='black')
+
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+
+    for index, value in enumerate(confianca_por_classe_sorted.values):
+        ax.text(index, value + 2, f'{value:.1f}%', ha='center', va='bottom', fontsize=9, color='black')
+
+    fig.tight_layout()
+    return fig
+
+# Base dos gráficos persistentes: fundo guardado a cada desenho completo e artistas
+# "animados" (excluídos do desenho completo) redesenhados por cima dele
+class _GraficoPersistente:
+    def __init__(self, figsize):
+        # Figure sem o pyplot: não fica registrada globalmente e é liberada com o objeto.
+        # O canvas Agg é substituído pelo da interface (FigureCanvasTkAgg(grafico.fig, ...)).
+        self.fig = Figure(figsize=figsize)
+        FigureCanvasAgg(self.fig)
+        self.redesenhos_completos = 0
+        self.redesenhos_parciais = 0
+        self._fundo = None
+        # A conexão fica na figura e continua valendo quando o canvas é trocado
+        self.fig.canvas.mpl_connect('draw_event', self._ao_desenhar)
+
+    def _animados(self):
+        return []
+
+    def _desenhar_animados(self):
+        for artista in self._animados():
+            artista.axes.draw_artist(artista)
+
+    # Chamado após cada desenho completo (inclusive redimensionamento da janela)
+    def _ao_desenhar(self, evento):
+        self._fundo = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        self._desenhar_animados()
+        self.redesenhos_completos += 1
+
+    def _redesenhar(self, completo):
+        canvas = self.fig.canvas
+        if completo or self._fundo is None:
+            canvas.draw()
+            metricas.contar("grafico.redesenhos_completos")
+        else:
+            canvas.restore_region(self._fundo)
+            self._desenhar_animados()
+            self.redesenhos_parciais += 1
+            metricas.contar("grafico.redesenhos_parciais")
+        canvas.blit(self.fig.bbox)
+
+# Gráfico radar persistente (mesma aparência de figura_perfil_sensores)
+class GraficoPerfil(_GraficoPersistente):
+    def __init__(self, figsize=(6.5, 6.5)):
+        super().__init__(figsize)
+        self.ax = self.fig.add_subplot(polar=True)
+        angulos = np.linspace(0, 2 * np.pi, len(COLUNAS_SENSORES), endpoint=False)
+        self._angulos = np.append(angulos, angulos[0])
+
+        ax = self.ax
+        ax.set_theta_offset(np.pi / 2)
+        ax.set_theta_direction(-1)
+        ax.set_rlabel_position(0)
+        ax.set_xticks(angulos)
+        ax.set_xticklabels(COLUNAS_SENSORES)
+        ax.set_yticks(np.arange(0, 1.1, 0.2))
+        ax.set_yticklabels(['0', '0.2', '0.4', '0.6', '0.8', '1.0'], color='gray', size=8)
+        ax.set_ylim(0, 1.0)
+        ax.set_title('Perfil Comparativo de Sensores', fontsize=14, pad=20)
+        self.fig.subplots_adjust(top=0.81)
+
+        zeros = np.zeros(len(self._angulos))
+        self.linha_amostra, = ax.plot(self._angulos, zeros, linewidth=2, linestyle='dashed', label='Amostra',
+                                      color='black', marker='o', animated=True)
+        self.area_amostra = ax.fill(self._angulos, zeros, color='gray', alpha=0.1, animated=True)[0]
+        self._artistas_classes = []
+        self._modelo = None
+        self.legenda = None
+
+    def _animados(self):
+        # A legenda também é redesenhada por cima, porque o rótulo da amostra muda a cada análise
+        # (ela só existe depois da primeira análise)
+        return [self.area_amostra, self.linha_amostra] + ([self.legenda] if self.legenda is not None else [])
+
+    def _desenhar_classes(self, artefato):
+        for artista in self._artistas_classes:
+            artista.remove()
+        self._artistas_classes = []
+        perfis_conhecidos_norm = artefato["centroides_norm"]
+        for i, classe in enumerate(artefato["classes"]):
+            if not np.isnan(perfis_conhecidos_norm[i]).any():
+                valores_classe = np.append(perfis_conhecidos_norm[i], perfis_conhecidos_norm[i][0])
+                cor = sns.color_palette("tab10")[i]
+                self._artistas_classes += self.ax.plot(self._angulos, valores_classe, linewidth=1, linestyle='solid', label=classe.upper(), color=cor)
+                self._artistas_classes += self.ax.fill(self._angulos, valores_classe, color=cor, alpha=0.25)
+        # Amostra por último, como em figura_perfil_sensores
+        linhas = [a for a in self._artistas_classes if a in self.ax.lines] + [self.linha_amostra]
+        self.legenda = self.ax.legend(handles=linhas, loc='upper right', bbox_to_anchor=(2.0, 1.1))
+        self.legenda.set_animated(True)
+
+    @metricas.cronometrar("grafico.perfil")
+    def atualizar(self, dados_desconhecidos_df, artefato, substancia_predita):
+        media_desconhecida = dados_desconhecidos_df[COLUNAS_SENSORES].mean().values
+        media_desconhecida_norm = artefato["scaler"].transform(media_desconhecida.reshape(1, -1))[0]
+
+        rotulo = f'Amostra ({substancia_predita.upper()})'
+        self.linha_amostra.set_label(rotulo)
+        modelo = artefato.get("hash", id(artefato))
+        completo = modelo != self._modelo
+        if completo:
+            self._desenhar_classes(artefato)
+            self._modelo = modelo
+        else:
+            # A amostra é a última entrada da legenda
+            self.legenda.get_texts()[-1].set_text(rotulo)
+
+        valores = np.append(media_desconhecida_norm, media_desconhecida_norm[0])
+        self.linha_amostra.set_data(self._angulos, valores)
+        self.area_amostra.set_xy(np.column_stack([self._angulos, valores]))
+        self._redesenhar(completo)
+
+# Gráfico de barras persistente (mesma aparência de figura_confianca_predicao)
+class GraficoConfianca(_GraficoPersistente):
+    def __init__(self, figsize=(6, 4)):
+        super().__init__(figsize)
+        self.ax = self.fig.add_subplot()
+        ax = self.ax
+        ax.set_xlabel("Tipo de Álcool")
+        ax.set_ylabel("Probabilidade Média (%)")
+        ax.set_ylim(0, 105)
+        ax.tick_params(axis='x', rotation=45, colors='black', labelsize=10)
+        ax.tick_params(axis='y', colors='black')
+        ax.grid(axis='y', linestyle='--', alpha=0.7)
+        ax.set_title("Confiança da Predição", fontsize=14)
+        ax.title.set_animated(True)
+        self.barras = []
+        self.textos = []
+        self.rotulos = []
+        self._classes = None
+
+    def _animados(self):
+        return self.barras + self.textos + self.rotulos + [self.ax.title]
+
+    # As barras ficam em ordem decrescente de probabilidade, então os nomes das classes no eixo x
+    # mudam de posição a cada análise: eles são textos redesenhados por cima dos rótulos do eixo
+    def _criar_barras(self, classes):
+        for artista in self.barras + self.textos + self.rotulos:
+            artista.remove()
+        n = len(classes)
+        self.barras = list(self.ax.bar(range(n), np.zeros(n), color=sns.color_palette("viridis", n, desat=0.75), animated=True))
+        self.textos = [self.ax.text(i, 0, "", ha='center', va='bottom', fontsize=9, color='black', animated=True) for i in range(n)]
+        self.rotulos = [self.ax.annotate(classe, xy=(i, 0), xycoords=('data', 'axes fraction'), xytext=(0, -3.5),
+                                         textcoords='offset points', rotation=45, ha='center', va='top', fontsize=10,
+                                         color='black', animated=True)
+                        for i, classe in enumerate(classes)]
+        self.ax.set_xlim(-0.5, n - 0.5)
+        self.ax.set_xticks(range(n))
+        # Os rótulos do eixo continuam lá, transparentes, para o layout e a posição do título do eixo
+        self.ax.set_xticklabels(classes)
+        self.ax.tick_params(axis='x', labelcolor='none')
+        self.fig.tight_layout()
+
+    # confianca_por_classe: pd.Series com as probabilidades médias (0 a 1)
+    @metricas.cronometrar("grafico.confianca")
+    def atualizar(self, confianca_por_classe, substancia_predita):
+        confianca_por_classe_sorted = (confianca_por_classe * 100).sort_values(ascending=False)
+        classes = frozenset(confianca_por_classe_sorted.index)
+        completo = classes != self._classes
+        if completo:
+            self._criar_barras(confianca_por_classe_sorted.index)
+            self._classes = classes
+
+        for index, (barra, texto, rotulo, (classe, value)) in enumerate(zip(self.barras, self.textos, self.rotulos, confianca_por_classe_sorted.items())):
+            barra.set_height(value)
+            texto.set_position((index, value + 2))
+            texto.set_text(f'{value:.1f}%')
+            rotulo.set_text(classe)
+        self.ax.set_title(f"Confiança da Predição (Amostra: {substancia_predita.upper()})", fontsize=14)
+        self._redesenhar(completo)
+
+# Gráfico das leituras dos quatro sensores ao longo da coleta (um eixo por sensor), a partir
+# da série decimada (decimacao.DecimadorMinMax): cada balde vira um segmento do mínimo ao
+# máximo (ou um ponto, se tiver uma só amostra), então o número de pontos não depende da
+# duração da sessão.
+# Os limites dos eixos crescem com folga (o eixo do tempo dobra) e só nesses momentos a figura
+# é redesenhada por completo; nas demais atualizações só as linhas são redesenhadas.
+class GraficoSensores(_GraficoPersistente):
+    def __init__(self, figsize=(8, 6), janela_inicial=60.0):
+        super().__init__(figsize)
+        self.eixos = self.fig.subplots(len(COLUNAS_SENSORES), 1, sharex=True)
+        self.linhas = []
+        for i, (ax, coluna) in enumerate(zip(self.eixos, COLUNAS_SENSORES)):
+            ax.set_ylabel(coluna)
+            ax.grid(linestyle='--', alpha=0.5)
+            linha, = ax.plot([], [], linewidth=1, color=sns.color_palette("tab10")[i], animated=True)
+            self.linhas.append(linha)
+        self.eixos[-1].set_xlabel("Tempo (s)")
+        self.eixos[0].set_xlim(0, janela_inicial)
+        self.fig.suptitle("Leituras dos Sensores (Rs/R0)", fontsize=12)
+        self.fig.tight_layout()
+        self._janela_inicial = janela_inicial
+        self._limites_y = [None] * len(COLUNAS_SENSORES)
+
+    def _animados(self):
+        return self.linhas
+
+    def limpar(self):
+        for linha in self.linhas:
+            linha.set_data([], [])
+        self.eixos[0].set_xlim(0, self._janela_inicial)
+        self._limites_y = [None] * len(COLUNAS_SENSORES)
+        self._redesenhar(True)
+
+    # tempos (n x 2), minimos e maximos (n x 4), como em DecimadorMinMax.serie();
+    # tempo_inicial é o instante mostrado como 0 s
+    @metricas.cronometrar("grafico.sensores")
+    def atualizar(self, tempos, minimos, maximos, tempo_inicial):
+        if len(tempos) == 0:
+            return
+        x, y = pontos(tempos - tempo_inicial, minimos, maximos)
+        completo = False
+        x_max = self.eixos[0].get_xlim()[1]
+        if x[-1] > x_max:
+            while x[-1] > x_max:
+                x_max *= 2
+            self.eixos[0].set_xlim(0, x_max)
+            completo = True
+        for j, (ax, linha) in enumerate(zip(self.eixos, self.linhas)):
+            linha.set_data(x, y[:, j])
+            menor, maior = np.nanmin(minimos[:, j]), np.nanmax(maximos[:, j])
+            if not np.isfinite(menor) or not np.isfinite(maior):
+                continue
+            limites = self._limites_y[j]
+            if limites is None or menor < limites[0] or maior > limites[1]:
+                folga = 0.25 * max(maior - menor, abs(maior) * 0.05, 1e-3)
+                self._limites_y[j] = (menor - folga, maior + folga)
+                ax.set_ylim(*self._limites_y[j])
+                completo = True
+        self._redesenhar(completo)
@@ -0,0 +1,263 @@
+# Índice local (SQLite) das amostras já classificadas.
+#
+# Cada análise fica registrada pela chave (hash do conteúdo da amostra, hash do artefato do
+# modelo): as probabilidades médias por classe, a decisão final (classe ou INDEFINIDA), a
+# confiança, o nº de leituras e estatísticas de cada sensor (média, desvio, mín., máx.).
+# - Analisar de novo o mesmo arquivo com o mesmo modelo devolve o resultado do índice, sem
+#   ler o CSV nem rodar o predict_proba (nucleo.analisar_arquivo). Trocar o modelo muda o
+#   hash do artefato, e a amostra é classificada de novo.
+# - O hash de cada arquivo é memorizado junto com o tamanho e a data de modificação, de modo
+#   que um arquivo que não mudou nem precisa ser lido para encontrar o resultado.
+# - As consultas (consultar() ou a linha de comando) usam só o índice, ex.: as amostras
+#   classificadas como metanol na última semana com confiança abaixo de 80%:
+#
+#     python indice_resultados.py --classe metanol --desde 7d --confianca-max 80
+#
+# Só usa a biblioteca padrão. Cada operação abre a sua própria conexão, então o índice pode
+# ser usado pela thread da análise e por outros processos ao mesmo tempo (modo WAL).
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+
+ARQUIVO_INDICE = "indice_resultados.sqlite"
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS analises (
+    hash_amostra TEXT NOT NULL,
+    hash_artefato TEXT NOT NULL,
+    arquivo TEXT NOT NULL,
+    analisada_em REAL NOT NULL,
+    ultimo_uso REAL NOT NULL,
+    usos INTEGER NOT NULL DEFAULT 1,
+    substancia TEXT NOT NULL,
+    classe_predita TEXT NOT NULL,
+    confianca REAL NOT NULL,
+    n_amostras INTEGER NOT NULL,
+    probabilidades TEXT NOT NULL,
+    estatisticas TEXT,
+    duracao_s REAL,
+    PRIMARY KEY (hash_amostra, hash_artefato)
+);
+CREATE INDEX IF NOT EXISTS analises_classe ON analises (classe_predita, analisada_em);
+CREATE INDEX IF NOT EXISTS analises_substancia ON analises (substancia, analisada_em);
+CREATE INDEX IF NOT EXISTS analises_data ON analises (analisada_em);
+CREATE TABLE IF NOT EXISTS arquivos (
+    caminho TEXT PRIMARY KEY,
+    tamanho INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    hash TEXT NOT NULL
+);
+"""
+
+def hash_arquivo(caminho):
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+# Tamanho e data de modificação: mudam quando o arquivo é alterado (ex.: coleta ainda gravando)
+def assinatura_arquivo(caminho):
+    info = os.stat(caminho)
+    return info.st_size, info.st_mtime_ns
+
+# Converte "7d", "12h", "30m" (relativo a agora), "AAAA-MM-DD" ou "AAAA-MM-DD HH:MM" em timestamp
+def interpretar_data(texto):
+    relativo = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([dhm])\s*", texto)
+    if relativo:
+        segundos = {"d": 86400, "h": 3600, "m": 60}[relativo.group(2)]
+        return time.time() - float(relativo.group(1)) * segundos
+    for formato in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return time.mktime(time.strptime(texto.strip(), formato))
+        except ValueError:
+            pass
+    raise ValueError(f"Data inválida: '{texto}' (use AAAA-MM-DD, AAAA-MM-DD HH:MM ou 7d, 12h, 30m).")
+
+class IndiceResultados:
+    def __init__(self, caminho=ARQUIVO_INDICE):
+        self.caminho = caminho
+        with self._conectar() as conexao:
+            conexao.executescript(_ESQUEMA)
+
+    def _conectar(self):
+        conexao = sqlite3.connect(self.caminho, timeout=10)
+        conexao.row_factory = sqlite3.Row
+        conexao.execute("PRAGMA journal_mode=WAL")
+        return _Conexao(conexao)
+
+    # Hash do conteúdo do arquivo, reaproveitado enquanto o tamanho e a data de modificação
+    # não mudarem (um arquivo alterado durante o cálculo não é memorizado)
+    def hash_amostra(self, arquivo):
+        caminho = os.path.abspath(arquivo)
+        assinatura = assinatura_arquivo(caminho)
+        with self._conectar() as conexao:
+            linha = conexao.execute("SELECT tamanho, mtime_ns, hash FROM arquivos WHERE caminho = ?", (caminho,)).fetchone()
+            if linha is not None and (linha["tamanho"], linha["mtime_ns"]) == assinatura:
+                return linha["hash"]
+            h = hash_arquivo(caminho)
+            if assinatura_arquivo(caminho) == assinatura:
+                conexao.execute("INSERT OR REPLACE INTO arquivos (caminho, tamanho, mtime_ns, hash) VALUES (?, ?, ?, ?)",
+                                (caminho, *assinatura, h))
+        return h
+
+    # Resultado gravado para (amostra, artefato), ou None. Um acerto atualiza o último uso.
+    def buscar(self, hash_amostra, hash_artefato):
+        with self._conectar() as conexao:
+            linha = conexao.execute("SELECT * FROM analises WHERE hash_amostra = ? AND hash_artefato = ?",
+                                    (hash_amostra, hash_artefato)).fetchone()
+            if linha is None:
+                return None
+            conexao.execute("UPDATE analises SET ultimo_uso = ?, usos = usos + 1 WHERE hash_amostra = ? AND hash_artefato = ?",
+                            (time.time(), hash_amostra, hash_artefato))
+        return _registro(linha)
+
+    # Grava o resultado de classificador.classificar_dados. 'estatisticas': sensor -> {media, desvio, minimo, maximo}.
+    def gravar(self, hash_amostra, hash_artefato, arquivo, resultado, estatisticas=None, duracao_s=None):
+        probabilidades = resultado["probabilidades"]
+        agora = time.time()
+        with self._conectar() as conexao:
+            conexao.execute(
+                "INSERT OR REPLACE INTO analises (hash_amostra, hash_artefato, arquivo, analisada_em, ultimo_uso, usos, "
+                "substancia, classe_predita, confianca, n_amostras, probabilidades, estatisticas, duracao_s) "
+                "VALUES (?, ?, ?, ?, ?, 1, ?, ?, ?, ?, ?, ?, ?)",
+                (hash_amostra, hash_artefato, os.path.abspath(arquivo), agora, agora,
+                 resultado["substancia"], max(probabilidades, key=probabilidades.get), float(resultado["confianca"]),
+                 int(resultado["n_amostras"]), json.dumps(probabilidades),
+                 json.dumps(estatisticas) if estatisticas is not None else None, duracao_s))
+
+    # Análises que atendem a todos os filtros informados, da mais recente para a mais antiga.
+    # 'classe': classe de maior probabilidade (mesmo quando a decisão foi INDEFINIDA);
+    # 'substancia': decisão final exata; 'desde'/'ate': timestamps; confiança em %;
+    # 'artefato': prefixo do hash do artefato; 'arquivo': trecho do caminho.
+    def consultar(self, classe=None, substancia=None, desde=None, ate=None, confianca_min=None, confianca_max=None,
+                  artefato=None, arquivo=None, limite=None):
+        condicoes, parametros = [], []
+        for condicao, valor in (("classe_predita = ?", classe), ("substancia = ?", substancia),
+                                ("analisada_em >= ?", desde), ("analisada_em <= ?", ate),
+                                ("confianca >= ?", confianca_min), ("confianca < ?", confianca_max)):
+            if valor is not None:
+                condicoes.append(condicao)
+                parametros.append(valor)
+        if artefato is not None:
+            condicoes.append("hash_artefato LIKE ?")
+            parametros.append(artefato + "%")
+        if arquivo is not None:
+            condicoes.append("arquivo LIKE ?")
+            parametros.append(f"%{arquivo}%")
+        sql = "SELECT * FROM analises"
+        if condicoes:
+            sql += " WHERE " + " AND ".join(condicoes)
+        sql += " ORDER BY analisada_em DESC"
+        if limite is not None:
+            sql += " LIMIT ?"
+            parametros.append(int(limite))
+        with self._conectar() as conexao:
+            return [_registro(linha) for linha in conexao.execute(sql, parametros)]
+
+    # Remove as análises feitas com outros artefatos (modelos antigos) e os hashes de arquivos
+    # que não existem mais. Retorna o nº de análises removidas.
+    def limpar(self, manter_artefato=None):
+        with self._conectar() as conexao:
+            removidas = 0
+            if manter_artefato is not None:
+                removidas = conexao.execute("DELETE FROM analises WHERE hash_artefato != ?", (manter_artefato,)).rowcount
+            caminhos = [linha["caminho"] for linha in conexao.execute("SELECT caminho FROM arquivos")]
+            conexao.executemany("DELETE FROM arquivos WHERE caminho = ?",
+                                [(c,) for c in caminhos if not os.path.exists(c)])
+        return removidas
+
+# Conexão usada em um bloco 'with': confirma (ou desfaz) a transação e fecha a conexão
+class _Conexao:
+    def __init__(self, conexao):
+        self.conexao = conexao
+
+    def __enter__(self):
+        return self.conexao
+
+    def __exit__(self, tipo, valor, rastreamento):
+        try:
+            if tipo is None:
+                self.conexao.commit()
+            else:
+                self.conexao.rollback()
+        finally:
+            self.conexao.close()
+        return False
+
+def _registro(linha):
+    registro = dict(linha)
+    registro["probabilidades"] = json.loads(registro["probabilidades"])
+    registro["estatisticas"] = json.loads(registro["estatisticas"]) if registro["estatisticas"] else None
+    return registro
+
+# Estatísticas de cada sensor de uma amostra (DataFrame com as colunas dos sensores)
+def estatisticas_sensores(dados):
+    resumo = dados.agg(["mean", "std", "min", "max"])
+    return {str(coluna): {"media": float(resumo.at["mean", coluna]), "desvio": float(resumo.at["std", coluna]),
+                          "minimo": float(resumo.at["min", coluna]), "maximo": float(resumo.at["max", coluna])}
+            for coluna in dados.columns}
+
+def _data(timestamp):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Consulta o índice das amostras já classificadas.")
+    parser.add_argument("--indice", default=ARQUIVO_INDICE, help="Arquivo SQLite do índice")
+    parser.add_argument("--classe", default=None, help="Classe de maior probabilidade (ex.: metanol)")
+    parser.add_argument("--substancia", default=None, help="Decisão final exata (ex.: 'INDEFINIDA (Confiança Baixa)')")
+    parser.add_argument("--desde", default=None, help="Início do período: AAAA-MM-DD[ HH:MM] ou relativo (7d, 12h, 30m)")
+    parser.add_argument("--ate", default=None, help="Fim do período (mesmo formato de --desde)")
+    parser.add_argument("--confianca-min", type=float, default=None, help="Confiança mínima (%%)")
+    parser.add_argument("--confianca-max", type=float, default=None, help="Confiança abaixo deste valor (%%)")
+    parser.add_argument("--artefato", default=None, help="Prefixo do hash do artefato do modelo")
+    parser.add_argument("--arquivo", default=None, help="Trecho do caminho do arquivo")
+    parser.add_argument("--limite", type=int, default=None, help="Nº máximo de resultados")
+    parser.add_argument("--formato", choices=["tabela", "json", "csv"], default="tabela")
+    parser.add_argument("--limpar", action="store_true",
+                        help="Remove as análises feitas com outros artefatos (exige --artefato com o hash completo) "
+                             "e os arquivos que não existem mais")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.indice):
+        parser.error(f"Índice '{args.indice}' não encontrado.")
+    indice = IndiceResultados(args.indice)
+    if args.limpar:
+        removidas = indice.limpar(args.artefato)
+        print(f"{removidas} análises removidas.")
+        return
+
+    try:
+        desde = interpretar_data(args.desde) if args.desde else None
+        ate = interpretar_data(args.ate) if args.ate else None
+    except ValueError as e:
+        parser.error(str(e))
+    registros = indice.consultar(args.classe, args.substancia, desde, ate, args.confianca_min, args.confianca_max,
+                                 args.artefato, args.arquivo, args.limite)
+
+    if args.formato == "json":
+        print(json.dumps(registros, indent=2, ensure_ascii=False))
+    elif args.formato == "csv":
+        classes = sorted({c for r in registros for c in r["probabilidades"]})
+        escritor = csv.writer(sys.stdout)
+        escritor.writerow(["analisada_em", "arquivo", "substancia", "classe_predita", "confianca", "n_amostras",
+                           "hash_amostra", "hash_artefato"] + [f"prob_{c}" for c in classes])
+        for r in registros:
+            escritor.writerow([_data(r["analisada_em"]), r["arquivo"], r["substancia"], r["classe_predita"],
+                               f"{r['confianca']:.2f}", r["n_amostras"], r["hash_amostra"], r["hash_artefato"]]
+                              + [r["probabilidades"].get(c, "") for c in classes])
+    else:
+        for r in registros:
+            print(f"{_data(r['analisada_em'])}  {r['substancia']:<30} {r['confianca']:6.2f}%  "
+                  f"{r['n_amostras']:>8} leituras  modelo {r['hash_artefato'][:12]}  {r['arquivo']}")
+        print(f"{len(registros)} análises encontradas.")
+
+if __name__ == "__main__":
+    main()
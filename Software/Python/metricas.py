@@ -0,0 +1,238 @@
+# Instrumentação leve das etapas críticas (leitura serial, conversão das linhas, gravação em
+# disco, carregamento do modelo, scaler, predict_proba, gráficos, treinamento).
+#
+# - medir("etapa") é um gerenciador de contexto e cronometrar("etapa") um decorador: cada
+#   execução entra no histograma de latência da etapa (baldes fixos, em segundos).
+# - contar("nome", n) soma eventos (amostras, bytes...); as taxas por segundo são calculadas
+#   na exportação.
+# - A exportação vai para um arquivo de texto no formato do Prometheus (extensão .prom,
+#   gravado de forma atômica, para o textfile collector do node_exporter) ou para um log
+#   JSON lines (qualquer outra extensão, uma linha por exportação).
+#
+# Desativada (padrão), medir() devolve sempre o mesmo contexto vazio e contar() retorna
+# logo na primeira linha: o custo é o de uma chamada de função. Para ativar, defina a
+# variável de ambiente NARIZ_METRICAS=arquivo (e opcionalmente NARIZ_METRICAS_INTERVALO,
+# em segundos) ou chame ativar(arquivo) no início do script.
+
+import atexit
+import bisect
+import functools
+import json
+import math
+import os
+import threading
+import time
+
+# Limites superiores dos baldes dos histogramas (segundos); o último balde é +Inf
+LIMITES_BALDES = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                  0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_ativo = False
+_arquivo = None
+_lock = threading.Lock()
+_histogramas = {} # etapa -> [contagens por balde (+Inf no fim), soma, máximo]
+_contadores = {}
+_inicio = None
+_ultima_exportacao = None # (instante, contadores) da última exportação, para as taxas recentes
+_parar_exportacao = None
+
+class _ContextoVazio:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        return False
+
+_VAZIO = _ContextoVazio()
+
+class _Cronometro:
+    __slots__ = ("etapa", "inicio")
+
+    def __init__(self, etapa):
+        self.etapa = etapa
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *excecao):
+        registrar(self.etapa, time.perf_counter() - self.inicio)
+        return False
+
+def ativo():
+    return _ativo
+
+# Mede o bloco 'with' (só quando a instrumentação está ativa)
+def medir(etapa):
+    if not _ativo:
+        return _VAZIO
+    return _Cronometro(etapa)
+
+# Decorador: mede cada chamada da função
+def cronometrar(etapa):
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            if not _ativo:
+                return funcao(*args, **kwargs)
+            with _Cronometro(etapa):
+                return funcao(*args, **kwargs)
+        return envoltorio
+    return decorador
+
+# Registra uma duração já medida (segundos)
+def registrar(etapa, segundos):
+    if not _ativo:
+        return
+    indice = bisect.bisect_left(LIMITES_BALDES, segundos)
+    with _lock:
+        histograma = _histogramas.get(etapa)
+        if histograma is None:
+            histograma = _histogramas[etapa] = [[0] * (len(LIMITES_BALDES) + 1), 0.0, 0.0]
+        histograma[0][indice] += 1
+        histograma[1] += segundos
+        if segundos > histograma[2]:
+            histograma[2] = segundos
+
+def contar(nome, n=1):
+    if not _ativo:
+        return
+    with _lock:
+        _contadores[nome] = _contadores.get(nome, 0) + n
+
+# Quantil aproximado pelo histograma (limite superior do balde onde ele cai)
+def _quantil(contagens, q):
+    total = sum(contagens)
+    alvo = q * total
+    acumulado = 0
+    for limite, contagem in zip(LIMITES_BALDES + (math.inf,), contagens):
+        acumulado += contagem
+        if acumulado >= alvo:
+            return limite
+    return math.inf
+
+# Cópia do estado atual: latências por etapa, contadores e taxas
+def resumo():
+    agora = time.time()
+    with _lock:
+        histogramas = {etapa: (list(h[0]), h[1], h[2]) for etapa, h in _histogramas.items()}
+        contadores = dict(_contadores)
+    etapas = {}
+    for etapa, (contagens, soma, maximo) in sorted(histogramas.items()):
+        n = sum(contagens)
+        etapas[etapa] = {
+            "contagem": n,
+            "soma_s": soma,
+            "media_ms": soma / n * 1000 if n else 0.0,
+            "p50_ms": _quantil(contagens, 0.5) * 1000,
+            "p95_ms": _quantil(contagens, 0.95) * 1000,
+            "p99_ms": _quantil(contagens, 0.99) * 1000,
+            "max_ms": maximo * 1000,
+            "baldes": contagens,
+        }
+    duracao = max(agora - _inicio, 1e-9) if _inicio is not None else None
+    taxas = {nome: valor / duracao for nome, valor in contadores.items()} if duracao else {}
+    taxas_recentes = {}
+    if _ultima_exportacao is not None:
+        instante, anteriores = _ultima_exportacao
+        intervalo = max(agora - instante, 1e-9)
+        taxas_recentes = {nome: (valor - anteriores.get(nome, 0)) / intervalo for nome, valor in contadores.items()}
+    return {
+        "tempo": agora,
+        "duracao_s": duracao,
+        "etapas": etapas,
+        "contadores": contadores,
+        "taxas_por_segundo": taxas,
+        "taxas_recentes_por_segundo": taxas_recentes,
+    }
+
+def _rotulo(texto):
+    return str(texto).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _formato_prometheus(dados):
+    linhas = ["# HELP nariz_etapa_segundos Latência de cada etapa instrumentada.",
+              "# TYPE nariz_etapa_segundos histogram"]
+    for etapa, e in dados["etapas"].items():
+        acumulado = 0
+        for limite, contagem in zip(LIMITES_BALDES + (math.inf,), e["baldes"]):
+            acumulado += contagem
+            le = "+Inf" if limite == math.inf else repr(limite)
+            linhas.append(f'nariz_etapa_segundos_bucket{{etapa="{_rotulo(etapa)}",le="{le}"}} {acumulado}')
+        linhas.append(f'nariz_etapa_segundos_sum{{etapa="{_rotulo(etapa)}"}} {e["soma_s"]!r}')
+        linhas.append(f'nariz_etapa_segundos_count{{etapa="{_rotulo(etapa)}"}} {e["contagem"]}')
+    linhas += ["# HELP nariz_eventos_total Eventos contados (amostras, bytes, análises...).",
+               "# TYPE nariz_eventos_total counter"]
+    for nome, valor in sorted(dados["contadores"].items()):
+        linhas.append(f'nariz_eventos_total{{nome="{_rotulo(nome)}"}} {valor}')
+    linhas += ["# HELP nariz_eventos_por_segundo Taxa média desde a ativação da instrumentação.",
+               "# TYPE nariz_eventos_por_segundo gauge"]
+    for nome, valor in sorted(dados["taxas_por_segundo"].items()):
+        linhas.append(f'nariz_eventos_por_segundo{{nome="{_rotulo(nome)}"}} {valor!r}')
+    return "\n".join(linhas) + "\n"
+
+# Grava o estado atual no arquivo (o de ativar(), se 'arquivo' não for informado)
+def exportar(arquivo=None):
+    global _ultima_exportacao
+    arquivo = arquivo or _arquivo
+    if arquivo is None:
+        return None
+    dados = resumo()
+    if str(arquivo).endswith(".prom"):
+        # Arquivo temporário + os.replace: quem lê nunca vê um arquivo pela metade
+        temporario = f"{arquivo}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            f.write(_formato_prometheus(dados))
+        os.replace(temporario, arquivo)
+    else:
+        with open(arquivo, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(dados, ensure_ascii=False) + "\n")
+    _ultima_exportacao = (dados["tempo"], dados["contadores"])
+    return dados
+
+def _exportar_periodicamente(intervalo, parar):
+    while not parar.wait(intervalo):
+        try:
+            exportar()
+        except OSError:
+            pass
+
+# Ativa a instrumentação. Com 'intervalo' (segundos), exporta periodicamente em segundo plano;
+# de qualquer forma, exporta uma última vez ao encerrar o processo.
+def ativar(arquivo=None, intervalo=None):
+    global _ativo, _arquivo, _inicio, _parar_exportacao
+    desativar(exportar_final=False)
+    _arquivo = arquivo
+    _inicio = time.time()
+    _ativo = True
+    if arquivo is not None and intervalo:
+        _parar_exportacao = threading.Event()
+        threading.Thread(target=_exportar_periodicamente, args=(intervalo, _parar_exportacao),
+                         daemon=True, name="metricas").start()
+
+def desativar(exportar_final=True):
+    global _ativo, _parar_exportacao
+    if _parar_exportacao is not None:
+        _parar_exportacao.set()
+        _parar_exportacao = None
+    if _ativo and exportar_final:
+        exportar()
+    _ativo = False
+
+def limpar():
+    global _ultima_exportacao
+    with _lock:
+        _histogramas.clear()
+        _contadores.clear()
+    _ultima_exportacao = None
+
+def _ao_encerrar():
+    if _ativo:
+        try:
+            exportar()
+        except OSError:
+            pass
+
+atexit.register(_ao_encerrar)
+
+if os.environ.get("NARIZ_METRICAS"):
+    ativar(os.environ["NARIZ_METRICAS"], float(os.environ.get("NARIZ_METRICAS_INTERVALO", "10")))
@@ -0,0 +1,166 @@
+# Núcleo da aplicação sem interface gráfica: coleta de uma porta serial, análise de uma
+# amostra e pré-carregamento do modelo. É usado pela interface Tk e pode ser importado por
+# scripts sem abrir nenhuma janela.
+#
+# No carregamento só a biblioteca padrão é importada. NumPy, pandas, pyserial, joblib (e o
+# unpickling dos objetos do scikit-learn) e o matplotlib são importados no primeiro uso, de
+# modo que a janela da interface aparece sem esperar por eles. precarregar() faz esse
+# trabalho em segundo plano, depois que a janela já está na tela.
+
+import importlib
+import time
+
+import metricas
+
+ARQUIVO_ARTEFATO = "artefato_nariz_eletronico.pkl" # Igual a artefatos.ARQUIVO_ARTEFATO
+ARQUIVO_MODELO = "modelo_nariz_eletronico.pkl"
+ARQUIVO_SCALER = "scaler_nariz_eletronico.pkl"
+ARQUIVO_INDICE = "indice_resultados.sqlite" # Igual a indice_resultados.ARQUIVO_INDICE
+
+# Pacote de artefatos (modelo, scaler e perfis das classes), do cache em memória de artefatos.py.
+# Ele só é lido do disco novamente se o arquivo tiver sido alterado.
+def obter_artefato(artefato_arquivo=ARQUIVO_ARTEFATO, modelo_arquivo=ARQUIVO_MODELO, scaler_arquivo=ARQUIVO_SCALER):
+    import artefatos
+    return artefatos.obter_artefato(artefato_arquivo, modelo_arquivo, scaler_arquivo)
+
+# Coleta da porta serial até 'parar' (threading.Event) ser sinalizado.
+# A leitura, a validação e a gravação ficam no subsistema de aquisição (aquisicao.py).
+# 'ao_mensagem' recebe as mensagens de status; 'ao_iniciar' recebe o objeto Aquisicao assim
+# que ele é criado (a interface lê do buffer dele para o gráfico ao vivo). Se 'tempo_real'
+# for informado, cada lote de leituras também é enviado ao classificador em tempo real.
+# Os erros são informados por 'ao_mensagem'; retorna as estatísticas da coleta (ou None).
+@metricas.cronometrar("coleta.sessao")
+def coletar(porta, baud_rate, arquivo_saida, parar, ao_mensagem, tempo_real=None, ao_iniciar=None):
+    import serial
+    import aquisicao
+
+    try:
+        ao_receber = tempo_real.enviar if tempo_real is not None else None
+        coleta = aquisicao.Aquisicao(porta, baud_rate, arquivo_saida, ao_mensagem=ao_mensagem, ao_receber=ao_receber)
+        if ao_iniciar is not None:
+            ao_iniciar(coleta)
+        estatisticas = coleta.executar(parar)
+        if coleta.protocolo == "binario":
+            ao_mensagem(f"{estatisticas['linhas_validas']} leituras gravadas ({coleta.taxa_amostras():.1f} amostras/s, protocolo binário), "
+                        f"{estatisticas['quadros_perdidos']} quadros perdidos e {estatisticas['quadros_corrompidos']} descartados por CRC inválido.")
+        else:
+            ao_mensagem(f"{estatisticas['linhas_validas']} leituras gravadas ({coleta.taxa_amostras():.1f} amostras/s), "
+                        f"{estatisticas['linhas_malformadas']} linhas malformadas descartadas.")
+        return estatisticas
+    except serial.SerialException as e:
+        ao_mensagem(f"Erro de porta serial: {e}")
+    except Exception as e:
+        ao_mensagem(f"Erro na coleta de dados: {e}")
+    finally:
+        if tempo_real is not None:
+            tempo_real.parar()
+            latencias = tempo_real.resumo_latencias()
+            if latencias:
+                ao_mensagem(f"Classificação em tempo real: {latencias['avaliacoes']} avaliações, latência "
+                            f"média {latencias['media_ms']:.1f} ms, p95 {latencias['p95_ms']:.1f} ms, máx. {latencias['max_ms']:.1f} ms.")
+    return None
+
+# Cria (e inicia) o classificador em tempo real usando o modelo do cache de artefatos.
+# Os lotes em tempo real são pequenos, então a floresta é achatada para reduzir a latência.
+def criar_classificador_tempo_real(ao_veredito, artefato_arquivo=ARQUIVO_ARTEFATO, ao_erro=None):
+    from classificacao_tempo_real import ClassificadorTempoReal
+    from floresta_plana import achatar_se_possivel
+
+    artefato = obter_artefato(artefato_arquivo)
+    return ClassificadorTempoReal(achatar_se_possivel(artefato["modelo"]), artefato["scaler"], ao_veredito=ao_veredito,
+                                  ao_erro=ao_erro).iniciar()
+
+# Análise de uma amostra (CSV ou .nes). Retorna (dados, artefato, resultado), em que 'resultado'
+# é o dicionário de classificador.classificar_dados. Com 'cancelado' (threading.Event), o
+# evento é verificado entre as etapas e durante a classificação (AnaliseCancelada é levantada).
+# Com 'indice' (arquivo SQLite de indice_resultados.py), uma amostra já analisada com o mesmo
+# artefato não é lida nem classificada de novo: o resultado vem do índice e 'dados' traz só
+# a média de cada sensor (o que o gráfico de perfil usa), com resultado["do_indice"] = True.
+# O índice é só um cache: se ele não puder ser usado (diretório sem permissão de escrita,
+# banco travado, disco cheio), a análise segue sem ele. Um arquivo que muda durante a leitura
+# (ex.: coleta ainda gravando) não é guardado no índice.
+@metricas.cronometrar("analise.total")
+def analisar_arquivo(arquivo, cancelado=None, ao_mensagem=None, artefato_arquivo=ARQUIVO_ARTEFATO,
+                     modelo_arquivo=ARQUIVO_MODELO, scaler_arquivo=ARQUIVO_SCALER, indice=ARQUIVO_INDICE):
+    import classificador
+    ao_mensagem = ao_mensagem or (lambda texto: None)
+    inicio = time.perf_counter()
+
+    def verificar_cancelamento():
+        if cancelado is not None and cancelado.is_set():
+            raise classificador.AnaliseCancelada()
+
+    artefato = obter_artefato(artefato_arquivo, modelo_arquivo, scaler_arquivo)
+    ao_mensagem(f"Modelo e Scaler prontos (artefato {artefato['hash'][:12]}).")
+    verificar_cancelamento()
+
+    if indice is not None:
+        import sqlite3
+        import indice_resultados
+        try:
+            with metricas.medir("analise.indice"):
+                indice = indice_resultados.IndiceResultados(indice)
+                assinatura = indice_resultados.assinatura_arquivo(arquivo)
+                hash_amostra = indice.hash_amostra(arquivo)
+                registro = indice.buscar(hash_amostra, artefato["hash"])
+        except (sqlite3.Error, OSError) as e:
+            ao_mensagem(f"Aviso: índice de resultados indisponível ({e}); a amostra será analisada sem ele.")
+            indice = registro = None
+        if registro is not None and registro["estatisticas"]:
+            import pandas as pd
+            metricas.contar("analise.indice_acertos")
+            ao_mensagem(f"Amostra '{arquivo}' já analisada com este modelo em "
+                        f"{time.strftime('%d/%m/%Y %H:%M', time.localtime(registro['analisada_em']))}; "
+                        f"resultado reaproveitado do índice.")
+            medias = {sensor: [e["media"]] for sensor, e in registro["estatisticas"].items()}
+            resultado = {"n_amostras": registro["n_amostras"], "substancia": registro["substancia"],
+                         "confianca": registro["confianca"], "probabilidades": registro["probabilidades"],
+                         "do_indice": True}
+            return pd.DataFrame(medias, columns=classificador.COLUNAS_SENSORES), artefato, resultado
+
+    # Carrega os dados da nova substância
+    with metricas.medir("analise.leitura_amostra"):
+        dados, colunas_ajustadas = classificador.ler_amostra(arquivo)
+    ao_mensagem(f"Dados de '{arquivo}' carregados ({len(dados)} leituras).")
+    if colunas_ajustadas:
+        ao_mensagem("Aviso: Nomes das colunas ajustados para MQ3, MQ5, MQ6, MQ8.")
+    verificar_cancelamento()
+
+    # Probabilidades médias por classe e lógica de decisão (classe ou "INDEFINIDA")
+    resultado = classificador.classificar_dados(dados, artefato["modelo"], artefato["scaler"], cancelado=cancelado)
+    verificar_cancelamento()
+    if indice is not None:
+        try:
+            with metricas.medir("analise.indice"):
+                if indice_resultados.assinatura_arquivo(arquivo) != assinatura:
+                    ao_mensagem(f"Aviso: '{arquivo}' mudou durante a análise; o resultado não foi guardado no índice.")
+                else:
+                    indice.gravar(hash_amostra, artefato["hash"], arquivo, resultado,
+                                  indice_resultados.estatisticas_sensores(dados), time.perf_counter() - inicio)
+        except (sqlite3.Error, OSError) as e:
+            ao_mensagem(f"Aviso: resultado não guardado no índice ({e}).")
+    metricas.contar("analise.concluidas")
+    return dados, artefato, resultado
+
+# Carrega em segundo plano o que a primeira análise precisaria: o pacote de artefatos
+# (unpickling do modelo) e, com 'incluir_graficos', os módulos dos gráficos (matplotlib, seaborn).
+# Recebe o evento de cancelamento como primeiro argumento (ver fila_interface.ExecutorCancelavel).
+# Retorna o tempo gasto (s); os erros (ex.: modelo ainda não treinado) são informados por
+# 'ao_mensagem' e não interrompem nada, a análise carrega o modelo de novo quando for usada.
+def precarregar(cancelado, ao_mensagem=None, incluir_graficos=True, artefato_arquivo=ARQUIVO_ARTEFATO,
+                modelo_arquivo=ARQUIVO_MODELO, scaler_arquivo=ARQUIVO_SCALER):
+    ao_mensagem = ao_mensagem or (lambda texto: None)
+    inicio = time.perf_counter()
+    with metricas.medir("inicializacao.precarga"):
+        try:
+            artefato = obter_artefato(artefato_arquivo, modelo_arquivo, scaler_arquivo)
+        except Exception as e:
+            ao_mensagem(f"Modelo não pré-carregado ({e}); ele será carregado na primeira análise.")
+            artefato = None
+        if incluir_graficos and not cancelado.is_set():
+            for modulo in ("graficos", "matplotlib.backends.backend_tkagg"):
+                importlib.import_module(modulo)
+    duracao = time.perf_counter() - inicio
+    if artefato is not None:
+        ao_mensagem(f"Modelo pré-carregado em segundo plano em {duracao:.1f} s (artefato {artefato['hash'][:12]}).")
+    return duracao
@@ -0,0 +1,144 @@
+# Versões das bibliotecas utilizadas:
+# pyserial: 3.5
+# numpy: 2.3.1
+
+# Arduino virtual para testar e medir a aquisição sem o hardware.
+# Em Linux/macOS cria um pseudo-terminal (pty) e escreve nele linhas no mesmo formato
+# do medicao.ino; o lado "escravo" do pty é aberto pela aquisição como uma porta serial comum.
+# Onde não há pty (Windows), usa a porta 'loop://' do pyserial, que é compartilhada
+# entre quem escreve e quem lê.
+# Com protocolo="binario", envia quadros do protocolo binário (protocolo_binario.py) depois
+# das mensagens de inicialização, como o medicao.ino com MODO_BINARIO 1.
+
+import os
+import threading
+import time
+
+import numpy as np
+import serial
+
+import protocolo_binario
+
+MENSAGENS_INICIAIS = [
+    "Inicializando Sensores MQ...",
+    "Sensores MQ Inicializados e Calibrados.",
+    "Enviando dados de PPM pela Serial...",
+]
+
+class ArduinoVirtual:
+    # taxa_amostras: linhas por segundo (None = o mais rápido possível)
+    # proporcao_malformadas: fração das linhas enviadas corrompidas de propósito
+    # perfil: leitura média de cada sensor (MQ3, MQ5, MQ6, MQ8); sem ele, valores uniformes
+    # protocolo: "texto" ou "binario"; tipo_quadro: protocolo_binario.TIPO_FLOAT32 ou TIPO_ADC_UINT16
+    # proporcao_perdidas: fração dos quadros binários que não são enviados (saltos na sequência);
+    # no modo binário, os quadros "malformados" têm um byte trocado (CRC inválido) e são
+    # escolhidos entre os enviados, de modo que 'malformadas' e 'perdidas' não se sobrepõem
+    def __init__(self, taxa_amostras=1000, proporcao_malformadas=0.0, tamanho_lote=100, semente=0, usar_loop=None,
+                 perfil=None, ruido=0.05, protocolo="texto", tipo_quadro=protocolo_binario.TIPO_FLOAT32,
+                 proporcao_perdidas=0.0):
+        self.taxa_amostras = taxa_amostras
+        self.proporcao_malformadas = proporcao_malformadas
+        self.protocolo = protocolo
+        self.tipo_quadro = tipo_quadro
+        self.proporcao_perdidas = proporcao_perdidas
+        self.perdidas = 0
+        self._sequencia = 0
+        self.perfil = perfil
+        self.ruido = ruido
+        self.tamanho_lote = tamanho_lote
+        self.rng = np.random.default_rng(semente)
+        self.usar_loop = usar_loop if usar_loop is not None else not hasattr(os, 'openpty')
+        self.enviadas = 0
+        self.malformadas = 0
+        self._parar = threading.Event()
+        self._thread = None
+        if self.usar_loop:
+            self._loop = serial.serial_for_url('loop://', timeout=0.1)
+            self.porta = self._loop
+        else:
+            import tty
+            self._mestre, escravo = os.openpty()
+            tty.setraw(escravo) # Sem eco nem conversão de fim de linha
+            os.set_blocking(self._mestre, False) # Para não travar quando o leitor não acompanha
+            self.porta = os.ttyname(escravo)
+            self._escravo = escravo
+
+    def _escrever(self, dados):
+        if self.usar_loop:
+            self._loop.write(dados)
+        else:
+            # Escrita não bloqueante: se o buffer do pty estiver cheio, espera o leitor consumir
+            while dados and not self._parar.is_set():
+                try:
+                    dados = dados[os.write(self._mestre, dados):]
+                except BlockingIOError:
+                    time.sleep(0.001)
+
+    def _gerar_lote(self, n):
+        if self.perfil is not None:
+            valores = self.rng.normal(self.perfil, self.ruido, size=(n, 4))
+        else:
+            valores = self.rng.uniform(0.1, 5.0, size=(n, 4))
+        if self.protocolo == "binario":
+            return self._gerar_quadros(valores)
+        linhas = [f"{a:.2f},{b:.2f},{c:.2f},{d:.2f}" for a, b, c, d in valores]
+        if self.proporcao_malformadas > 0:
+            for i in np.flatnonzero(self.rng.random(n) < self.proporcao_malformadas):
+                linhas[i] = linhas[i][:len(linhas[i]) // 2] + "#?"
+                self.malformadas += 1
+        return ("\r\n".join(linhas) + "\r\n").encode('ascii')
+
+    def _gerar_quadros(self, valores):
+        n = len(valores)
+        if self.tipo_quadro == protocolo_binario.TIPO_ADC_UINT16:
+            valores = protocolo_binario.ppm_para_adc(valores)
+        formato = protocolo_binario.FORMATOS[self.tipo_quadro]
+        quadros = bytearray(protocolo_binario.montar_quadros(valores, self._sequencia, self.tipo_quadro))
+        self._sequencia = (self._sequencia + n) & 0xFFFF
+        perdidos = self.rng.random(n) < self.proporcao_perdidas if self.proporcao_perdidas > 0 else np.zeros(n, dtype=bool)
+        if self.proporcao_malformadas > 0:
+            for i in np.flatnonzero((self.rng.random(n) < self.proporcao_malformadas) & ~perdidos):
+                quadros[i * formato.itemsize + self.rng.integers(5, formato.itemsize)] ^= 0xFF
+                self.malformadas += 1
+        if perdidos.any():
+            self.perdidas += int(perdidos.sum())
+            quadros = np.frombuffer(bytes(quadros), dtype=np.uint8).reshape(n, formato.itemsize)[~perdidos].tobytes()
+        return bytes(quadros)
+
+    def _executar(self, duracao):
+        for mensagem in MENSAGENS_INICIAIS:
+            self._escrever((mensagem + "\r\n").encode('utf-8'))
+        inicio = time.perf_counter()
+        while not self._parar.is_set() and (duracao is None or time.perf_counter() - inicio < duracao):
+            self._escrever(self._gerar_lote(self.tamanho_lote))
+            self.enviadas += self.tamanho_lote
+            if self.taxa_amostras:
+                # Mantém a taxa média desejada
+                atraso = self.enviadas / self.taxa_amostras - (time.perf_counter() - inicio)
+                if atraso > 0:
+                    time.sleep(atraso)
+
+    def iniciar(self, duracao=None):
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, args=(duracao,), daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self):
+        self._parar.set()
+        if self._thread is None:
+            return
+        if self.usar_loop:
+            # A escrita na loop:// bloqueia com a fila cheia; esvazia a fila até a thread terminar
+            while self._thread.is_alive():
+                self._loop.reset_input_buffer()
+                self._thread.join(timeout=0.05)
+        self._thread.join()
+
+    def fechar(self):
+        self.parar()
+        if self.usar_loop:
+            self._loop.close()
+        else:
+            os.close(self._mestre)
+            os.close(self._escravo)
@@ -0,0 +1,162 @@
+# Versões das bibliotecas utilizadas:
+# numpy: 2.3.1
+
+# Protocolo serial binário com quadros (modo opcional do medicao.ino, MODO_BINARIO 1).
+#
+# Estrutura de um quadro (little-endian, sem alinhamento):
+#   sincronismo 0xA5 0x5A | tipo (uint8) | sequência (uint16) | 4 valores | CRC (uint16)
+#   tipo 1: MQ3, MQ5, MQ6, MQ8 em ppm, float32 (23 bytes por quadro)
+#   tipo 2: leituras brutas do ADC, uint16 (15 bytes por quadro); convertidas em ppm aqui,
+#           com as mesmas constantes do medicao.ino (R0, RL e curvas A/B)
+# O CRC é o CRC-16/CCITT-FALSE (polinômio 0x1021, valor inicial 0xFFFF) do tipo, da
+# sequência e dos valores. A sequência conta os quadros enviados (com volta em 65536), de
+# modo que quadros perdidos aparecem como saltos na sequência.
+#
+# A decodificação é vetorizada: a partir de um sincronismo, os bytes seguintes são vistos
+# como uma matriz de quadros consecutivos (np.frombuffer) e o sincronismo, o tipo e o CRC de
+# todos eles são conferidos de uma só vez. Só depois de um quadro corrompido a busca pelo
+# próximo sincronismo recomeça byte a byte.
+
+import struct
+
+import numpy as np
+
+SINCRONISMO = b"\xA5\x5A"
+TIPO_FLOAT32 = 1
+TIPO_ADC_UINT16 = 2
+
+QUADRO_FLOAT32 = np.dtype([("sincronismo", "<u2"), ("tipo", "u1"), ("sequencia", "<u2"),
+                           ("valores", "<f4", (4,)), ("crc", "<u2")])
+QUADRO_ADC_UINT16 = np.dtype([("sincronismo", "<u2"), ("tipo", "u1"), ("sequencia", "<u2"),
+                              ("valores", "<u2", (4,)), ("crc", "<u2")])
+FORMATOS = {TIPO_FLOAT32: QUADRO_FLOAT32, TIPO_ADC_UINT16: QUADRO_ADC_UINT16}
+_SINCRONISMO_U16 = struct.unpack("<H", SINCRONISMO)[0]
+
+# Constantes do medicao.ino, na ordem MQ3, MQ5, MQ6, MQ8 (para os quadros com o ADC bruto)
+RESOLUCAO_TENSAO = 5.0
+BITS_ADC = 10
+RL = np.array([10000.0, 10000.0, 10000.0, 10000.0])
+R0 = np.array([467.16, 1920.54, 3736.11, 2038.38])
+CURVA_A = np.array([0.3934, 6.8551, 10.0, 1012.7])
+CURVA_B = np.array([-1.504, -2.110, -2.222, -2.786])
+
+def _tabela_crc():
+    tabela = np.zeros(256, dtype=np.uint32)
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+        tabela[byte] = crc & 0xFFFF
+    return tabela
+
+_TABELA_CRC = _tabela_crc()
+
+# CRC-16/CCITT-FALSE de cada linha de uma matriz de bytes (n x m), calculado coluna a coluna
+def crc16(bytes_quadros):
+    crc = np.full(len(bytes_quadros), 0xFFFF, dtype=np.uint32)
+    for coluna in bytes_quadros.T:
+        crc = ((crc << 8) & 0xFFFF) ^ _TABELA_CRC[(crc >> 8) ^ coluna]
+    return crc
+
+# Conversão das leituras do ADC em ppm, como a MQUnifiedsensor (método de regressão 1)
+def adc_para_ppm(adc):
+    tensao = np.asarray(adc, dtype=np.float64) * (RESOLUCAO_TENSAO / (2 ** BITS_ADC - 1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = np.maximum(RESOLUCAO_TENSAO * RL / tensao - RL, 0.0)
+        ppm = CURVA_A * np.power(rs / R0, CURVA_B)
+    ppm[~np.isfinite(ppm) | (rs <= 0)] = 0.0
+    return np.maximum(ppm, 0.0)
+
+# Inversa de adc_para_ppm (usada pelo Arduino virtual)
+def ppm_para_adc(ppm):
+    rs = np.power(np.maximum(np.asarray(ppm, dtype=np.float64), 1e-12) / CURVA_A, 1.0 / CURVA_B) * R0
+    tensao = RESOLUCAO_TENSAO * RL / (rs + RL)
+    return np.clip(np.rint(tensao * (2 ** BITS_ADC - 1) / RESOLUCAO_TENSAO), 1, 2 ** BITS_ADC - 1).astype(np.uint16)
+
+# Monta os quadros de uma matriz de valores (n x 4), com sequências a partir de 'sequencia_inicial'
+def montar_quadros(valores, sequencia_inicial=0, tipo=TIPO_FLOAT32):
+    formato = FORMATOS[tipo]
+    quadros = np.zeros(len(valores), dtype=formato)
+    quadros["sincronismo"] = _SINCRONISMO_U16
+    quadros["tipo"] = tipo
+    quadros["sequencia"] = (sequencia_inicial + np.arange(len(valores))) & 0xFFFF
+    quadros["valores"] = valores
+    bytes_quadros = quadros.view(np.uint8).reshape(len(valores), formato.itemsize)
+    quadros["crc"] = crc16(bytes_quadros[:, 2:-2])
+    return quadros.tobytes()
+
+# Decodificador de um fluxo de bytes: guarda entre as chamadas o quadro incompleto do fim
+# do bloco e a última sequência recebida. Os contadores são acumulados.
+# Um quadro descartado pelo CRC também deixa um salto na sequência; esse salto é descontado,
+# de modo que perdidos e corrompidos não se sobrepõem (a soma é o total de leituras faltando).
+class DecodificadorQuadros:
+    def __init__(self):
+        self.ultima_sequencia = None
+        self.quadros_validos = 0
+        self.quadros_perdidos = 0 # Saltos na sequência que não correspondem a quadros corrompidos
+        self.quadros_corrompidos = 0 # Sincronismo encontrado, mas com tipo/CRC inválido
+        self.bytes_descartados = 0
+        self._restante = b''
+        self._corrompidos_sem_salto = 0 # Corrompidos depois do último quadro válido
+
+    # Decodifica os quadros completos de 'dados'. Retorna (valores float64 n x 4 em ppm, sequências).
+    def decodificar(self, dados):
+        buffer = self._restante + dados
+        bytes_buffer = np.frombuffer(buffer, dtype=np.uint8)
+        # Posições de todos os sincronismos seguidos de um tipo conhecido
+        candidatos = np.flatnonzero((bytes_buffer[:-2] == SINCRONISMO[0]) & (bytes_buffer[1:-1] == SINCRONISMO[1])
+                                    & np.isin(bytes_buffer[2:], list(FORMATOS)))
+        valores, sequencias = [], []
+        corrompidos_antes = self._corrompidos_sem_salto # Corrompidos antes do último quadro válido deste bloco
+        corrompidos_depois = 0
+        posicao = 0
+        while True:
+            i = np.searchsorted(candidatos, posicao)
+            if i == len(candidatos):
+                # Sem sincronismo: guarda só o fim, que pode ser o começo de um
+                fim = max(posicao, len(buffer) - 2)
+                self.bytes_descartados += fim - posicao
+                posicao = fim
+                break
+            inicio = int(candidatos[i])
+            self.bytes_descartados += inicio - posicao
+            posicao = inicio
+            tipo = int(bytes_buffer[inicio + 2])
+            formato = FORMATOS[tipo]
+            n = (len(buffer) - inicio) // formato.itemsize
+            if n == 0:
+                break
+            bytes_quadros = bytes_buffer[inicio:inicio + n * formato.itemsize].reshape(n, formato.itemsize)
+            quadros = bytes_quadros.view(formato).ravel()
+            validos = ((quadros["sincronismo"] == _SINCRONISMO_U16) & (quadros["tipo"] == tipo)
+                       & (crc16(bytes_quadros[:, 2:-2]) == quadros["crc"]))
+            k = n if validos.all() else int(np.argmin(validos)) # Quadros válidos consecutivos
+            if k == 0:
+                self.quadros_corrompidos += 1
+                corrompidos_depois += 1
+                posicao = inicio + 1
+                continue
+            corrompidos_antes += corrompidos_depois
+            corrompidos_depois = 0
+            lidos = quadros[:k]
+            valores.append(lidos["valores"].astype(np.float64) if tipo == TIPO_FLOAT32 else adc_para_ppm(lidos["valores"]))
+            sequencias.append(lidos["sequencia"].astype(np.int64))
+            posicao = inicio + k * formato.itemsize
+        self._restante = buffer[posicao:]
+
+        if not valores:
+            self._corrompidos_sem_salto = corrompidos_antes + corrompidos_depois
+            return np.empty((0, 4)), np.empty(0, dtype=np.int64)
+        valores = np.concatenate(valores)
+        sequencias = np.concatenate(sequencias)
+        if self.ultima_sequencia is not None:
+            saltos = (np.diff(np.concatenate(([self.ultima_sequencia], sequencias))) - 1) & 0xFFFF
+        else:
+            saltos = (np.diff(sequencias) - 1) & 0xFFFF
+        # Um salto de mais de meia volta é um reinício do Arduino, não quadros perdidos
+        faltando = int(saltos[saltos < 0x8000].sum())
+        self.quadros_perdidos += faltando - min(faltando, corrompidos_antes)
+        self._corrompidos_sem_salto = corrompidos_depois
+        self.ultima_sequencia = int(sequencias[-1])
+        self.quadros_validos += len(valores)
+        return valores, sequencias
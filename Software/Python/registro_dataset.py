@@ -0,0 +1,216 @@
+# Versões das bibliotecas utilizadas:
+# pandas: 2.3.0
+# scikit-learn: 1.7.0
+# joblib: 1.5.1
+# numpy: 2.3.1
+
+# Registro do dataset de treinamento, uma sessão rotulada por arquivo.
+#
+# Estrutura do diretório do registro:
+#   registro.json              lista das sessões (hash, rótulo, nº de linhas, arquivo de origem)
+#   sessoes/<hash>.csv|.nes    cópia de cada sessão, com o nome igual ao hash do conteúdo
+#   cache/<hash>.npy           leituras já convertidas (float64), lidas com mmap
+#   estado_treinamento.pkl     sessões usadas no último treino, scaler e melhor configuração
+#
+# Adicionar uma sessão só converte aquela sessão. No treino incremental, só as sessões novas
+# atualizam o MinMaxScaler (partial_fit), e o modelo é reajustado com a melhor configuração
+# conhecida, sem repetir a busca de hiperparâmetros nem reler os CSVs antigos.
+# As linhas de teste de cada sessão (FRACAO_TESTE) são sorteadas com uma semente tirada do hash
+# da sessão: a divisão não muda quando outras sessões entram no registro, e o scaler é
+# ajustado só com as linhas de treino (como o fit no X_train do treinamento sem registro).
+#
+# Exemplo de uso:
+#   python registro_dataset.py importar dataset_nariz_eletronico.csv
+#   python registro_dataset.py adicionar nova_amostra.csv --rotulo etanol
+#   python registro_dataset.py listar
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+from classificador import COLUNAS_SENSORES, ler_amostra
+
+DIRETORIO_REGISTRO = "dataset_sessoes"
+FRACAO_TESTE = 0.2
+
+def _hash_arquivo(caminho):
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+class RegistroDataset:
+    def __init__(self, diretorio=DIRETORIO_REGISTRO):
+        self.diretorio = diretorio
+        self.arquivo_registro = os.path.join(diretorio, "registro.json")
+        self.arquivo_estado = os.path.join(diretorio, "estado_treinamento.pkl")
+        os.makedirs(os.path.join(diretorio, "sessoes"), exist_ok=True)
+        os.makedirs(os.path.join(diretorio, "cache"), exist_ok=True)
+        if os.path.exists(self.arquivo_registro):
+            with open(self.arquivo_registro, encoding='utf-8') as f:
+                self.sessoes = json.load(f)
+        else:
+            self.sessoes = {}
+
+    def _salvar_registro(self):
+        temporario = self.arquivo_registro + ".tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(self.sessoes, f, indent=2, ensure_ascii=False)
+        os.replace(temporario, self.arquivo_registro)
+
+    def _caminho_cache(self, hash_sessao):
+        return os.path.join(self.diretorio, "cache", f"{hash_sessao}.npy")
+
+    def _guardar(self, valores, hash_sessao, rotulo, origem, arquivo_sessao):
+        np.save(self._caminho_cache(hash_sessao), np.ascontiguousarray(valores, dtype=np.float64))
+        self.sessoes[hash_sessao] = {
+            "rotulo": str(rotulo),
+            "n_linhas": int(len(valores)),
+            "origem": os.path.basename(str(origem)),
+            "arquivo": arquivo_sessao,
+            "adicionada_em": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+    # Adiciona uma sessão (CSV ou .nes) com o seu rótulo. Sessões repetidas (mesmo conteúdo)
+    # são ignoradas. Retorna o hash da sessão.
+    def adicionar_sessao(self, caminho, rotulo):
+        hash_sessao = _hash_arquivo(caminho)
+        if hash_sessao in self.sessoes:
+            return hash_sessao
+        extensao = os.path.splitext(caminho)[1].lower() or ".csv"
+        arquivo_sessao = os.path.join("sessoes", hash_sessao + extensao)
+        shutil.copyfile(caminho, os.path.join(self.diretorio, arquivo_sessao))
+        dados, _ = ler_amostra(caminho)
+        self._guardar(dados[COLUNAS_SENSORES].to_numpy(dtype=np.float64), hash_sessao, rotulo, caminho, arquivo_sessao)
+        self._salvar_registro()
+        return hash_sessao
+
+    # Migra o dataset único (com a coluna de rótulo) para o registro: uma sessão por rótulo
+    def importar_dataset(self, arquivo_csv, coluna_rotulo="Tipo_álcool"):
+        dataset = pd.read_csv(arquivo_csv)
+        hashes = []
+        for rotulo, grupo in dataset.groupby(coluna_rotulo, sort=True):
+            texto = grupo[COLUNAS_SENSORES].to_csv(index=False)
+            hash_sessao = hashlib.sha256(texto.encode('utf-8')).hexdigest()
+            if hash_sessao not in self.sessoes:
+                arquivo_sessao = os.path.join("sessoes", hash_sessao + ".csv")
+                with open(os.path.join(self.diretorio, arquivo_sessao), 'w', encoding='utf-8', newline='') as f:
+                    f.write(texto)
+                self._guardar(grupo[COLUNAS_SENSORES].to_numpy(dtype=np.float64), hash_sessao, rotulo,
+                              arquivo_csv, arquivo_sessao)
+            hashes.append(hash_sessao)
+        self._salvar_registro()
+        return hashes
+
+    def remover_sessao(self, hash_sessao):
+        registro = self.sessoes.pop(hash_sessao)
+        for caminho in (self._caminho_cache(hash_sessao), os.path.join(self.diretorio, registro["arquivo"])):
+            if os.path.exists(caminho):
+                os.remove(caminho)
+        self._salvar_registro()
+
+    # Leituras de uma sessão (do cache; se o cache tiver sido apagado, a sessão é convertida de novo)
+    def valores(self, hash_sessao):
+        caminho = self._caminho_cache(hash_sessao)
+        if not os.path.exists(caminho):
+            dados, _ = ler_amostra(os.path.join(self.diretorio, self.sessoes[hash_sessao]["arquivo"]))
+            np.save(caminho, dados[COLUNAS_SENSORES].to_numpy(dtype=np.float64))
+        return np.load(caminho, mmap_mode='r')
+
+    # Matriz X (DataFrame com as colunas dos sensores), rótulos y e o hash da sessão de cada linha
+    def dados(self, hashes=None):
+        hashes = sorted(self.sessoes) if hashes is None else list(hashes)
+        if not hashes:
+            raise ValueError(f"O registro '{self.diretorio}' não tem sessões.")
+        partes = [self.valores(h) for h in hashes]
+        X = pd.DataFrame(np.concatenate(partes), columns=COLUNAS_SENSORES)
+        y = pd.Series(np.concatenate([np.full(len(p), self.sessoes[h]["rotulo"], dtype=object)
+                                      for h, p in zip(hashes, partes)]), name="Tipo_álcool")
+        sessao = np.concatenate([np.full(len(p), h) for h, p in zip(hashes, partes)])
+        return X, y, sessao
+
+    # Máscara das linhas de teste de uma sessão (sorteio fixo para cada sessão)
+    def linhas_teste(self, hash_sessao, fracao=FRACAO_TESTE):
+        n = self.sessoes[hash_sessao]["n_linhas"]
+        teste = np.zeros(n, dtype=bool)
+        teste[np.random.default_rng(int(hash_sessao[:16], 16)).permutation(n)[:int(round(n * fracao))]] = True
+        return teste
+
+    # Máscara das linhas de teste na mesma ordem de dados()
+    def mascara_teste(self, hashes=None, fracao=FRACAO_TESTE):
+        hashes = sorted(self.sessoes) if hashes is None else list(hashes)
+        return np.concatenate([self.linhas_teste(h, fracao) for h in hashes])
+
+    def carregar_estado(self):
+        if os.path.exists(self.arquivo_estado):
+            return joblib.load(self.arquivo_estado)
+        return {"sessoes": [], "scaler": None, "melhores_params": None, "melhor_score": None, "fracao_teste": None}
+
+    def salvar_estado(self, estado):
+        joblib.dump(estado, self.arquivo_estado)
+
+    # Atualiza o MinMaxScaler do estado só com as linhas de treino das sessões novas. Se alguma
+    # sessão usada antes foi removida do registro, o mínimo/máximo pode ter diminuído e o scaler
+    # é refeito (também quando o estado é de uma divisão treino/teste diferente).
+    # Retorna (scaler, sessões novas).
+    def atualizar_scaler(self, estado):
+        anteriores = set(estado["sessoes"])
+        atuais = set(self.sessoes)
+        scaler = estado["scaler"]
+        if scaler is None or not anteriores.issubset(atuais) or estado.get("fracao_teste") != FRACAO_TESTE:
+            scaler = MinMaxScaler()
+            novas = sorted(atuais)
+        else:
+            novas = sorted(atuais - anteriores)
+        for hash_sessao in novas:
+            treino = ~self.linhas_teste(hash_sessao)
+            if treino.any():
+                scaler.partial_fit(self.valores(hash_sessao)[treino])
+        return scaler, novas
+
+def main():
+    parser = argparse.ArgumentParser(description="Registro de sessões rotuladas para o treinamento.")
+    parser.add_argument("--diretorio", default=DIRETORIO_REGISTRO)
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_add = sub.add_parser("adicionar", help="Adiciona uma sessão rotulada (CSV ou .nes)")
+    p_add.add_argument("arquivos", nargs="+")
+    p_add.add_argument("--rotulo", required=True)
+    p_imp = sub.add_parser("importar", help="Importa o dataset único (uma sessão por rótulo)")
+    p_imp.add_argument("dataset")
+    p_imp.add_argument("--coluna-rotulo", default="Tipo_álcool")
+    p_rem = sub.add_parser("remover", help="Remove uma sessão pelo hash (ou prefixo do hash)")
+    p_rem.add_argument("hash")
+    sub.add_parser("listar", help="Lista as sessões do registro")
+    args = parser.parse_args()
+
+    registro = RegistroDataset(args.diretorio)
+    if args.comando == "adicionar":
+        for arquivo in args.arquivos:
+            print(f"{registro.adicionar_sessao(arquivo, args.rotulo)[:12]}  {arquivo}")
+    elif args.comando == "importar":
+        for hash_sessao in registro.importar_dataset(args.dataset, args.coluna_rotulo):
+            print(f"{hash_sessao[:12]}  {registro.sessoes[hash_sessao]['rotulo']}")
+    elif args.comando == "remover":
+        encontrados = [h for h in registro.sessoes if h.startswith(args.hash)]
+        if len(encontrados) != 1:
+            parser.error(f"O hash '{args.hash}' corresponde a {len(encontrados)} sessões.")
+        registro.remover_sessao(encontrados[0])
+    else:
+        estado = registro.carregar_estado()
+        treinadas = set(estado["sessoes"])
+        for hash_sessao, info in sorted(registro.sessoes.items(), key=lambda item: item[1]["adicionada_em"]):
+            marca = " " if hash_sessao in treinadas else "*"
+            print(f"{marca} {hash_sessao[:12]}  {info['rotulo']:<12} {info['n_linhas']:>8} linhas  {info['origem']}")
+        print("(* = ainda não usada no treinamento)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# Versões das bibliotecas utilizadas:
+# scikit-learn: 1.7.0
+# numpy: 2.3.1
+
+# Seleção do modelo pela acurácia e pelo custo de inferência (treinamento.py --zoo).
+#
+# Com 4 sensores e 3 classes, modelos bem mais baratos que a floresta podem ter a mesma
+# acurácia. Cada candidato (centroide mais próximo, LDA, kNN com KD-tree, gradient boosting
+# raso, florestas pequenas e a floresta da busca) é avaliado com:
+# - acurácia da validação cruzada no conjunto de treino e acurácia no conjunto de teste;
+# - latência do predict_proba (com o scaler) para 1 leitura, para uma janela do classificador
+#   em tempo real (30 leituras) e para um lote grande (análise de um arquivo), e o custo por
+#   leitura no lote grande. As florestas são medidas já achatadas, como no tempo real.
+#
+# A fronteira de Pareto (acurácia na validação cruzada x latência da janela) mostra quais
+# candidatos valem a pena. O escolhido é o mais barato cuja acurácia fica a até 'tolerancia'
+# da melhor entre os que cabem no orçamento de latência. Ele é salvo no mesmo formato de
+# artefato que a interface já carrega (artefatos.criar_artefato), já que todos os candidatos
+# têm predict_proba e classes_.
+
+import time
+
+import numpy as np
+from sklearn.discriminant_analysis import LinearDiscriminantAnalysis
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.model_selection import cross_val_score
+from sklearn.neighbors import KNeighborsClassifier, NearestCentroid
+
+from floresta_plana import achatar_se_possivel
+
+TAMANHO_JANELA = 30 # Leituras por avaliação do classificador em tempo real (classificacao_tempo_real.py)
+TAMANHO_LOTE = 10000
+
+# Candidatos de cada família. 'melhores_params': configuração da floresta vinda da busca.
+def candidatos_padrao(melhores_params=None, random_state=42):
+    candidatos = {
+        "centroide_mais_proximo": NearestCentroid(),
+        "lda": LinearDiscriminantAnalysis(),
+        "knn_5": KNeighborsClassifier(n_neighbors=5, algorithm="kd_tree"),
+        "knn_15": KNeighborsClassifier(n_neighbors=15, algorithm="kd_tree"),
+        "knn_31": KNeighborsClassifier(n_neighbors=31, algorithm="kd_tree"),
+        "gradient_boosting_prof2": HistGradientBoostingClassifier(max_depth=2, max_iter=50, early_stopping=False,
+                                                                   random_state=random_state),
+        "gradient_boosting_prof4": HistGradientBoostingClassifier(max_depth=4, max_iter=100, early_stopping=False,
+                                                                   random_state=random_state),
+        "floresta_10_arvores": RandomForestClassifier(n_estimators=10, max_depth=10, random_state=random_state),
+        "floresta_30_arvores": RandomForestClassifier(n_estimators=30, max_depth=15, random_state=random_state),
+    }
+    if melhores_params is not None:
+        candidatos["floresta_busca"] = RandomForestClassifier(random_state=random_state, **melhores_params)
+    return candidatos
+
+# Tempo mediano de 'funcao()' em 'repeticoes' execuções (depois de uma execução de aquecimento)
+def _tempo(funcao, repeticoes):
+    funcao()
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return float(np.median(tempos))
+
+# Latências do predict_proba (com o scaler, sobre leituras brutas) de um modelo já ajustado
+def medir_latencia(modelo, scaler, X_bruto, repeticoes=50):
+    modelo = achatar_se_possivel(modelo)
+    lote = X_bruto[:TAMANHO_LOTE]
+    janela = X_bruto[:TAMANHO_JANELA]
+    tempo_lote = _tempo(lambda: modelo.predict_proba(scaler.transform(lote)), max(3, repeticoes // 10))
+    return {
+        "latencia_1_leitura_ms": _tempo(lambda: modelo.predict_proba(scaler.transform(X_bruto[:1])), repeticoes) * 1000,
+        "latencia_janela_ms": _tempo(lambda: modelo.predict_proba(scaler.transform(janela)), repeticoes) * 1000,
+        "latencia_lote_ms": tempo_lote * 1000,
+        "custo_por_leitura_us": tempo_lote / len(lote) * 1e6,
+    }
+
+# Avalia os candidatos. 'X_busca'/'y_busca': validação cruzada; 'X_ajuste'/'y_ajuste': ajuste
+# final; 'X_teste'/'y_teste': acurácia de teste e latência. Os X já estão normalizados pelo
+# 'scaler' (a latência é medida sobre as leituras de teste desnormalizadas, como chegam da coleta).
+# 'prontos': nome -> (modelo já ajustado, nota da validação cruzada), ex.: a floresta da busca.
+# Retorna (resultados, modelos ajustados), ambos por nome.
+def avaliar_candidatos(candidatos, X_busca, y_busca, X_ajuste, y_ajuste, X_teste, y_teste, scaler,
+                       prontos=None, cv=5, n_jobs=-1, ao_mensagem=print):
+    prontos = prontos or {}
+    X_bruto = scaler.inverse_transform(np.asarray(X_teste[:TAMANHO_LOTE], dtype=np.float64))
+    resultados = {}
+    modelos = {}
+    for nome, estimador in list(candidatos.items()) + [(n, None) for n in prontos if n not in candidatos]:
+        inicio = time.perf_counter()
+        if nome in prontos:
+            modelo, nota_cv = prontos[nome]
+            tempo_ajuste = None
+        else:
+            nota_cv = float(np.mean(cross_val_score(estimador, X_busca, y_busca, cv=cv, scoring='accuracy', n_jobs=n_jobs)))
+            modelo = estimador
+            inicio_ajuste = time.perf_counter()
+            modelo.fit(X_ajuste, y_ajuste)
+            tempo_ajuste = time.perf_counter() - inicio_ajuste
+        y_pred = modelo.predict(X_teste)
+        resultados[nome] = {
+            "modelo": type(modelo).__name__,
+            "parametros": {k: (v.item() if hasattr(v, "item") else v) for k, v in modelo.get_params().items()
+                           if isinstance(v, (int, float, str, bool, type(None), np.generic))},
+            "acuracia_cv": float(nota_cv),
+            "acuracia_teste": float(np.mean(np.asarray(y_pred).astype(str) == np.asarray(y_teste).astype(str))),
+            "ajuste_s": tempo_ajuste,
+            **medir_latencia(modelo, scaler, X_bruto),
+        }
+        modelos[nome] = modelo
+        r = resultados[nome]
+        ao_mensagem(f"{nome:>24}: acurácia CV {r['acuracia_cv']:.4f}, teste {r['acuracia_teste']:.4f}, "
+                    f"janela {r['latencia_janela_ms']:.2f} ms, {r['custo_por_leitura_us']:.2f} µs/leitura "
+                    f"({time.perf_counter() - inicio:.1f} s)")
+    return resultados, modelos
+
+# Nomes dos candidatos na fronteira de Pareto (maior acurácia CV, menor latência da janela),
+# do mais barato para o mais caro
+def fronteira_pareto(resultados, custo="latencia_janela_ms", qualidade="acuracia_cv"):
+    fronteira = []
+    melhor = -np.inf
+    for nome in sorted(resultados, key=lambda n: (resultados[n][custo], -resultados[n][qualidade])):
+        if resultados[nome][qualidade] > melhor:
+            fronteira.append(nome)
+            melhor = resultados[nome][qualidade]
+    return fronteira
+
+# Escolhe o candidato: entre os que cabem no orçamento de latência da janela (todos, sem
+# orçamento), o mais barato com acurácia CV a até 'tolerancia' da melhor. Se nenhum couber
+# no orçamento, fica o mais rápido. Retorna (nome, motivo).
+def escolher(resultados, orcamento_ms=None, tolerancia=0.005, custo="latencia_janela_ms"):
+    viaveis = [n for n in resultados if orcamento_ms is None or resultados[n][custo] <= orcamento_ms]
+    if not viaveis:
+        nome = min(resultados, key=lambda n: resultados[n][custo])
+        return nome, f"nenhum candidato cabe no orçamento de {orcamento_ms} ms; escolhido o mais rápido"
+    melhor = max(resultados[n]["acuracia_cv"] for n in viaveis)
+    nome = min((n for n in viaveis if resultados[n]["acuracia_cv"] >= melhor - tolerancia),
+               key=lambda n: resultados[n][custo])
+    motivo = f"mais barato com acurácia CV a até {tolerancia:.3f} da melhor ({melhor:.4f})"
+    if orcamento_ms is not None:
+        motivo += f" dentro do orçamento de {orcamento_ms} ms por janela"
+    return nome, motivo
+
+# Relatório completo: resultados de cada candidato, fronteira de Pareto e escolha
+def relatorio(resultados, escolhido, motivo, orcamento_ms=None, tolerancia=0.005):
+    fronteira = fronteira_pareto(resultados)
+    for nome, r in resultados.items():
+        r["pareto"] = nome in fronteira
+    return {
+        "criterio_custo": "latencia_janela_ms",
+        "tamanho_janela": TAMANHO_JANELA,
+        "tamanho_lote": TAMANHO_LOTE,
+        "orcamento_latencia_ms": orcamento_ms,
+        "tolerancia_acuracia": tolerancia,
+        "fronteira_pareto": fronteira,
+        "escolhido": escolhido,
+        "motivo": motivo,
+        "candidatos": resultados,
+    }
@@ -0,0 +1,268 @@
+# Versões das bibliotecas utilizadas:
+# pandas: 2.3.0
+# numpy: 2.3.1
+
+# Formato binário de sessões de coleta (.nes).
+#
+# Estrutura do arquivo:
+#   Cabeçalho: 'NESB' | versão (uint16) | nº de colunas (uint16) | tamanho dos metadados (uint32)
+#              seguido dos metadados em JSON (R0 dos sensores, porta, data da coleta...).
+#   Blocos:    'BLCO' | nº de linhas (uint32) | tempo inicial (float64) | tempo final (float64)
+#              seguido das linhas: tempo relativo ao início do bloco e MQ3, MQ5, MQ6, MQ8,
+#              todos em float32 (20 bytes por linha).
+#
+# Os blocos são acrescentados ao final do arquivo durante a coleta. O último bloco fica aberto
+# até completar 'linhas_por_bloco' linhas: cada flush acrescenta as linhas novas a ele e
+# reescreve o seu cabeçalho (nº de linhas e tempo final), em vez de começar um bloco novo.
+# Assim, um flush frequente não acrescenta cabeçalhos, e o que já foi descarregado no disco
+# sobrevive a uma interrupção da coleta. Na leitura, o arquivo é
+# mapeado em memória (np.memmap) e cada bloco é uma visão direta sobre o mapa (sem cópia).
+# O índice dos blocos (posição, nº de linhas, tempo inicial/final) é montado percorrendo
+# apenas os cabeçalhos dos blocos. Um bloco incompleto no final (coleta interrompida) é ignorado.
+
+import argparse
+import json
+import os
+import struct
+import time
+
+import numpy as np
+import pandas as pd
+
+from classificador import COLUNAS_SENSORES, ler_csv_amostra
+
+EXTENSAO = ".nes"
+MAGICO_ARQUIVO = b"NESB"
+MAGICO_BLOCO = b"BLCO"
+VERSAO = 1
+
+_CABECALHO = struct.Struct("<4sHHI")
+_CABECALHO_BLOCO = struct.Struct("<4sIdd")
+
+# Registro de uma linha: tempo (segundos desde o início do bloco) + 4 sensores
+REGISTRO = np.dtype([("tempo", "<f4")] + [(coluna, "<f4") for coluna in COLUNAS_SENSORES])
+
+def eh_sessao_binaria(caminho):
+    return str(caminho).lower().endswith(EXTENSAO)
+
+# Gravação de uma sessão, bloco a bloco. Com 'acrescentar=True' e o arquivo já existente,
+# as novas linhas são acrescentadas ao final (os metadados originais são mantidos).
+class GravadorSessaoBinaria:
+    def __init__(self, caminho, metadados=None, linhas_por_bloco=4096, acrescentar=False):
+        self.caminho = caminho
+        self.linhas_por_bloco = linhas_por_bloco
+        self.linhas_gravadas = 0
+        self._pendentes = []
+        self._n_pendentes = 0
+        self._bloco_aberto = None # (posição do cabeçalho, nº de linhas, tempo inicial) do último bloco, incompleto
+        if acrescentar and os.path.exists(caminho):
+            indice = ler_indice(caminho)
+            self._arquivo = open(caminho, 'r+b')
+            # Descarta um eventual bloco incompleto no final antes de acrescentar
+            self._arquivo.truncate(indice["fim_dados"])
+            self._arquivo.seek(indice["fim_dados"])
+            self.metadados = indice["metadados"]
+        else:
+            self.metadados = {"colunas": list(COLUNAS_SENSORES), "criado_em": time.strftime("%Y-%m-%d %H:%M:%S")}
+            self.metadados.update(metadados or {})
+            meta = json.dumps(self.metadados, ensure_ascii=False).encode('utf-8')
+            self._arquivo = open(caminho, 'wb')
+            self._arquivo.write(_CABECALHO.pack(MAGICO_ARQUIVO, VERSAO, len(COLUNAS_SENSORES), len(meta)) + meta)
+
+    def adicionar(self, valores, tempos):
+        n = len(valores)
+        if n == 0:
+            return
+        self._pendentes.append((np.asarray(valores, dtype=np.float32), np.asarray(tempos, dtype=np.float64)))
+        self._n_pendentes += n
+        if self._n_pendentes >= self.linhas_por_bloco:
+            self._gravar_pendentes()
+
+    # Grava as linhas pendentes: completa o bloco aberto (reescrevendo o seu cabeçalho) e
+    # começa blocos novos quando ele enche
+    def _gravar_pendentes(self):
+        if not self._pendentes:
+            return
+        valores = np.concatenate([v for v, _ in self._pendentes])
+        tempos = np.concatenate([t for _, t in self._pendentes])
+        inicio = 0
+        while inicio < len(valores):
+            if self._bloco_aberto is None:
+                posicao, n_bloco, t_inicio = self._arquivo.tell(), 0, tempos[inicio]
+            else:
+                posicao, n_bloco, t_inicio = self._bloco_aberto
+            fim = min(len(valores), inicio + self.linhas_por_bloco - n_bloco)
+            bloco = np.empty(fim - inicio, dtype=REGISTRO)
+            bloco["tempo"] = tempos[inicio:fim] - t_inicio
+            _valores_sensores(bloco)[:] = valores[inicio:fim]
+            cabecalho = _CABECALHO_BLOCO.pack(MAGICO_BLOCO, n_bloco + len(bloco), t_inicio, tempos[fim - 1])
+            if n_bloco == 0:
+                self._arquivo.write(cabecalho + bloco.tobytes())
+            else:
+                # As linhas vão antes do cabeçalho: se a gravação for interrompida no meio, o
+                # cabeçalho antigo continua valendo e as linhas a mais são ignoradas na leitura
+                self._arquivo.write(bloco.tobytes())
+                self._arquivo.seek(posicao)
+                self._arquivo.write(cabecalho)
+                self._arquivo.seek(0, os.SEEK_END)
+            n_bloco += len(bloco)
+            self._bloco_aberto = (posicao, n_bloco, t_inicio) if n_bloco < self.linhas_por_bloco else None
+            self.linhas_gravadas += len(bloco)
+            inicio = fim
+        self._pendentes = []
+        self._n_pendentes = 0
+
+    # Grava o que estiver pendente (no bloco aberto) e descarrega no disco
+    def flush(self):
+        self._gravar_pendentes()
+        self._arquivo.flush()
+
+    def fechar(self):
+        self.flush()
+        self._arquivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+# Função para ler os metadados e o índice dos blocos de uma sessão.
+# Retorna um dicionário com 'metadados', 'blocos' (lista de (posição dos dados, nº de linhas,
+# tempo inicial, tempo final)), 'n_linhas' e 'fim_dados' (fim do último bloco completo).
+def ler_indice(caminho):
+    tamanho_arquivo = os.path.getsize(caminho)
+    with open(caminho, 'rb') as f:
+        magico, versao, n_colunas, tamanho_meta = _CABECALHO.unpack(f.read(_CABECALHO.size))
+        if magico != MAGICO_ARQUIVO:
+            raise ValueError(f"'{caminho}' não é uma sessão binária do nariz eletrônico.")
+        if versao != VERSAO or n_colunas != len(COLUNAS_SENSORES):
+            raise ValueError(f"Versão ({versao}) ou número de colunas ({n_colunas}) da sessão '{caminho}' não suportados.")
+        metadados = json.loads(f.read(tamanho_meta).decode('utf-8'))
+
+        blocos = []
+        posicao = _CABECALHO.size + tamanho_meta
+        while posicao + _CABECALHO_BLOCO.size <= tamanho_arquivo:
+            f.seek(posicao)
+            magico, n, t_inicio, t_fim = _CABECALHO_BLOCO.unpack(f.read(_CABECALHO_BLOCO.size))
+            fim_bloco = posicao + _CABECALHO_BLOCO.size + n * REGISTRO.itemsize
+            if magico != MAGICO_BLOCO or fim_bloco > tamanho_arquivo:
+                break # Bloco incompleto (coleta interrompida durante a gravação)
+            blocos.append((posicao + _CABECALHO_BLOCO.size, n, t_inicio, t_fim))
+            posicao = fim_bloco
+    return {
+        "metadados": metadados,
+        "blocos": blocos,
+        "n_linhas": sum(b[1] for b in blocos),
+        "fim_dados": posicao,
+    }
+
+# Visão (n x 4) float32 dos sensores sobre os registros: cada registro tem 5 float32
+# (o primeiro é o tempo), então basta pular a primeira coluna.
+def _valores_sensores(registros):
+    return registros.view(np.float32).reshape(len(registros), REGISTRO.itemsize // 4)[:, 1:]
+
+# Leitura de uma sessão binária com mapeamento em memória
+class SessaoBinaria:
+    def __init__(self, caminho):
+        self.caminho = caminho
+        indice = ler_indice(caminho)
+        self.metadados = indice["metadados"]
+        self.blocos = indice["blocos"]
+        self.n_linhas = indice["n_linhas"]
+        self._mapa = np.memmap(caminho, dtype=np.uint8, mode='r') if self.blocos else None
+
+    def __len__(self):
+        return self.n_linhas
+
+    # Visões (sem cópia) dos registros de cada bloco
+    def iterar_blocos(self):
+        for posicao, n, _, _ in self.blocos:
+            yield np.ndarray(shape=(n,), dtype=REGISTRO, buffer=self._mapa, offset=posicao)
+
+    # Matriz (n x 4) float32 com as leituras dos sensores e vetor com os tempos absolutos.
+    # Com um único bloco e sem filtro de tempo, a matriz é uma visão direta sobre o arquivo;
+    # com vários blocos, eles são concatenados.
+    def ler(self, t_inicio=None, t_fim=None):
+        valores = []
+        tempos = []
+        for (_, _, b_inicio, b_fim), registros in zip(self.blocos, self.iterar_blocos()):
+            # O índice permite pular blocos fora do intervalo de tempo sem lê-los
+            if (t_inicio is not None and b_fim < t_inicio) or (t_fim is not None and b_inicio > t_fim):
+                continue
+            v = _valores_sensores(registros)
+            t = b_inicio + registros["tempo"].astype(np.float64)
+            if t_inicio is not None or t_fim is not None:
+                mascara = np.ones(len(t), dtype=bool)
+                if t_inicio is not None:
+                    mascara &= t >= t_inicio
+                if t_fim is not None:
+                    mascara &= t <= t_fim
+                v, t = v[mascara], t[mascara]
+            valores.append(v)
+            tempos.append(t)
+        if not valores:
+            return np.empty((0, len(COLUNAS_SENSORES)), dtype=np.float32), np.empty(0)
+        if len(valores) == 1:
+            return valores[0], tempos[0]
+        return np.concatenate(valores), np.concatenate(tempos)
+
+    def como_dataframe(self, incluir_tempo=False):
+        valores, tempos = self.ler()
+        dados = pd.DataFrame(valores, columns=COLUNAS_SENSORES)
+        if incluir_tempo:
+            dados.insert(0, "tempo", tempos)
+        return dados
+
+# Função para converter um CSV de coleta (MQ3,MQ5,MQ6,MQ8) em sessão binária.
+# Os valores são guardados em float32; a conversão é verificada e falha se algum valor
+# não puder ser representado exatamente (na precisão em que foi escrito no CSV).
+def importar_csv(arquivo_csv, arquivo_sessao, metadados=None, linhas_por_bloco=65536):
+    dados, _ = ler_csv_amostra(arquivo_csv)
+    valores = dados.to_numpy(dtype=np.float64)
+    valores32 = valores.astype(np.float32)
+    convertidos = valores32.astype(str).astype(np.float64)
+    diferentes = np.count_nonzero((convertidos != valores) & ~(np.isnan(convertidos) & np.isnan(valores)))
+    if diferentes:
+        raise ValueError(f"{diferentes} valores de '{arquivo_csv}' não podem ser representados sem perda em float32.")
+    # O CSV não tem tempo: os tempos são gravados como NaN (SessaoBinaria.ler devolve tempos NaN)
+    tempos = np.full(len(valores32), np.nan)
+    meta = {"origem": os.path.basename(str(arquivo_csv))}
+    meta.update(metadados or {})
+    with GravadorSessaoBinaria(arquivo_sessao, meta, linhas_por_bloco) as gravador:
+        gravador.adicionar(valores32, tempos)
+    return len(valores32)
+
+# Função para exportar uma sessão binária para CSV no mesmo formato da coleta
+def exportar_csv(arquivo_sessao, arquivo_csv, incluir_tempo=False):
+    dados = SessaoBinaria(arquivo_sessao).como_dataframe(incluir_tempo)
+    dados.to_csv(arquivo_csv, index=False)
+    return len(dados)
+
+def main():
+    parser = argparse.ArgumentParser(description="Conversão entre CSV e sessão binária (.nes) do nariz eletrônico.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_imp = sub.add_parser("importar", help="CSV -> .nes")
+    p_imp.add_argument("csv")
+    p_imp.add_argument("sessao")
+    p_exp = sub.add_parser("exportar", help=".nes -> CSV")
+    p_exp.add_argument("sessao")
+    p_exp.add_argument("csv")
+    p_exp.add_argument("--tempo", action="store_true", help="Inclui a coluna de tempo")
+    p_info = sub.add_parser("info", help="Mostra os metadados e o índice de blocos")
+    p_info.add_argument("sessao")
+    args = parser.parse_args()
+
+    if args.comando == "importar":
+        n = importar_csv(args.csv, args.sessao)
+        print(f"{n} linhas importadas: {os.path.getsize(args.csv)} -> {os.path.getsize(args.sessao)} bytes")
+    elif args.comando == "exportar":
+        n = exportar_csv(args.sessao, args.csv, args.tempo)
+        print(f"{n} linhas exportadas para {args.csv}")
+    else:
+        indice = ler_indice(args.sessao)
+        print(json.dumps(indice["metadados"], ensure_ascii=False, indent=2))
+        print(f"{indice['n_linhas']} linhas em {len(indice['blocos'])} blocos")
+
+if __name__ == "__main__":
+    main()
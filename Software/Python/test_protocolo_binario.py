@@ -0,0 +1,79 @@
+# Versões das bibliotecas utilizadas:
+# numpy: 2.3.1
+# pytest: 9.1.1
+
+# Testes do decodificador do protocolo binário com os quadros do Arduino virtual
+# (porta_virtual.ArduinoVirtual): contagem de quadros corrompidos e perdidos, volta da
+# sequência em 65535 e quadros divididos entre leituras da porta.
+#
+#   python -m pytest test_protocolo_binario.py
+
+import numpy as np
+import pytest
+
+import protocolo_binario
+from porta_virtual import MENSAGENS_INICIAIS, ArduinoVirtual
+
+# Fluxo de bytes do Arduino virtual (mensagens iniciais + 'lotes' lotes de quadros) e o próprio
+# Arduino virtual, com os contadores do que foi corrompido e perdido
+def gerar_fluxo(lotes=20, sequencia_inicial=0, **kwargs):
+    virtual = ArduinoVirtual(protocolo="binario", usar_loop=True, **kwargs)
+    try:
+        virtual._sequencia = sequencia_inicial
+        fluxo = b"".join((mensagem + "\r\n").encode('utf-8') for mensagem in MENSAGENS_INICIAIS)
+        for _ in range(lotes):
+            fluxo += virtual._gerar_lote(virtual.tamanho_lote)
+            virtual.enviadas += virtual.tamanho_lote
+    finally:
+        virtual.fechar()
+    return fluxo, virtual
+
+def decodificar_em_partes(fluxo, tamanhos):
+    decodificador = protocolo_binario.DecodificadorQuadros()
+    valores, sequencias = [], []
+    posicao = 0
+    for tamanho in tamanhos:
+        v, s = decodificador.decodificar(fluxo[posicao:posicao + tamanho])
+        valores.append(v)
+        sequencias.append(s)
+        posicao += tamanho
+        if posicao >= len(fluxo):
+            break
+    return decodificador, np.concatenate(valores), np.concatenate(sequencias)
+
+@pytest.mark.parametrize("tipo", [protocolo_binario.TIPO_FLOAT32, protocolo_binario.TIPO_ADC_UINT16])
+def test_contagem_de_corrompidos_e_perdidos(tipo):
+    fluxo, virtual = gerar_fluxo(proporcao_malformadas=0.02, proporcao_perdidas=0.03, semente=1, tipo_quadro=tipo)
+    assert virtual.malformadas > 0 and virtual.perdidas > 0
+    decodificador, valores, _ = decodificar_em_partes(fluxo, [len(fluxo)])
+    assert decodificador.quadros_corrompidos == virtual.malformadas
+    assert decodificador.quadros_perdidos == virtual.perdidas
+    assert decodificador.quadros_validos == len(valores) == virtual.enviadas - virtual.malformadas - virtual.perdidas
+
+def test_sequencia_com_volta_em_65535():
+    fluxo, virtual = gerar_fluxo(lotes=5, sequencia_inicial=65400, proporcao_perdidas=0.05, semente=2)
+    decodificador, _, sequencias = decodificar_em_partes(fluxo, [len(fluxo)])
+    assert sequencias.min() < 100 and sequencias.max() > 65400 # Passou pela volta
+    assert decodificador.quadros_perdidos == virtual.perdidas
+    assert np.all((np.diff(sequencias) & 0xFFFF) >= 1) # Crescente, módulo 65536
+    assert len(sequencias) + virtual.perdidas == virtual.enviadas
+
+def test_quadros_divididos_entre_leituras():
+    fluxo, virtual = gerar_fluxo(proporcao_malformadas=0.02, proporcao_perdidas=0.03, semente=3)
+    inteiro, valores, sequencias = decodificar_em_partes(fluxo, [len(fluxo)])
+    tamanhos = np.random.default_rng(0).integers(1, 40, size=len(fluxo))
+    partes, valores_partes, sequencias_partes = decodificar_em_partes(fluxo, tamanhos)
+    np.testing.assert_array_equal(valores_partes, valores)
+    np.testing.assert_array_equal(sequencias_partes, sequencias)
+    assert (partes.quadros_validos, partes.quadros_corrompidos, partes.quadros_perdidos) == \
+           (inteiro.quadros_validos, virtual.malformadas, virtual.perdidas)
+
+def test_valores_decodificados():
+    valores = np.random.default_rng(4).uniform(0.1, 5.0, size=(50, 4))
+    decodificado, sequencias = protocolo_binario.DecodificadorQuadros().decodificar(protocolo_binario.montar_quadros(valores, 7))
+    np.testing.assert_allclose(decodificado, valores.astype(np.float32))
+    np.testing.assert_array_equal(sequencias, np.arange(7, 57))
+    adc = protocolo_binario.ppm_para_adc(valores)
+    decodificado, _ = protocolo_binario.DecodificadorQuadros().decodificar(
+        protocolo_binario.montar_quadros(adc, tipo=protocolo_binario.TIPO_ADC_UINT16))
+    np.testing.assert_allclose(decodificado, protocolo_binario.adc_para_ppm(adc))
@@ -6,6 +6,9 @@
 # joblib: 1.5.1
 # scipy: 1.16.0
 
+import argparse
+import json
+
 import pandas as pd
 from sklearn.model_selection import train_test_split, RandomizedSearchCV
 from sklearn.ensemble import RandomForestClassifier
@@ -16,20 +19,130 @@ import seaborn as sns
 import joblib
 from scipy.stats import randint
 
-# 1. Carrega o dataset
-dataset = pd.read_csv("dataset_nariz_eletronico.csv")
+import artefatos
+import busca_retomavel
+import metricas
+import selecao_modelos
+import treinamento_fora_memoria
+import registro_dataset
+from registro_dataset import RegistroDataset
+
+# --- Opções de linha de comando ---
+parser = argparse.ArgumentParser(description="Treinamento do modelo do nariz eletrônico.")
+parser.add_argument("--busca", choices=["aleatoria", "halving"], default="aleatoria",
+                    help="'aleatoria': RandomizedSearchCV (padrão); 'halving': successive halving retomável com o nº de árvores como recurso")
+parser.add_argument("--checkpoint", default="checkpoint_busca.jsonl",
+                    help="Arquivo onde cada candidato avaliado é gravado (modo halving); rodar de novo retoma a busca")
+parser.add_argument("--orcamento", type=float, default=None, help="Tempo máximo da busca em segundos (modo halving)")
+parser.add_argument("--comparar", action="store_true",
+                    help="Gera um relatório comparando o tempo até a melhor nota da busca aleatória e do halving")
+parser.add_argument("--relatorio", default="relatorio_busca.json", help="Arquivo do relatório de comparação")
+parser.add_argument("--registro", default=None,
+                    help="Diretório do registro de sessões (registro_dataset.py); treina de forma incremental, "
+                         "reajustando a melhor configuração conhecida")
+parser.add_argument("--busca-completa", action="store_true",
+                    help="Com --registro, refaz a busca de hiperparâmetros em vez de reaproveitar a melhor configuração")
+parser.add_argument("--metricas", default=None,
+                    help="Grava a duração de cada etapa do treinamento (metricas.py): '.prom' no formato do Prometheus, "
+                         "qualquer outra extensão em JSON lines")
+parser.add_argument("--iteracoes", type=int, default=100,
+                    help="Nº de combinações sorteadas pela busca (aleatória ou halving, e na --comparar) (padrão 100)")
+parser.add_argument("--fora-memoria", action="store_true",
+                    help="Lê o dataset em blocos, sem carregá-lo inteiro na memória (treinamento_fora_memoria.py): "
+                         "a busca e o reajuste usam amostras estratificadas por classe e por sessão")
+parser.add_argument("--dataset", default="dataset_nariz_eletronico.csv", help="Arquivo CSV do dataset")
+parser.add_argument("--coluna-sessao", default=None,
+                    help="Com --fora-memoria, coluna que identifica a sessão de cada linha (sem ela, cada trecho "
+                         "contínuo com o mesmo rótulo é uma sessão)")
+parser.add_argument("--tamanho-bloco", type=int, default=200_000, help="Linhas lidas por vez com --fora-memoria")
+parser.add_argument("--amostra-busca", type=int, default=200_000,
+                    help="Linhas da amostra usada na busca de hiperparâmetros com --fora-memoria")
+parser.add_argument("--amostra-treino", type=int, default=2_000_000,
+                    help="Linhas da amostra usada no reajuste do melhor modelo com --fora-memoria")
+parser.add_argument("--amostra-teste", type=int, default=500_000,
+                    help="Linhas da amostra de teste com --fora-memoria")
+parser.add_argument("--balancear-classes", action="store_true",
+                    help="Com --fora-memoria, a mesma cota de linhas para cada classe (padrão: proporcional ao dataset)")
+parser.add_argument("--zoo", action="store_true",
+                    help="Compara a floresta com modelos mais baratos (centroide, LDA, kNN, gradient boosting raso) pela "
+                         "acurácia e pela latência de inferência e salva o escolhido (selecao_modelos.py)")
+parser.add_argument("--orcamento-latencia-ms", type=float, default=None,
+                    help="Com --zoo, latência máxima do predict_proba de uma janela do tempo real (ms)")
+parser.add_argument("--tolerancia-zoo", type=float, default=0.005,
+                    help="Com --zoo, perda de acurácia aceita para escolher um modelo mais barato (padrão 0.005)")
+parser.add_argument("--relatorio-zoo", default="relatorio_modelos.json", help="Arquivo do relatório do --zoo")
+args = parser.parse_args()
+if args.metricas:
+    metricas.ativar(args.metricas)
+
+if args.registro:
+    # 1. Carrega as sessões do registro. Só as sessões novas são lidas e convertidas (as demais
+    # vêm do cache) e só as linhas de treino delas atualizam o mínimo/máximo do scaler.
+    # (Com --fora-memoria, o scaler é ajustado na preparação, com a divisão por sessão dela.)
+    registro = RegistroDataset(args.registro)
+    estado = registro.carregar_estado()
+    with metricas.medir("treinamento.leitura_dados"):
+        scaler, sessoes_novas = registro.atualizar_scaler(estado)
+    refazer_busca = args.busca_completa or estado["melhores_params"] is None
+    if not sessoes_novas and not refazer_busca:
+        raise SystemExit("Nenhuma sessão nova no registro; o modelo atual continua válido.")
+    print(f"{len(registro.sessoes)} sessões no registro, {len(sessoes_novas)} novas desde o último treinamento")
 
-# 2. Separa as colunas de entrada (X) e saída (y)
-X = dataset[["MQ3", "MQ5", "MQ6", "MQ8"]]
-y = dataset["Tipo_álcool"]
+    # 2. Separa as colunas de entrada (X) e saída (y)
+    if not args.fora_memoria:
+        with metricas.medir("treinamento.leitura_dados"):
+            X, y, _ = registro.dados()
+            teste = registro.mascara_teste()
+else:
+    refazer_busca = True
+    scaler = None
 
-# 3. Divide os dados em treino (80%) e teste (20%)
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    # 1. Carrega o dataset
+    if not args.fora_memoria:
+        with metricas.medir("treinamento.leitura_dados"):
+            dataset = pd.read_csv(args.dataset)
 
-# Normalização dos dados
-scaler = MinMaxScaler()
-X_train_scaled = scaler.fit_transform(X_train.values)
-X_test_scaled = scaler.transform(X_test.values)
+        # 2. Separa as colunas de entrada (X) e saída (y)
+        X = dataset[["MQ3", "MQ5", "MQ6", "MQ8"]]
+        y = dataset["Tipo_álcool"]
+
+if args.fora_memoria:
+    # 1-3. Duas passadas em blocos: scaler (partial_fit), divisão por sessão e amostras
+    # normalizadas gravadas em matrizes mapeadas em memória
+    if args.registro:
+        fonte = treinamento_fora_memoria.FonteRegistro(registro, args.tamanho_bloco)
+    else:
+        fonte = treinamento_fora_memoria.FonteCSV(args.dataset, coluna_sessao=args.coluna_sessao,
+                                                   tamanho_bloco=args.tamanho_bloco)
+    with metricas.medir("treinamento.leitura_dados"):
+        conjunto = treinamento_fora_memoria.preparar(fonte, args.amostra_busca, args.amostra_treino,
+                                                     args.amostra_teste, balancear_classes=args.balancear_classes)
+    scaler = conjunto.scaler
+    print(f"{conjunto.n_linhas} linhas em {conjunto.n_grupos} sessões; amostras: busca {conjunto.busca.n}, "
+          f"reajuste {conjunto.treino.n}, teste {conjunto.teste.n} linhas")
+    X_train_scaled, y_train = conjunto.busca.X, pd.Series(conjunto.busca.y)
+    X_refit, y_refit = conjunto.treino.X, pd.Series(conjunto.treino.y)
+    X_test_scaled, y_test = conjunto.teste.X, pd.Series(conjunto.teste.y)
+    # Uma linha por classe com a média da classe: os perfis do artefato saem iguais aos do dataset inteiro
+    X, y = pd.DataFrame(conjunto.medias_classes[0]), pd.Series(conjunto.medias_classes[1])
+else:
+    # 3. Divide os dados em treino (80%) e teste (20%)
+    if args.registro:
+        # Divisão fixa de cada sessão (registro_dataset.linhas_teste), a mesma usada no scaler
+        X_train, X_test, y_train, y_test = X[~teste], X[teste], y[~teste], y[teste]
+    else:
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    # Normalização dos dados
+    with metricas.medir("treinamento.normalizacao"):
+        if args.registro:
+            # O scaler incremental cobre o mínimo/máximo das linhas de treino de todas as sessões
+            X_train_scaled = scaler.transform(X_train.values)
+        else:
+            scaler = MinMaxScaler()
+            X_train_scaled = scaler.fit_transform(X_train.values)
+        X_test_scaled = scaler.transform(X_test.values)
+    X_refit, y_refit = X_train_scaled, y_train
 
 # --- Configuração para o Randomized Search ---
 # Define o modelo base
@@ -44,26 +157,94 @@ param_distributions = {
     'bootstrap': [True, False]
 }
 
-random_search = RandomizedSearchCV(estimator=rf,
-                                   param_distributions=param_distributions,
-                                   n_iter=100,
-                                   cv=5,
-                                   scoring='accuracy',
-                                   random_state=42,
-                                   n_jobs=-1,
-                                   verbose=2)
+if not refazer_busca:
+    # 4. Reajusta a melhor configuração da última busca com os dados atuais
+    melhores_params = estado["melhores_params"]
+    melhor_score = estado["melhor_score"]
+    print("Reaproveitando a melhor configuração da última busca (use --busca-completa para refazer a busca)")
+    model = RandomForestClassifier(random_state=42, n_jobs=-1, **melhores_params)
+    with metricas.medir("treinamento.reajuste"):
+        model.fit(X_refit, y_refit)
+    model.set_params(n_jobs=None)
+elif args.busca == "aleatoria":
+    random_search = RandomizedSearchCV(estimator=rf,
+                                       param_distributions=param_distributions,
+                                       n_iter=args.iteracoes,
+                                       cv=5,
+                                       scoring='accuracy',
+                                       random_state=42,
+                                       n_jobs=-1,
+                                       verbose=2,
+                                       refit=not args.fora_memoria)
 
-# 4. Treina o modelo COM Randomized Search
-random_search.fit(X_train_scaled, y_train)
+    # 4. Treina o modelo COM Randomized Search
+    with metricas.medir("treinamento.busca"):
+        random_search.fit(X_train_scaled, y_train)
 
-model = random_search.best_estimator_
+    melhores_params = random_search.best_params_
+    melhor_score = random_search.best_score_
+    if args.fora_memoria:
+        # A busca usou a amostra menor; o melhor candidato é reajustado com a amostra de treino
+        model = RandomForestClassifier(random_state=42, n_jobs=-1, **melhores_params)
+        with metricas.medir("treinamento.reajuste"):
+            model.fit(X_refit, y_refit)
+        model.set_params(n_jobs=None)
+    else:
+        model = random_search.best_estimator_
+else:
+    # 4. Treina o modelo com successive halving (retomável pelo checkpoint)
+    with metricas.medir("treinamento.busca"):
+        resultado_busca = busca_retomavel.busca_halving(X_train_scaled, y_train.values, param_distributions,
+                                                        n_candidatos=args.iteracoes, cv=5, checkpoint=args.checkpoint,
+                                                        orcamento=args.orcamento, n_jobs=-1, random_state=42)
+    if resultado_busca["melhores_params"] is None:
+        raise SystemExit("Nenhum candidato foi avaliado dentro do orçamento de tempo.")
+    print(f"{resultado_busca['avaliacoes']} avaliações ({resultado_busca['reaproveitadas']} reaproveitadas do checkpoint) "
+          f"em {resultado_busca['tempo_total']:.1f} s")
+    melhores_params = resultado_busca["melhores_params"]
+    melhor_score = resultado_busca["melhor_score"]
+    # Reajusta o melhor candidato com todo o conjunto de treino (como o refit do RandomizedSearchCV)
+    model = RandomForestClassifier(random_state=42, n_jobs=-1, **melhores_params)
+    with metricas.medir("treinamento.reajuste"):
+        model.fit(X_refit, y_refit)
+    model.set_params(n_jobs=None)
 
 print("\n===== MELHORES HIPERPARÂMETROS ENCONTRADOS =====")
-print(random_search.best_params_)
-print(f"Melhor pontuação (acurácia) com validação cruzada: {random_search.best_score_:.2f}")
+print(melhores_params)
+print(f"Melhor pontuação (acurácia) com validação cruzada: {melhor_score:.2f}")
+
+if args.comparar:
+    print("\n===== COMPARAÇÃO: BUSCA ALEATÓRIA x SUCCESSIVE HALVING =====")
+    relatorio = busca_retomavel.comparar_buscas(X_train_scaled, y_train.values, param_distributions, n_iter=args.iteracoes, cv=5)
+    for metodo in ("aleatoria", "halving"):
+        r = relatorio[metodo]
+        tempo_ate_melhor = float('nan') if r['tempo_ate_melhor_global_s'] is None else r['tempo_ate_melhor_global_s']
+        print(f"{metodo:>10}: melhor acurácia {r['melhor_score']:.4f}, tempo total {r['tempo_total_s']:.1f} s, "
+              f"tempo até a melhor nota global {tempo_ate_melhor:.1f} s, "
+              f"{r['arvores_ajustadas']} árvores ajustadas")
+    with open(args.relatorio, 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, indent=2, ensure_ascii=False)
+    print(f"Relatório salvo em {args.relatorio}")
+
+if args.zoo:
+    print("\n===== SELEÇÃO DO MODELO: ACURÁCIA x CUSTO DE INFERÊNCIA =====")
+    with metricas.medir("treinamento.zoo"):
+        resultados_zoo, modelos_zoo = selecao_modelos.avaliar_candidatos(
+            selecao_modelos.candidatos_padrao(), X_train_scaled, y_train.values, X_refit, y_refit.values,
+            X_test_scaled, y_test.values, scaler, prontos={"floresta_busca": (model, melhor_score)})
+    escolhido, motivo = selecao_modelos.escolher(resultados_zoo, args.orcamento_latencia_ms, args.tolerancia_zoo)
+    relatorio_zoo = selecao_modelos.relatorio(resultados_zoo, escolhido, motivo, args.orcamento_latencia_ms, args.tolerancia_zoo)
+    print(f"Fronteira de Pareto (acurácia CV x latência da janela): {', '.join(relatorio_zoo['fronteira_pareto'])}")
+    print(f"Modelo escolhido: {escolhido} ({motivo})")
+    with open(args.relatorio_zoo, 'w', encoding='utf-8') as f:
+        json.dump(relatorio_zoo, f, indent=2, ensure_ascii=False)
+    print(f"Relatório salvo em {args.relatorio_zoo}")
+    model = modelos_zoo[escolhido]
 
 # 5. Faz previsões com os dados de teste (já escalados) usando o melhor modelo
-y_pred = model.predict(X_test_scaled)
+with metricas.medir("treinamento.avaliacao"):
+    y_pred = model.predict(X_test_scaled)
+metricas.contar("treinamento.amostras_treino", len(X_refit))
 
 # 6. Avaliação do modelo final
 print("\n===== AVALIAÇÃO DO MODELO FINAL (no conjunto de teste) =====")
@@ -72,11 +253,39 @@ print("\nRelatório de Classificação:")
 print(classification_report(y_test, y_pred))
 
 # 7. Salva o modelo treinado E o scaler
-joblib.dump(model, "modelo_nariz_eletronico.pkl")
-joblib.dump(scaler, "scaler_nariz_eletronico.pkl")
+with metricas.medir("treinamento.gravacao"):
+    joblib.dump(model, "modelo_nariz_eletronico.pkl")
+    joblib.dump(scaler, "scaler_nariz_eletronico.pkl")
 print("Modelo salvo como modelo_nariz_eletronico.pkl")
 print("Scaler salvo como scaler_nariz_eletronico.pkl")
 
+# Salva também o pacote de artefatos usado pela interface (modelo, scaler, classes,
+# perfis médios normalizados de cada classe e hash do conteúdo)
+with metricas.medir("treinamento.gravacao"):
+    artefato = artefatos.criar_artefato(model, scaler, X.values, y.values)
+    artefatos.salvar_artefato(artefato, artefatos.ARQUIVO_ARTEFATO)
+print(f"Pacote de artefatos salvo como {artefatos.ARQUIVO_ARTEFATO} (hash {artefato['hash'][:12]})")
+
+if args.registro:
+    registro.salvar_estado({"sessoes": sorted(registro.sessoes), "scaler": scaler,
+                            "melhores_params": melhores_params, "melhor_score": melhor_score,
+                            # O scaler do --fora-memoria vem de outra divisão e não é reaproveitado
+                            "fracao_teste": None if args.fora_memoria else registro_dataset.FRACAO_TESTE})
+    print(f"Estado do treinamento incremental salvo em {registro.arquivo_estado}")
+
+if args.fora_memoria:
+    conjunto.limpar()
+    try:
+        import resource # Só existe no Linux/macOS
+        # ru_maxrss: kB no Linux
+        print(f"Pico de memória do processo: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+    except ImportError:
+        pass
+
+if args.metricas:
+    metricas.desativar()
+    print(f"Métricas das etapas salvas em {args.metricas}")
+
 # 8. Matriz de Confusão
 cm = confusion_matrix(y_test, y_pred, labels=model.classes_)
 
@@ -0,0 +1,259 @@
+# Versões das bibliotecas utilizadas:
+# pandas: 2.3.0
+# scikit-learn: 1.7.0
+# numpy: 2.3.1
+
+# Preparação dos dados do treinamento sem carregar o dataset inteiro na memória
+# (treinamento.py --fora-memoria), para datasets com meses de sessões.
+#
+# 1. Primeira passada: o dataset é lido em blocos (float32). São contadas as linhas de cada
+#    grupo (sessão + rótulo) e somadas as leituras de cada classe (perfis médios do artefato).
+# 2. Divisão por sessão: 20% das sessões de cada classe vão para o teste, inteiras, para que
+#    leituras da mesma sessão não fiquem dos dois lados. Uma classe com uma única sessão tem
+#    o final da sessão (últimos 20% das linhas) separado para o teste.
+# 3. Amostras estratificadas: cada classe recebe uma cota proporcional ao seu nº de linhas
+#    (as proporções das classes no dataset são mantidas), dividida igualmente entre as suas
+#    sessões (o que sobra das sessões pequenas vai para as maiores). Com 'balancear_classes',
+#    todas as classes recebem a mesma cota. As posições sorteadas são guardadas por grupo.
+# 4. Segunda passada: o MinMaxScaler é ajustado com partial_fit só com as linhas de treino, e
+#    as linhas sorteadas são gravadas em matrizes float32 mapeadas em memória
+#    (np.lib.format.open_memmap), normalizadas no lugar no final. O joblib passa matrizes
+#    mapeadas aos workers da validação cruzada pelo nome do arquivo, em vez de copiá-las.
+#
+# A memória usada depende do tamanho do bloco e das amostras, e não do tamanho do dataset.
+# Sem uma coluna de sessão, cada trecho contínuo de linhas com o mesmo rótulo é uma sessão.
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+from classificador import COLUNAS_SENSORES
+
+# Dataset em CSV, lido em blocos de 'tamanho_bloco' linhas
+class FonteCSV:
+    def __init__(self, caminho, coluna_rotulo="Tipo_álcool", coluna_sessao=None, tamanho_bloco=200_000):
+        self.caminho = caminho
+        self.coluna_rotulo = coluna_rotulo
+        self.coluna_sessao = coluna_sessao
+        self.tamanho_bloco = tamanho_bloco
+
+    # Gera (X float32, rótulos, sessões) de cada bloco
+    def blocos(self):
+        colunas = COLUNAS_SENSORES + [self.coluna_rotulo] + ([self.coluna_sessao] if self.coluna_sessao else [])
+        tipos = {coluna: np.float32 for coluna in COLUNAS_SENSORES}
+        ultimo_rotulo = None
+        sessao_atual = -1
+        for bloco in pd.read_csv(self.caminho, usecols=colunas, dtype=tipos, chunksize=self.tamanho_bloco):
+            rotulos = bloco[self.coluna_rotulo].to_numpy(dtype=object)
+            if self.coluna_sessao:
+                sessoes = bloco[self.coluna_sessao].astype(str).to_numpy(dtype=object)
+            else:
+                # Uma sessão nova a cada troca de rótulo (inclusive na fronteira entre blocos)
+                troca = np.empty(len(rotulos), dtype=bool)
+                troca[0] = rotulos[0] != ultimo_rotulo
+                troca[1:] = rotulos[1:] != rotulos[:-1]
+                sessoes = sessao_atual + np.cumsum(troca)
+                sessao_atual = int(sessoes[-1])
+                ultimo_rotulo = rotulos[-1]
+            yield bloco[COLUNAS_SENSORES].to_numpy(dtype=np.float32), rotulos, sessoes
+
+# Sessões de um registro (registro_dataset.RegistroDataset), lidas do cache mapeado em memória
+class FonteRegistro:
+    def __init__(self, registro, tamanho_bloco=200_000):
+        self.registro = registro
+        self.tamanho_bloco = tamanho_bloco
+
+    def blocos(self):
+        for hash_sessao in sorted(self.registro.sessoes):
+            valores = self.registro.valores(hash_sessao)
+            rotulo = self.registro.sessoes[hash_sessao]["rotulo"]
+            for inicio in range(0, len(valores), self.tamanho_bloco):
+                X = np.asarray(valores[inicio:inicio + self.tamanho_bloco], dtype=np.float32)
+                yield X, np.full(len(X), rotulo, dtype=object), np.full(len(X), hash_sessao, dtype=object)
+
+# Grupo (sessão, rótulo) de cada linha do bloco e a posição da linha dentro do grupo.
+# 'contagens' (grupo -> linhas já vistas) é atualizado.
+def _posicoes(rotulos, sessoes, contagens):
+    chaves = pd.MultiIndex.from_arrays([sessoes, rotulos])
+    codigos, grupos = pd.factorize(chaves)
+    bases = np.array([contagens.get(g, 0) for g in grupos], dtype=np.int64)
+    posicoes = pd.Series(codigos).groupby(codigos).cumcount().to_numpy() + bases[codigos]
+    for g, n in zip(grupos, np.bincount(codigos, minlength=len(grupos)).tolist()):
+        contagens[g] = contagens.get(g, 0) + n
+    return codigos, list(grupos), posicoes
+
+# Primeira passada. Retorna (linhas por grupo, soma das leituras e nº de linhas por classe).
+def varrer(fonte):
+    contagens = {}
+    somas = {}
+    for X, rotulos, sessoes in fonte.blocos():
+        _posicoes(rotulos, sessoes, contagens)
+        for classe in pd.unique(rotulos):
+            linhas = rotulos == classe
+            soma, n = somas.get(classe, (np.zeros(X.shape[1]), 0))
+            somas[classe] = (soma + X[linhas].sum(axis=0, dtype=np.float64), n + int(linhas.sum()))
+    if not contagens:
+        raise ValueError("O dataset está vazio.")
+    return contagens, somas
+
+# Posição (dentro de cada grupo) a partir da qual as linhas são de teste
+def dividir_sessoes(contagens, fracao_teste=0.2, semente=42):
+    rng = np.random.default_rng(semente)
+    inicio_teste = {}
+    por_classe = {}
+    for grupo in sorted(contagens, key=str):
+        por_classe.setdefault(grupo[1], []).append(grupo)
+    for classe, grupos in por_classe.items():
+        if len(grupos) == 1:
+            n = contagens[grupos[0]]
+            inicio_teste[grupos[0]] = n - max(1, int(round(n * fracao_teste))) if n > 1 else n
+            continue
+        n_teste = max(1, int(round(len(grupos) * fracao_teste)))
+        teste = set(rng.permutation(len(grupos))[:n_teste])
+        for i, grupo in enumerate(grupos):
+            inicio_teste[grupo] = 0 if i in teste else contagens[grupo]
+    return inicio_teste
+
+# Divide 'total' entre itens com as capacidades dadas: partes iguais, e o que sobra dos
+# itens menores vai para os maiores
+def _dividir_cota(total, capacidades):
+    cotas = np.zeros(len(capacidades), dtype=np.int64)
+    capacidades = np.asarray(capacidades, dtype=np.int64)
+    restante = total
+    abertos = np.flatnonzero(capacidades > 0)
+    while restante > 0 and abertos.size:
+        parte = max(1, restante // abertos.size)
+        for i in abertos:
+            adicional = min(parte, capacidades[i] - cotas[i], restante)
+            cotas[i] += adicional
+            restante -= adicional
+            if restante == 0:
+                break
+        abertos = abertos[cotas[abertos] < capacidades[abertos]]
+    return cotas
+
+# Divide 'total' entre itens proporcionalmente às capacidades (maiores restos)
+def _cota_proporcional(total, capacidades):
+    capacidades = np.asarray(capacidades, dtype=np.int64)
+    soma = int(capacidades.sum())
+    if total >= soma:
+        return capacidades.copy()
+    exatas = capacidades * (total / soma)
+    cotas = np.floor(exatas).astype(np.int64)
+    cotas[np.argsort(cotas - exatas, kind='stable')[:total - int(cotas.sum())]] += 1
+    return cotas
+
+# Sorteia 'total' linhas estratificadas por classe e por sessão dentro dos intervalos
+# [inicio, fim) de cada grupo. Retorna grupo -> posições sorteadas (ordenadas).
+def planejar_amostra(intervalos, total, rng, balancear_classes=False):
+    por_classe = {}
+    for grupo, (inicio, fim) in intervalos.items():
+        if fim > inicio:
+            por_classe.setdefault(grupo[1], []).append(grupo)
+    classes = sorted(por_classe, key=str)
+    capacidades_classes = [sum(intervalos[g][1] - intervalos[g][0] for g in por_classe[c]) for c in classes]
+    cotas_classes = (_dividir_cota if balancear_classes else _cota_proporcional)(total, capacidades_classes)
+    plano = {}
+    for classe, cota_classe in zip(classes, cotas_classes):
+        grupos = sorted(por_classe[classe], key=str)
+        cotas = _dividir_cota(cota_classe, [intervalos[g][1] - intervalos[g][0] for g in grupos])
+        for grupo, cota in zip(grupos, cotas):
+            if cota > 0:
+                inicio, fim = intervalos[grupo]
+                plano[grupo] = inicio + np.sort(rng.choice(fim - inicio, size=int(cota), replace=False))
+    return plano
+
+# Amostra gravada em disco: X (memmap float32, normalizado no final por normalizar()) e y
+class Amostra:
+    def __init__(self, caminho, plano):
+        self.n = int(sum(len(p) for p in plano.values()))
+        self.plano = plano
+        self.X = np.lib.format.open_memmap(caminho, mode='w+', dtype=np.float32, shape=(self.n, len(COLUNAS_SENSORES)))
+        self.y = np.empty(self.n, dtype=object)
+        self.preenchidas = 0
+
+    # 'ordem'/'limites': linhas do bloco ordenadas por grupo (as do grupo i são
+    # ordem[limites[i]:limites[i + 1]], na ordem em que aparecem no bloco)
+    def adicionar(self, X, rotulos, grupos, posicoes, ordem, limites):
+        selecionadas = np.zeros(len(X), dtype=bool)
+        for i, grupo in enumerate(grupos):
+            sorteadas = self.plano.get(grupo)
+            if sorteadas is None:
+                continue
+            linhas = ordem[limites[i]:limites[i + 1]]
+            p = posicoes[linhas]
+            j = np.searchsorted(sorteadas, p)
+            selecionadas[linhas[(j < len(sorteadas)) & (sorteadas[np.minimum(j, len(sorteadas) - 1)] == p)]] = True
+        n = int(selecionadas.sum())
+        self.X[self.preenchidas:self.preenchidas + n] = X[selecionadas]
+        self.y[self.preenchidas:self.preenchidas + n] = rotulos[selecionadas]
+        self.preenchidas += n
+
+    def normalizar(self, scaler, tamanho_bloco=200_000):
+        for inicio in range(0, self.n, tamanho_bloco):
+            self.X[inicio:inicio + tamanho_bloco] = scaler.transform(self.X[inicio:inicio + tamanho_bloco])
+        self.X.flush()
+
+# Resultado da preparação: amostras de busca, treino (reajuste final) e teste, o scaler e as
+# médias de cada classe (para os perfis do artefato)
+class ConjuntoForaMemoria:
+    def __init__(self, diretorio, scaler, busca, treino, teste, medias_classes, n_linhas, n_grupos):
+        self.diretorio = diretorio
+        self.scaler = scaler
+        self.busca = busca
+        self.treino = treino
+        self.teste = teste
+        self.medias_classes = medias_classes
+        self.n_linhas = n_linhas
+        self.n_grupos = n_grupos
+
+    # Apaga as matrizes do diretório de trabalho (os modelos já treinados não dependem delas)
+    def limpar(self):
+        for amostra in (self.busca, self.treino, self.teste):
+            amostra.X._mmap.close()
+        shutil.rmtree(self.diretorio, ignore_errors=True)
+
+# 'balancear_classes': cotas iguais por classe em vez de proporcionais (muda as proporções
+# das classes que o modelo aprende). Com 'scaler' já ajustado, ele é usado sem alteração.
+def preparar(fonte, amostra_busca=200_000, amostra_treino=2_000_000, amostra_teste=500_000,
+             scaler=None, fracao_teste=0.2, diretorio=None, semente=42, balancear_classes=False):
+    contagens, somas = varrer(fonte)
+    inicio_teste = dividir_sessoes(contagens, fracao_teste, semente)
+    rng = np.random.default_rng(semente)
+    intervalos_treino = {g: (0, inicio_teste[g]) for g in contagens}
+    intervalos_teste = {g: (inicio_teste[g], n) for g, n in contagens.items()}
+    diretorio = diretorio or tempfile.mkdtemp(prefix="treino_fora_memoria_")
+    os.makedirs(diretorio, exist_ok=True)
+    amostras = [Amostra(os.path.join(diretorio, f"{nome}.npy"), planejar_amostra(intervalos, total, rng, balancear_classes))
+                for nome, intervalos, total in (("busca", intervalos_treino, amostra_busca),
+                                                ("treino", intervalos_treino, amostra_treino),
+                                                ("teste", intervalos_teste, amostra_teste))]
+
+    # Segunda passada: ajusta o scaler com as linhas de treino e grava as linhas sorteadas
+    ajustar = scaler is None
+    if ajustar:
+        scaler = MinMaxScaler()
+    vistas = {}
+    for X, rotulos, sessoes in fonte.blocos():
+        codigos, grupos, posicoes = _posicoes(rotulos, sessoes, vistas)
+        if ajustar:
+            treino = posicoes < np.array([inicio_teste[g] for g in grupos], dtype=np.int64)[codigos]
+            if treino.any():
+                scaler.partial_fit(X[treino])
+        ordem = np.argsort(codigos, kind='stable')
+        limites = np.concatenate(([0], np.cumsum(np.bincount(codigos, minlength=len(grupos)))))
+        for amostra in amostras:
+            amostra.adicionar(X, rotulos, grupos, posicoes, ordem, limites)
+    if not hasattr(scaler, "n_samples_seen_"):
+        raise ValueError("O dataset não tem linhas de treino.")
+    for amostra in amostras:
+        amostra.normalizar(scaler)
+
+    classes = sorted(somas, key=str)
+    medias = np.array([somas[c][0] / somas[c][1] for c in classes])
+    return ConjuntoForaMemoria(diretorio, scaler, *amostras, (medias, np.array(classes, dtype=object)),
+                               sum(contagens.values()), len(contagens))